@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import functools
+import http.server
+import importlib.util
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+BENCH_FORMAT = 1
+
+WORDS = (
+    "model evidence claim source method result error sample bias measure signal noise "
+    "baseline variance estimate dataset protocol review context scope"
+).split()
+
+
+def load_add_reference() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("add_reference", SCRIPTS_DIR / "project_add_reference.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["add_reference"] = module  # ProcessPoolExecutor workers pickle by module name
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_sync() -> ModuleType:
+    # The sync script ships embedded in the initializer; load that exact text.
+    spec = importlib.util.spec_from_file_location("init_steno_paper", SCRIPTS_DIR / "init_steno_paper.py")
+    init = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(init)
+    module = ModuleType("sync_md_to_tex")
+    exec(compile(init.SYNC_PY, "sync_md_to_tex.py", "exec"), module.__dict__)
+    return module
+
+
+def sentence(i: int, n: int = 14) -> str:
+    return " ".join(WORDS[(i * 7 + k * 3) % len(WORDS)] for k in range(n)).capitalize() + "."
+
+
+def make_html(paragraphs: int) -> str:
+    body = "\n".join(f"<p>{sentence(i)} {sentence(i + 1)} <a href='/x{i}'>link {i}</a></p>" for i in range(paragraphs))
+    return (
+        "<!doctype html><html><head><title>Synthetic page</title>"
+        "<meta name='description' content='benchmark fixture'><script>var x = 1;</script></head>"
+        f"<body><nav>menu</nav><h1>Synthetic page</h1>{body}<footer>footer</footer></body></html>"
+    )
+
+
+def make_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    # Minimal valid PDF: one shared Helvetica font, one text stream per page.
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids: list[str] = []
+    for p in range(pages):
+        text = " ".join(f"({sentence(p * lines_per_page + i, 10)}) '" for i in range(lines_per_page))
+        stream = f"BT /F1 9 Tf 12 TL 40 780 Td {text} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>".encode()
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets: list[int] = []
+    for n, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (n, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_draft(pages: int) -> str:
+    # Roughly 3000 characters of mixed prose, lists and citations per page.
+    lines = ["# Synthetic draft", "", "*Author: Bench*", "", "## Abstract", "", sentence(0), ""]
+    for p in range(pages):
+        lines += [f"## {p + 1}. Section {p + 1}", ""]
+        for i in range(6):
+            k = p * 6 + i
+            lines += [
+                f"{sentence(k)} See [@key_{k % 50}] and [source {k}](https://example.org/a_b?q={k}#s). "
+                f"The `param_{k}` value is **{sentence(k + 1, 4)}** at 50% load & more. {sentence(k + 2)}",
+                "",
+            ]
+        lines += [f"- {sentence(p + i, 8)} [@key_{i}]" for i in range(4)]
+        lines += [""]
+    lines += ["## References", ""]
+    return "\n".join(lines)
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def start_server(root: Path) -> tuple[http.server.ThreadingHTTPServer, str]:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> tuple[dict[str, float], Any]:
+    runs: list[float] = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - started)
+    seconds = {
+        "min": round(min(runs), 6),
+        "median": round(statistics.median(runs), 6),
+        "max": round(max(runs), 6),
+        "runs": len(runs),
+    }
+    return seconds, result
+
+
+class Bench:
+    def __init__(self, repeat: int, only: set[str]) -> None:
+        self.repeat = repeat
+        self.only = only
+        self.results: list[dict[str, Any]] = []
+
+    def wanted(self, name: str) -> bool:
+        return not self.only or name in self.only
+
+    def run(self, name: str, params: dict[str, Any], fn: Callable[[], Any], repeat: int | None = None) -> Any:
+        try:
+            seconds, result = measure(fn, repeat or self.repeat)
+        except Exception as e:
+            self.results.append({"bench": name, "params": params, "error": f"{type(e).__name__}: {e}"})
+            print(f"[FAIL] {name} {params}: {e}", file=sys.stderr)
+            return None
+        self.results.append({"bench": name, "params": params, "seconds": seconds})
+        print(f"[OK] {name} {params}: {seconds['median'] * 1000:.1f} ms", file=sys.stderr)
+        return result
+
+    def skip(self, name: str, params: dict[str, Any], reason: str) -> None:
+        self.results.append({"bench": name, "params": params, "skipped": reason})
+        print(f"[SKIP] {name} {params}: {reason}", file=sys.stderr)
+
+
+def bench_fetch(bench: Bench, ar: ModuleType, base_url: str, fixtures: dict[str, Path], work: Path) -> None:
+    if not bench.wanted("fetch_bytes"):
+        return
+    cache = ar.HttpCache(work / "http-cache", 1 << 30)
+    for name, path in fixtures.items():
+        url = f"{base_url}/{name}"
+        params = {"file": name, "bytes": path.stat().st_size}
+        bench.run("fetch_bytes", {**params, "cache": False}, lambda: ar.fetch_bytes(url))
+        ar.fetch_bytes(url, cache)  # prime
+        bench.run("fetch_bytes", {**params, "cache": True}, lambda: ar.fetch_bytes(url, cache))
+
+
+def bench_extract(bench: Bench, ar: ModuleType, pdfs: dict[int, Path]) -> None:
+    if not bench.wanted("extract_pdf_to_text"):
+        return
+    for backend in ar.PDF_BACKENDS:
+        available = ar.tool_path(backend) if backend == "pdftotext" else ar.optional_module(backend)
+        for pages, path in pdfs.items():
+            params = {"backend": backend, "pages": pages}
+            if not available:
+                bench.skip("extract_pdf_to_text", params, "backend not installed")
+                continue
+            bench.run("extract_pdf_to_text", params, lambda: ar.extract_pdf_to_text(path, backends=(backend,)))
+
+
+def bench_html(bench: Bench, ar: ModuleType, sizes: list[int]) -> None:
+    if not bench.wanted("html_to_md"):
+        return
+    for paragraphs in sizes:
+        html = make_html(paragraphs)
+        _title, _md, backend = ar.convert_html("http://bench.invalid/page", html)
+        params = {"paragraphs": paragraphs, "bytes": len(html), "backend": backend}
+        bench.run("html_to_md", params, lambda: ar.html_to_md("http://bench.invalid/page", html))
+
+
+def bench_index(bench: Bench, ar: ModuleType, sizes: list[int], work: Path) -> None:
+    if not bench.wanted("append_index"):
+        return
+    for n in sizes:
+        def fill() -> None:
+            refs = Path(tempfile.mkdtemp(prefix="refs-", dir=work))
+            for i in range(n):
+                ar.append_index(refs, f"Source {i}", f"source-{i}", f"https://example.org/{i}", f"key{i}", render=False)
+            ar.open_catalog(refs).render_index()
+
+        bench.run("append_index", {"records": n, "render": "once"}, fill)
+
+
+def bench_bib(bench: Bench, ar: ModuleType, sizes: list[int], work: Path) -> None:
+    if not bench.wanted("update_bib"):
+        return
+    accessed = dt.date.today().isoformat()
+    for n in sizes:
+        def fill() -> None:
+            latex_dir = Path(tempfile.mkdtemp(prefix="latex-", dir=work))
+            (latex_dir / "src").mkdir()
+            (latex_dir / "src" / "references.bib").write_text("", encoding="utf-8")
+            for i in range(n):
+                ar.update_bib(latex_dir, f"key{i}", f"Source {i}", f"https://example.org/{i}", accessed)
+
+        bench.run("update_bib", {"entries": n}, fill)
+
+
+def bench_sync(bench: Bench, sync: ModuleType, pages_list: list[int], work: Path) -> None:
+    if not bench.wanted("sync_md_to_tex.convert"):
+        return
+    for pages in pages_list:
+        md = make_draft(pages)
+        bench.run("sync_md_to_tex.convert", {"pages": pages, "bytes": len(md)}, lambda: sync.convert(md))
+
+
+def compare(current: dict[str, Any], baseline_path: Path, threshold: float) -> int:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+    def key(r: dict[str, Any]) -> str:
+        return r["bench"] + " " + json.dumps(r["params"], sort_keys=True)
+
+    old = {key(r): r["seconds"]["median"] for r in baseline.get("results", []) if "seconds" in r}
+    regressions = 0
+    for r in current["results"]:
+        if "seconds" not in r or key(r) not in old or old[key(r)] <= 0:
+            continue
+        ratio = r["seconds"]["median"] / old[key(r)]
+        status = "FAIL" if ratio > threshold else "OK"
+        regressions += status == "FAIL"
+        print(f"[{status}] {key(r)}: {ratio:.2f}x", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark reference ingestion and Markdown sync against local synthetic fixtures; prints JSON."
+    )
+    parser.add_argument("--quick", action="store_true", help="Small sizes and a single run (smoke test)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (default: 5)")
+    parser.add_argument(
+        "--only",
+        default="",
+        help="Comma-separated subset: fetch_bytes, extract_pdf_to_text, html_to_md, append_index, update_bib, sync_md_to_tex.convert",
+    )
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run; exit 1 if any median regresses")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Regression ratio for --compare (default: 1.25)")
+    args = parser.parse_args()
+
+    repeat = 1 if args.quick else max(1, args.repeat)
+    pdf_pages = [1, 10] if args.quick else [1, 10, 50, 200]
+    html_sizes = [10, 100] if args.quick else [10, 100, 1000]
+    index_sizes = [10, 100] if args.quick else [10, 100, 1000]
+    bib_sizes = [10, 50] if args.quick else [10, 100, 500]
+    draft_pages = [1, 10] if args.quick else [1, 10, 100, 500]
+
+    ar = load_add_reference()
+    sync = load_sync()
+    bench = Bench(repeat, {s.strip() for s in args.only.split(",") if s.strip()})
+
+    with tempfile.TemporaryDirectory(prefix="steno-bench-") as td:
+        work = Path(td)
+        www = work / "www"
+        www.mkdir()
+        fixtures: dict[str, Path] = {}
+        pdfs: dict[int, Path] = {}
+        for paragraphs in html_sizes:
+            path = www / f"page-{paragraphs}.html"
+            path.write_text(make_html(paragraphs), encoding="utf-8")
+            fixtures[path.name] = path
+        for pages in pdf_pages:
+            path = www / f"doc-{pages}.pdf"
+            path.write_bytes(make_pdf(pages))
+            fixtures[path.name] = path
+            pdfs[pages] = path
+
+        server, base_url = start_server(www)
+        try:
+            bench_fetch(bench, ar, base_url, fixtures, work)
+        finally:
+            server.shutdown()
+        bench_extract(bench, ar, pdfs)
+        bench_html(bench, ar, html_sizes)
+        bench_index(bench, ar, index_sizes, work)
+        bench_bib(bench, ar, bib_sizes, work)
+        bench_sync(bench, sync, draft_pages, work)
+
+    try:
+        rev = subprocess.run(
+            ["git", "-C", str(SCRIPTS_DIR), "rev-parse", "--short", "HEAD"],
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        ).stdout.strip()
+    except OSError:
+        rev = ""
+    report = {
+        "format": BENCH_FORMAT,
+        "created": dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        "git": rev or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": bench.results,
+    }
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+        print(f"[OK] Wrote {args.output}", file=sys.stderr)
+    else:
+        sys.stdout.write(text)
+
+    if args.compare:
+        return compare(report, Path(args.compare), args.threshold)
+    return 1 if any("error" in r for r in bench.results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
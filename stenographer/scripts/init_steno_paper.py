@@ -2,15 +2,168 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import shutil
+import sys
+import tempfile
+import time
 from pathlib import Path
 
+# Sibling script (same directory, so on sys.path when run directly).
+from project_add_reference import reflink
+
+
+def default_store_root() -> Path:
+    if os.environ.get("STENOGRAPHER_STORE"):
+        return Path(os.environ["STENOGRAPHER_STORE"]).expanduser()
+    cache = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return cache / "stenographer" / "templates"
+
+
+def clone_file(src: Path, dst: Path) -> str:
+    # Cheapest way to give dst its own copy of src: a reflink, or a plain copy.
+    # Never a hard link: an edit in one project would reach the store and every
+    # other project sharing the inode.
+    if reflink(src, dst):
+        return "reflink"
+    shutil.copyfile(src, dst)
+    return "copy"
+
+
+def template_files(skill_dir: Path) -> dict[str, bytes]:
+    # Everything init writes verbatim: the LaTeX template tree (latex/), the
+    # per-variant scripts (scripts/) and the project-root helpers (root/).
+    latex = skill_dir / "assets" / "latex_project_template"
+    files = {
+        f"latex/{path.relative_to(latex).as_posix()}": path.read_bytes()
+        for path in sorted(latex.rglob("*"))
+        if path.is_file()
+    }
+    for name, content in {
+        "build.sh": BUILD_SH,
+        "watch.sh": WATCH_SH,
+        "clean.sh": CLEAN_SH,
+        "sync_md_to_tex.py": SYNC_PY,
+        "watch.py": WATCH_PY,
+        "fingerprint.py": FINGERPRINT_PY,
+        "preamble_fmt.py": PREAMBLE_FMT_PY,
+    }.items():
+        files[f"scripts/{name}"] = content.encode("utf-8")
+    files["scripts/add_reference.py"] = (skill_dir / "scripts" / "project_add_reference.py").read_bytes()
+    for name, src in {
+        "doctor.sh": "project_doctor.sh",
+        "status.py": "project_status.py",
+        "build.py": "project_build.py",
+        "search.py": "project_search.py",
+    }.items():
+        files[f"root/{name}"] = (skill_dir / "scripts" / src).read_bytes()
+    return files
+
+
+class TemplateStore:
+    """Shared, versioned copy of the files init writes verbatim.
+
+    ``<root>/<hash>/`` mirrors :func:`template_files`; the hash covers every byte,
+    so upgrading the skill publishes a new directory and never touches existing
+    ones. Project files are reflinked from the store where the filesystem
+    supports it and copied otherwise, so each project owns independent, writable
+    files. Without a store root, files are written directly.
+    """
+
+    def __init__(self, files: dict[str, bytes], path: Path | None) -> None:
+        self.files = files
+        self.path = path
+        self.counts = {"reflink": 0, "copy": 0}
+
+    @classmethod
+    def open(cls, root: Path | None, files: dict[str, bytes]) -> TemplateStore:
+        if root is None:
+            return cls(files, None)
+        h = hashlib.sha256()
+        for rel in sorted(files):
+            h.update(rel.encode("utf-8") + b"\0" + str(len(files[rel])).encode("ascii") + b"\0")
+            h.update(files[rel])
+        path = root / h.hexdigest()[:16]
+        if path.is_dir():
+            return cls(files, path)
+        tmp: Path | None = None
+        try:
+            root.mkdir(parents=True, exist_ok=True)
+            tmp = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=root))
+            for rel, data in files.items():
+                out = tmp / rel
+                out.parent.mkdir(parents=True, exist_ok=True)
+                out.write_bytes(data)
+                out.chmod(0o444 if rel.startswith("latex/") else 0o555)
+            # Publish atomically; if another init won the race, its copy is identical.
+            os.rename(tmp, path)
+            tmp = None
+        except OSError as e:
+            if not path.is_dir():
+                print(f"[WARN] Template store unavailable ({e}); writing files directly")
+                path = None
+        finally:
+            if tmp is not None:
+                shutil.rmtree(tmp, ignore_errors=True)
+        return cls(files, path)
+
+    def install(self, rel: str, dst: Path) -> None:
+        script = not rel.startswith("latex/")
+        if self.path is None:
+            dst.write_bytes(self.files[rel])
+            how = "copy"
+        else:
+            how = clone_file(self.path / rel, dst)
+        if script:
+            dst.chmod(0o755)
+        self.counts[how] += 1
+
+    def install_tree(self, prefix: str, dst_dir: Path) -> None:
+        for rel in sorted(self.files):
+            if rel.startswith(prefix + "/"):
+                out = dst_dir / rel[len(prefix) + 1 :]
+                out.parent.mkdir(parents=True, exist_ok=True)
+                self.install(rel, out)
+
+    def summary(self) -> str:
+        where = str(self.path) if self.path else "disabled"
+        c = self.counts
+        return f"[INFO] Template store: {where} ({c['reflink']} reflinked, {c['copy']} copied)"
+
+
+def read_manifest(spec: str, base: Path, default_langs: list[str]) -> list[tuple[Path, str, list[str]]]:
+    # JSON list (or {"projects": [...]}) of names or {"name", "dir", "langs"} objects;
+    # relative dirs resolve against --dir and default to <dir>/<name>, and entries
+    # without "langs" use --langs.
+    try:
+        raw = sys.stdin.read() if spec == "-" else Path(spec).read_text(encoding="utf-8")
+        data = json.loads(raw)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"[FAIL] Cannot read manifest {spec}: {e}")
+    entries = data.get("projects") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise SystemExit('[FAIL] Manifest must be a JSON list of projects or {"projects": [...]}')
+    jobs: list[tuple[Path, str, list[str]]] = []
+    for i, entry in enumerate(entries, 1):
+        if isinstance(entry, str):
+            entry = {"name": entry}
+        name = entry.get("name") if isinstance(entry, dict) else None
+        if not name or not isinstance(name, str):
+            raise SystemExit(f"[FAIL] Manifest entry {i} has no name")
+        langs = entry.get("langs", default_langs)
+        if isinstance(langs, str):
+            langs = langs.split(",")
+        jobs.append(((base / entry.get("dir", name)).resolve(), name, [s.strip() for s in langs if s.strip()]))
+    return jobs
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Initialize a stenographer paper project: <name>.md + <name>_latex/ with LaTeX src/."
     )
-    parser.add_argument("name", help="Base name (without extension), e.g. 'paper' or 'my-article'")
+    parser.add_argument("name", nargs="?", help="Base name (without extension), e.g. 'paper' or 'my-article'")
     parser.add_argument(
         "--dir",
         default=".",
@@ -19,26 +172,56 @@ def main() -> int:
     parser.add_argument(
         "--langs",
         default="",
-        help="Comma-separated language tags (e.g. en,ru). If multiple are provided, create one full variant per language with language tags in filenames.",
+        help="Comma-separated language tags (e.g. en,ru). If multiple are provided, create one full variant per language with language tags in filenames. With --manifest, the default for entries without \"langs\".",
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="FILE",
+        help='Create many projects from a JSON list of {"name", "dir", "langs"} objects (or plain names); \'-\' for stdin. Relative dirs resolve against --dir (default: <dir>/<name>).',
     )
+    parser.add_argument(
+        "--store",
+        default=str(default_store_root()),
+        help="Shared template store (default: ~/.cache/stenographer/templates; env STENOGRAPHER_STORE)",
+    )
+    parser.add_argument("--no-store", action="store_true", help="Write files directly instead of cloning them from the store")
     args = parser.parse_args()
+    if bool(args.name) == bool(args.manifest):
+        parser.error("pass either <name> or --manifest FILE")
 
     base = Path(args.dir).resolve()
+    skill_dir = Path(__file__).resolve().parents[1]
+    langs = [s.strip() for s in args.langs.split(",") if s.strip()]
+    if args.manifest:
+        jobs = read_manifest(args.manifest, base, langs)
+    else:
+        jobs = [(base, args.name, langs)]
+
+    started = time.monotonic()
+    store = TemplateStore.open(None if args.no_store else Path(args.store).expanduser(), template_files(skill_dir))
+    for target, name, langs in jobs:
+        if args.manifest:
+            print(f"[INFO] Project {name} in {target}")
+        init_project(target, name, langs, skill_dir, store)
+    print(store.summary())
+    if args.manifest:
+        print(f"[INFO] Initialized {len(jobs)} project(s) in {time.monotonic() - started:.2f}s")
+    return 0
+
+
+def init_project(base: Path, name: str, langs: list[str], skill_dir: Path, store: TemplateStore) -> None:
     base.mkdir(parents=True, exist_ok=True)
 
-    langs = [s.strip() for s in args.langs.split(",") if s.strip()]
     multi_lang = len(langs) > 1
     variants: list[tuple[str, str]] = []
     if multi_lang:
         for lang in langs:
-            variants.append((f"{args.name}_{lang}", lang))
+            variants.append((f"{name}_{lang}", lang))
     else:
-        variants.append((args.name, langs[0] if langs else ""))
+        variants.append((name, langs[0] if langs else ""))
 
-    skill_dir = Path(__file__).resolve().parents[1]
     md_template_en = skill_dir / "assets" / "paper_template_en.md"
     md_template_fallback = skill_dir / "assets" / "paper_template.md"
-    latex_template = skill_dir / "assets" / "latex_project_template"
 
     for stem, lang in variants:
         md_path = base / f"{stem}.md"
@@ -66,7 +249,7 @@ def main() -> int:
             print(f"[SKIP] Exists {md_path}")
 
         if not latex_dir.exists():
-            shutil.copytree(latex_template, latex_dir)
+            store.install_tree("latex", latex_dir)
             print(f"[OK] Created {latex_dir}")
         else:
             print(f"[SKIP] Exists {latex_dir}")
@@ -93,7 +276,7 @@ def main() -> int:
             )
             lines.append("")
             lines.append("pdf:")
-            lines.append("\t" + " && ".join([f"./{s}_latex/scripts/build.sh {s}" for s in stems]))
+            lines.append("\tpython3 build.py")
             lines.append("")
             lines.append("watch:")
             lines.append('\t@echo "Use one of: ' + " ".join([f"make watch-{s}" for s in stems]) + '"')
@@ -123,7 +306,7 @@ def main() -> int:
                 f"""\
 .PHONY: pdf watch clean lint
 
-NAME := {args.name}
+NAME := {name}
 LATEX_DIR := $(NAME)_latex
 
 pdf:
@@ -156,6 +339,8 @@ lint:
             "- For web pages: a best-effort Markdown capture (`.md`).\n"
             "- For PDFs: both the original PDF (`.pdf`) and an extracted Markdown (`.md`).\n"
             "\n"
+            "The list below is generated from `catalog.jsonl` by `add_reference.py`; notes and entries you add by hand under Index are kept.\n"
+            "\n"
             "## Index\n",
             encoding="utf-8",
         )
@@ -180,6 +365,8 @@ exclude = [
     "**/*_latex/build/**",
     ".venv/**",
     "References/.tmp/**",
+    "References/.cache/**",
+    ".cache/**",
     ".rumdl_cache/**",
 ]
 respect-gitignore = true
@@ -199,7 +386,7 @@ headings = true
     # Create a uv-managed local Python project (pyproject.toml)
     pyproject = base / "pyproject.toml"
     if not pyproject.exists():
-        project_name = f"stenographer-{args.name}"
+        project_name = f"stenographer-{name}"
         pyproject.write_text(
             f"""\
 [project]
@@ -211,12 +398,10 @@ dependencies = []
 
 [project.optional-dependencies]
 basic = [
-  "beautifulsoup4",
   "markdownify",
 ]
 full = [
   "trafilatura",
-  "beautifulsoup4",
   "markdownify",
   "pypdf",
   "pdfplumber",
@@ -232,9 +417,7 @@ full = [
     # Create a project doctor script (tooling preflight, OS/shell-aware suggestions)
     doctor_sh = base / "doctor.sh"
     if not doctor_sh.exists():
-        src = skill_dir / "scripts" / "project_doctor.sh"
-        doctor_sh.write_text(src.read_text(encoding="utf-8"), encoding="utf-8")
-        doctor_sh.chmod(0o755)
+        store.install("root/doctor.sh", doctor_sh)
         print(f"[OK] Created {doctor_sh}")
     else:
         print(f"[SKIP] Exists {doctor_sh}")
@@ -242,44 +425,43 @@ full = [
     # Create a project status helper (recover state in a new session)
     status_py = base / "status.py"
     if not status_py.exists():
-        src = skill_dir / "scripts" / "project_status.py"
-        status_py.write_text(src.read_text(encoding="utf-8"), encoding="utf-8")
-        status_py.chmod(0o755)
+        store.install("root/status.py", status_py)
         print(f"[OK] Created {status_py}")
     else:
         print(f"[SKIP] Exists {status_py}")
 
+    # Create a build orchestrator (all language variants in parallel)
+    build_py = base / "build.py"
+    if not build_py.exists():
+        store.install("root/build.py", build_py)
+        print(f"[OK] Created {build_py}")
+    else:
+        print(f"[SKIP] Exists {build_py}")
+
+    # Create a full-text search helper over the References/ archive
+    search_py = base / "search.py"
+    if not search_py.exists():
+        store.install("root/search.py", search_py)
+        print(f"[OK] Created {search_py}")
+    else:
+        print(f"[SKIP] Exists {search_py}")
+
     # Drop helper scripts into the LaTeX folder (so they travel with the project)
     for stem, _lang in variants:
         latex_dir = base / f"{stem}_latex"
         scripts_dir = latex_dir / "scripts"
         scripts_dir.mkdir(parents=True, exist_ok=True)
 
-        for name, content in {
-            "build.sh": BUILD_SH,
-            "watch.sh": WATCH_SH,
-            "clean.sh": CLEAN_SH,
-            "sync_md_to_tex.py": SYNC_PY,
-        }.items():
-            out = scripts_dir / name
+        for rel in sorted(store.files):
+            if not rel.startswith("scripts/"):
+                continue
+            out = scripts_dir / rel[len("scripts/") :]
             if not out.exists():
-                out.write_text(content, encoding="utf-8")
-                out.chmod(0o755)
+                store.install(rel, out)
                 print(f"[OK] Created {out}")
             else:
                 print(f"[SKIP] Exists {out}")
 
-        add_reference_out = scripts_dir / "add_reference.py"
-        if not add_reference_out.exists():
-            src = skill_dir / "scripts" / "project_add_reference.py"
-            add_reference_out.write_text(src.read_text(encoding="utf-8"), encoding="utf-8")
-            add_reference_out.chmod(0o755)
-            print(f"[OK] Created {add_reference_out}")
-        else:
-            print(f"[SKIP] Exists {add_reference_out}")
-
-    return 0
-
 
 BUILD_SH = """#!/usr/bin/env bash
 set -euo pipefail
@@ -294,21 +476,135 @@ PROJECT_ROOT="${ROOT_DIR}/.."
 
 mkdir -p "${BUILD_DIR}"
 
-if [[ -x "${PROJECT_ROOT}/doctor.sh" ]]; then
-  "${PROJECT_ROOT}/doctor.sh" --quiet
+# Opt-in stage timing: STENOGRAPHER_PROFILE=1 prints per-stage wall time to
+# stderr; STENOGRAPHER_TRACE=FILE also appends Chrome trace events (the Python
+# helpers write their spans to the same file). Microsecond timestamps come from
+# $EPOCHREALTIME (bash 5); older shells fall back to python3, then date.
+PROFILE="${STENOGRAPHER_PROFILE:-0}"
+TRACE="${STENOGRAPHER_TRACE:-}"
+if [[ -n "${TRACE}" ]]; then
+  PROFILE=1
+  [[ "${TRACE}" == /* ]] || TRACE="${PWD}/${TRACE}"
+  export STENOGRAPHER_TRACE="${TRACE}"
+fi
+SPAN_NAME=""
+SPAN_START=""
+NOW_US=""
+
+now_us() {
+  if [[ -n "${EPOCHREALTIME:-}" ]]; then
+    NOW_US="${EPOCHREALTIME/[.,]/}"
+  else
+    NOW_US="$(python3 -c 'import time; print(int(time.time() * 1e6))' 2>/dev/null)" ||
+      NOW_US="$(( $(date +%s) * 1000000 ))"
+  fi
+}
+
+trace_init() {
+  # The "[" header must be the first line and written exactly once, even when
+  # parallel builds share the trace: publish it with link(2), which fails if the
+  # file already exists (exclusive create where hard links are unsupported).
+  [[ -e "${TRACE}" ]] && return 0
+  mkdir -p "$(dirname "${TRACE}")"
+  local tmp
+  tmp="$(mktemp "${TRACE}.XXXXXX")" || return 0
+  printf '[\\n' > "${tmp}"
+  if ! ln "${tmp}" "${TRACE}" 2>/dev/null && [[ ! -e "${TRACE}" ]]; then
+    ( set -C; printf '[\\n' > "${TRACE}" ) 2>/dev/null || true
+  fi
+  rm -f "${tmp}"
+}
+
+span_begin() {
+  [[ "${PROFILE}" == "1" ]] || return 0
+  SPAN_NAME="$1"
+  now_us
+  SPAN_START="${NOW_US}"
+}
+
+span_end() {
+  [[ -n "${SPAN_START}" ]] || return 0
+  now_us
+  local dur=$(( NOW_US - SPAN_START ))
+  echo "[INFO] ${NAME} ${SPAN_NAME}: $(( dur / 1000 )) ms" >&2
+  if [[ -n "${TRACE}" ]]; then
+    trace_init
+    printf '{"name": "build.%s", "cat": "build.sh", "ph": "X", "ts": %s, "dur": %s, "pid": %s, "tid": %s, "args": {"variant": "%s"}},\\n' \\
+      "${SPAN_NAME}" "${SPAN_START}" "${dur}" "$$" "$$" "${NAME}" >> "${TRACE}"
+  fi
+  SPAN_START=""
+}
+
+# Set STENOGRAPHER_SPLIT_SECTIONS=1 to write one src/sections/NN.tex per section.
+SYNC_FLAGS=""
+if [[ "${STENOGRAPHER_SPLIT_SECTIONS:-0}" == "1" ]]; then
+  SYNC_FLAGS="--split-sections"
 fi
 
-if command -v rumdl >/dev/null 2>&1; then
-  rumdl check "${PROJECT_ROOT}"
+# No-op build: inputs (Markdown, src/**, sync script, flags) match the manifest
+# written after the last successful build. Set STENOGRAPHER_FORCE_BUILD=1 to rebuild.
+FINGERPRINT="${ROOT_DIR}/scripts/fingerprint.py"
+if [[ "${STENOGRAPHER_FORCE_BUILD:-0}" != "1" && -f "${FINGERPRINT}" && -f "${BUILD_DIR}/${NAME}.pdf" ]]; then
+  span_begin fingerprint
+  if python3 "${FINGERPRINT}" check "${NAME}" ${SYNC_FLAGS}; then
+    cp -f "${BUILD_DIR}/${NAME}.pdf" "${OUT_PDF}"
+    span_end
+    echo "[OK] Up to date: ${OUT_PDF}"
+    exit 0
+  fi
+  span_end
+fi
+
+# build.py sets STENOGRAPHER_SKIP_PREFLIGHT=1 after running these once for all variants.
+if [[ "${STENOGRAPHER_SKIP_PREFLIGHT:-0}" != "1" ]]; then
+  if [[ -x "${PROJECT_ROOT}/doctor.sh" ]]; then
+    span_begin doctor
+    "${PROJECT_ROOT}/doctor.sh" --quiet
+    span_end
+  fi
+
+  if command -v rumdl >/dev/null 2>&1; then
+    span_begin lint
+    rumdl check "${PROJECT_ROOT}"
+    span_end
+  fi
 fi
 
 if [[ -f "${MD_PATH}" ]]; then
-  python3 "${ROOT_DIR}/scripts/sync_md_to_tex.py" "${MD_PATH}" "${SRC_DIR}"
+  span_begin sync
+  python3 "${ROOT_DIR}/scripts/sync_md_to_tex.py" "${MD_PATH}" "${SRC_DIR}" ${SYNC_FLAGS}
+  span_end
+fi
+
+# Opt-in precompiled preamble (STENOGRAPHER_FAST_PREAMBLE=1): compile with pdfLaTeX
+# from a format dumped from preamble.tex/macros.tex, re-dumped only when they change.
+ENGINE_ARGS=()
+if [[ "${STENOGRAPHER_FAST_PREAMBLE:-0}" == "1" && -f "${ROOT_DIR}/scripts/preamble_fmt.py" ]]; then
+  span_begin preamble
+  FMT="$(python3 "${ROOT_DIR}/scripts/preamble_fmt.py")" || FMT=""
+  span_end
+  if [[ -n "${FMT}" ]]; then
+    export TEXFORMATS="${BUILD_DIR}/fmt:${TEXFORMATS:-}"
+    ENGINE_ARGS=("-pdflatex=pdflatex -fmt=${FMT} -file-line-error -synctex=1 %O %S")
+  fi
 fi
 
+# Skip biber (and the LaTeX reruns it causes) when the cited keys and the bib
+# entries they resolve to match the last successful build; sync writes src/.citations.
+BIB_ARGS=()
+CITES="${SRC_DIR}/.citations"
+CITES_BUILT="${BUILD_DIR}/.${NAME}.citations"
+if [[ -f "${MD_PATH}" && -f "${CITES}" && -f "${CITES_BUILT}" && -f "${BUILD_DIR}/${NAME}.bbl" ]] \\
+  && [[ "$(<"${CITES}")" == "$(<"${CITES_BUILT}")" ]]; then
+  BIB_ARGS=(-bibtex-)
+fi
+
+span_begin latexmk
 set +e
 latexmk \\
   -r "${SRC_DIR}/latexmkrc" \\
+  ${ENGINE_ARGS[@]+"${ENGINE_ARGS[@]}"} \\
+  ${BIB_ARGS[@]+"${BIB_ARGS[@]}"} \\
   -cd \\
   -pdf \\
   -f \\
@@ -317,6 +613,7 @@ latexmk \\
   "${SRC_DIR}/main.tex"
 LATEXMK_STATUS=$?
 set -e
+span_end
 
 if [[ -f "${BUILD_DIR}/${NAME}.pdf" ]]; then
   cp -f "${BUILD_DIR}/${NAME}.pdf" "${OUT_PDF}"
@@ -327,82 +624,565 @@ else
 fi
 
 if [[ "${LATEXMK_STATUS}" != "0" ]]; then
+  rm -f "${CITES_BUILT}"
   echo "[WARN] latexmk exited with ${LATEXMK_STATUS}; PDF was produced anyway" >&2
+else
+  if [[ -f "${CITES}" ]]; then
+    cp -f "${CITES}" "${CITES_BUILT}"
+  fi
+  if [[ -f "${FINGERPRINT}" ]]; then
+    span_begin manifest
+    python3 "${FINGERPRINT}" write "${NAME}" ${SYNC_FLAGS}
+    span_end
+  fi
 fi
 exit 0
 """
 
 
+FINGERPRINT_PY = r"""#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+
+MANIFEST_VERSION = 1
+
+
+def inputs(root_dir: Path, name: str) -> list[Path]:
+    paths = [root_dir.parent / f"{name}.md", root_dir / "scripts" / "sync_md_to_tex.py"]
+    for dirpath, dirnames, filenames in os.walk(root_dir / "src"):
+        dirnames.sort()
+        paths.extend(Path(dirpath) / f for f in sorted(filenames))
+    return paths
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def snapshot(root_dir: Path, name: str, prev: dict[str, list]) -> dict[str, list]:
+    # {relpath: [mtime_ns, size, sha256]}; unchanged stat reuses the stored hash.
+    files: dict[str, list] = {}
+    for path in inputs(root_dir, name):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        rel = os.path.relpath(path, root_dir)
+        old = prev.get(rel)
+        if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+            files[rel] = old
+        else:
+            files[rel] = [st.st_mtime_ns, st.st_size, file_sha256(path)]
+    return files
+
+
+def digest(files: dict[str, list], flags: list[str]) -> str:
+    h = hashlib.sha256(json.dumps([MANIFEST_VERSION, flags], sort_keys=True).encode())
+    for rel in sorted(files):
+        h.update(f"{rel}\0{files[rel][2]}\n".encode())
+    return h.hexdigest()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fingerprint build inputs to skip no-op builds.")
+    parser.add_argument("command", choices=["check", "write"])
+    parser.add_argument("name", help="Base name, e.g. paper")
+    parser.add_argument("--split-sections", action="store_true")
+    args = parser.parse_args()
+
+    root_dir = Path(__file__).resolve().parents[1]
+    manifest_path = root_dir / "build" / f".{args.name}.manifest.json"
+    flags = ["--split-sections"] if args.split_sections else []
+    if os.environ.get("STENOGRAPHER_FAST_PREAMBLE") == "1":
+        # Different engine, different PDF.
+        flags.append("fast-preamble")
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    prev = manifest.get("files") or {}
+    files = snapshot(root_dir, args.name, prev)
+    current = digest(files, flags)
+
+    if args.command == "check":
+        if manifest.get("digest") != current:
+            return 1
+        if files != prev:
+            # Touched but identical inputs: refresh stats so the next check stays on the fast path.
+            args.command = "write"
+        else:
+            return 0
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp.write_text(json.dumps({"digest": current, "files": files}, indent=1) + "\n", encoding="utf-8")
+    os.replace(tmp, manifest_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+"""
+
+
+PREAMBLE_FMT_PY = r"""#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Precompiled preamble: dump everything in src/main.tex up to the endofdump marker
+# (preamble.tex and macros.tex) into build/fmt/preamble-<key>.fmt with mylatexformat,
+# so each LaTeX pass starts from the format instead of reloading every package.
+# LuaTeX cannot dump fontspec/luaotfload state, so this mode runs pdfLaTeX (the
+# template preamble's \ifPDFTeX branch: T1/inputenc/lmodern); the default lualatex
+# build is unchanged. That branch only covers Latin scripts, so variants with
+# Cyrillic, Greek, CJK, ... text keep building with lualatex.
+NON_LATIN_RE = re.compile(r"[^\x00-\u024f\u1e00-\u1eff\u2000-\u2bff]")
+MARKER_RE = re.compile(r"^[^%\n]*(\\csname\s+endofdump\\endcsname|\\endofdump\b)", re.MULTILINE)
+KEY_FILES = ("preamble.tex", "macros.tex")
+_VERSIONS: dict[str, str] = {}
+
+
+def tex_version(engine: str) -> str:
+    if engine not in _VERSIONS:
+        try:
+            out = subprocess.run([engine, "--version"], capture_output=True, text=True, errors="replace").stdout
+        except OSError:
+            out = ""
+        _VERSIONS[engine] = out.splitlines()[0] if out else ""
+    return _VERSIONS[engine]
+
+
+def format_key(src_dir: Path, head: str, engine: str) -> str:
+    h = hashlib.sha256(f"{tex_version(engine)}\0{head}\0".encode("utf-8"))
+    for name in KEY_FILES:
+        try:
+            data = (src_dir / name).read_bytes()
+        except FileNotFoundError:
+            data = b""
+        h.update(f"{name}\0{len(data)}\0".encode("utf-8") + data)
+    return h.hexdigest()[:16]
+
+
+def non_latin_text(src_dir: Path) -> tuple[Path, str] | None:
+    # First letter outside the Latin scripts in the sources (sync has already
+    # written the Markdown-generated .tex files).
+    for path in sorted(src_dir.rglob("*.tex")):
+        try:
+            text = path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        for m in NON_LATIN_RE.finditer(text):
+            if m.group().isalpha():
+                return path, m.group()
+    return None
+
+
+def ensure_format(root_dir: Path) -> str | None:
+    # Name of an up-to-date format in build/fmt/ (dumped when the key changed), or
+    # None when the normal build should run instead.
+    src_dir = root_dir / "src"
+    try:
+        main_tex = (src_dir / "main.tex").read_text(encoding="utf-8", errors="replace")
+    except FileNotFoundError:
+        return None
+    m = MARKER_RE.search(main_tex)
+    if not m:
+        print("[WARN] src/main.tex has no \\csname endofdump\\endcsname line after \\input{preamble}; "
+              "building without a preamble format", file=sys.stderr)
+        return None
+    found = non_latin_text(src_dir)
+    if found:
+        print(f"[WARN] {found[0].relative_to(root_dir)} contains non-Latin text ({found[1]!r}), which the pdfLaTeX "
+              "preamble format cannot typeset; building with lualatex instead", file=sys.stderr)
+        return None
+    engine = shutil.which("pdflatex")
+    if not engine:
+        print("[WARN] pdflatex not found; building without a preamble format", file=sys.stderr)
+        return None
+
+    fmt_dir = root_dir / "build" / "fmt"
+    job = f"preamble-{format_key(src_dir, main_tex[: m.start()], engine)}"
+    if (fmt_dir / f"{job}.fmt").exists():
+        return job
+    failed = fmt_dir / f"{job}.failed"
+    if failed.exists():
+        # Do not retry a broken dump on every pass; editing the preamble changes the key.
+        print(f"[WARN] Preamble format unavailable (log: {failed}); building without it", file=sys.stderr)
+        return None
+
+    fmt_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=fmt_dir) as tmp:
+        proc = subprocess.run(
+            [
+                engine, "-ini", "-interaction=nonstopmode", "-halt-on-error",
+                f"-jobname={job}", f"-output-directory={tmp}",
+                "&pdflatex", "mylatexformat.ltx", "main.tex",
+            ],
+            cwd=src_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+        )
+        built = Path(tmp) / f"{job}.fmt"
+        if proc.returncode != 0 or not built.exists():
+            failed.write_text(proc.stdout, encoding="utf-8")
+            print(f"[WARN] Could not dump the preamble format (log: {failed}); building without it", file=sys.stderr)
+            return None
+        os.replace(built, fmt_dir / f"{job}.fmt")
+    for old in fmt_dir.glob("preamble-*"):
+        if old.stem != job:
+            old.unlink(missing_ok=True)
+    print(f"[OK] Dumped preamble format {fmt_dir / job}.fmt", file=sys.stderr)
+    return job
+
+
+def latexmk_args(job: str) -> list[str]:
+    # Overrides the lualatex rule from latexmkrc; TEXFORMATS must include build/fmt.
+    return [f"-pdflatex=pdflatex -fmt={job} -file-line-error -synctex=1 %O %S"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Dump (when needed) the preamble format and print its name; prints nothing if unavailable."
+    )
+    parser.parse_args()
+    job = ensure_format(Path(__file__).resolve().parents[1])
+    if job:
+        print(job)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+"""
+
+
 WATCH_SH = """#!/usr/bin/env bash
 set -euo pipefail
 
 NAME="${1:?base name required, e.g. paper}"
 ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
-SRC_DIR="${ROOT_DIR}/src"
-BUILD_DIR="${ROOT_DIR}/build"
-OUT_PDF="${ROOT_DIR}/../${NAME}.pdf"
-MD_PATH="${ROOT_DIR}/../${NAME}.md"
 PROJECT_ROOT="${ROOT_DIR}/.."
 
-mkdir -p "${BUILD_DIR}"
-
-echo "[INFO] Watching LaTeX sources; PDF will be copied to: ${OUT_PDF}"
-echo "[INFO] Stop with Ctrl+C"
-
 # Preflight: ensure required tooling exists before entering watch loop.
 if [[ -x "${PROJECT_ROOT}/doctor.sh" ]]; then
   "${PROJECT_ROOT}/doctor.sh" --quiet
 fi
 
-# If the paired Markdown exists, keep meta/content/abstract in sync by polling
-# mtime (works without extra tools like fswatch/entr).
-(
-  last_md_mtime=""
-  while true; do
-    if [[ -f "${MD_PATH}" ]]; then
-      mtime="$(stat -f "%m" "${MD_PATH}" 2>/dev/null || true)"
-      if [[ -n "${mtime}" && "${mtime}" != "${last_md_mtime}" ]]; then
-        if command -v rumdl >/dev/null 2>&1; then
-          rumdl check "${PROJECT_ROOT}" || true
-        fi
-        python3 "${ROOT_DIR}/scripts/sync_md_to_tex.py" "${MD_PATH}" "${SRC_DIR}" || true
-        last_md_mtime="${mtime}"
-        echo "[OK] Synced ${MD_PATH} -> ${SRC_DIR}"
-      fi
-    fi
-    sleep 0.5
-  done
-) &
-SYNC_PID=$!
-
-# latexmk -pvc runs continuously. We copy the PDF after each successful build
-# using a background loop that checks the mtime.
-(
-  last_mtime=""
-  while true; do
-    if [[ -f "${BUILD_DIR}/${NAME}.pdf" ]]; then
-      mtime="$(stat -f "%m" "${BUILD_DIR}/${NAME}.pdf" 2>/dev/null || true)"
-      if [[ -n "${mtime}" && "${mtime}" != "${last_mtime}" ]]; then
-        cp -f "${BUILD_DIR}/${NAME}.pdf" "${OUT_PDF}"
-        echo "[OK] Updated ${OUT_PDF}"
-        last_mtime="${mtime}"
-      fi
-    fi
-    sleep 0.5
-  done
-) &
-COPIER_PID=$!
-trap 'kill "${SYNC_PID}" 2>/dev/null || true; kill "${COPIER_PID}" 2>/dev/null || true' EXIT
+WATCH_FLAGS=""
+if [[ "${STENOGRAPHER_SPLIT_SECTIONS:-0}" == "1" ]]; then
+  WATCH_FLAGS="--split-sections"
+fi
 
-latexmk \\
-  -r "${SRC_DIR}/latexmkrc" \\
-  -cd \\
-  -pdf \\
-  -f \\
-  -pvc \\
-  -outdir="${BUILD_DIR}" \\
-  -jobname="${NAME}" \\
-  "${SRC_DIR}/main.tex"
+# Event-driven (inotify, polling fallback): syncs Markdown in-process, runs
+# latexmk once per debounced change and copies the PDF when it finishes.
+exec python3 "${ROOT_DIR}/scripts/watch.py" "${NAME}" ${WATCH_FLAGS}
+"""
+
+
+WATCH_PY = r"""#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import importlib.util
+import os
+import select
+import shutil
+import signal
+import struct
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+
+
+# inotify(7) event bits
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+# Files under src/ that feed the LaTeX build.
+SRC_SUFFIXES = {".tex", ".bib", ".sty", ".cls"}
+
+
+class InotifyWatcher:
+    def __init__(self, dirs: list[Path]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, Path] = {}
+        for d in dirs:
+            self.add(d)
+
+    def add(self, d: Path) -> None:
+        if not d.is_dir() or d in self.dirs.values():
+            return
+        wd = self._add(self.fd, os.fsencode(d), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {d}")
+        self.dirs[wd] = d
+
+    def wait(self, timeout: float | None) -> set[Path] | None:
+        # Changed paths, or None when the kernel queue overflowed (rescan all).
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[Path] = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos : pos + length].rstrip(b"\0")
+            pos += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if wd in self.dirs and name:
+                changed.add(self.dirs[wd] / os.fsdecode(name))
+        return changed
+
+
+class PollingWatcher:
+    # Fallback for systems without inotify: stat() in-process, no forks.
+    def __init__(self, dirs: list[Path], interval: float) -> None:
+        self.dirs = list(dirs)
+        self.interval = interval
+        self.state = self._scan()
+
+    def add(self, d: Path) -> None:
+        if d.is_dir() and d not in self.dirs:
+            self.dirs.append(d)
+            self.state.update(self._scan_dir(d))
+
+    def _scan_dir(self, d: Path) -> dict[Path, tuple[int, int]]:
+        out: dict[Path, tuple[int, int]] = {}
+        try:
+            for e in os.scandir(d):
+                if e.is_file():
+                    st = e.stat()
+                    out[Path(e.path)] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+        return out
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        out: dict[Path, tuple[int, int]] = {}
+        for d in self.dirs:
+            out.update(self._scan_dir(d))
+        return out
+
+    def wait(self, timeout: float | None) -> set[Path] | None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+            new = self._scan()
+            changed = {p for p in set(new) | set(self.state) if new.get(p) != self.state.get(p)}
+            self.state = new
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+
+def load_script(scripts_dir: Path, name: str) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(name, scripts_dir / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def citations_current(src_dir: Path, build_dir: Path, name: str) -> bool:
+    # Same cited keys and bib entries as the last successful build, and its .bbl is still there.
+    try:
+        current = (src_dir / ".citations").read_bytes()
+        return current == (build_dir / f".{name}.citations").read_bytes() and (build_dir / f"{name}.bbl").exists()
+    except FileNotFoundError:
+        return False
+
+
+def src_state(src_dir: Path) -> dict[Path, tuple[int, int]]:
+    out: dict[Path, tuple[int, int]] = {}
+    for d in (src_dir, src_dir / "sections"):
+        try:
+            for e in os.scandir(d):
+                if e.is_file() and (Path(e.name).suffix in SRC_SUFFIXES or e.name == "latexmkrc"):
+                    st = e.stat()
+                    out[Path(e.path)] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Watch <name>.md and src/, sync and rebuild the PDF on change.")
+    parser.add_argument("name", help="Base name, e.g. paper")
+    parser.add_argument("--split-sections", action="store_true", help="Pass --split-sections to the Markdown sync")
+    parser.add_argument("--debounce", type=float, default=0.25, help="Quiet period before acting on a burst of saves (s)")
+    parser.add_argument("--poll", type=float, default=0.5, help="Polling interval when inotify is unavailable (s)")
+    parser.add_argument("--no-inotify", action="store_true", help="Force the polling watcher")
+    parser.add_argument(
+        "--fast-preamble",
+        action="store_true",
+        default=os.environ.get("STENOGRAPHER_FAST_PREAMBLE") == "1",
+        help="Compile with pdfLaTeX from a precompiled preamble format (env STENOGRAPHER_FAST_PREAMBLE=1)",
+    )
+    args = parser.parse_args()
+
+    root_dir = Path(__file__).resolve().parents[1]
+    project_root = root_dir.parent
+    src_dir = root_dir / "src"
+    build_dir = root_dir / "build"
+    md_path = project_root / f"{args.name}.md"
+    out_pdf = project_root / f"{args.name}.pdf"
+    build_pdf = build_dir / f"{args.name}.pdf"
+    build_dir.mkdir(parents=True, exist_ok=True)
+
+    sync = load_script(root_dir / "scripts", "sync_md_to_tex")
+    preamble_fmt = None
+    if args.fast_preamble and (root_dir / "scripts" / "preamble_fmt.py").exists():
+        preamble_fmt = load_script(root_dir / "scripts", "preamble_fmt")
+        os.environ["TEXFORMATS"] = f"{build_dir / 'fmt'}:{os.environ.get('TEXFORMATS', '')}"
+    rumdl = shutil.which("rumdl")
+    dirs = [project_root, src_dir, src_dir / "sections"]
+    watcher: InotifyWatcher | PollingWatcher
+    try:
+        if args.no_inotify or not sys.platform.startswith("linux"):
+            raise OSError("inotify disabled")
+        watcher = InotifyWatcher(dirs)
+        mode = "inotify"
+    except (OSError, AttributeError):
+        watcher = PollingWatcher(dirs, args.poll)
+        mode = f"polling every {args.poll}s"
+
+    print(f"[INFO] Watching {md_path.name} and {src_dir} ({mode}); PDF will be copied to: {out_pdf}")
+    print("[INFO] Stop with Ctrl+C")
+
+    latexmk: subprocess.Popen[bytes] | None = None
+
+    def stop(_signum: int, _frame: object) -> None:
+        if latexmk and latexmk.poll() is None:
+            latexmk.terminate()
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    def sync_md() -> None:
+        if not md_path.exists():
+            return
+        if rumdl:
+            subprocess.run([rumdl, "check", str(md_path)], check=False)
+        try:
+            changed = sync.sync(md_path, src_dir, split=args.split_sections)
+        except Exception as e:
+            print(f"[WARN] Sync failed: {e}", file=sys.stderr)
+            return
+        watcher.add(src_dir / "sections")
+        if changed:
+            print(f"[OK] Synced {md_path} -> {src_dir} ({len(changed)} file(s) changed)")
+
+    def build() -> None:
+        nonlocal latexmk
+        started = time.monotonic()
+        # Re-checked every pass: a preamble edit re-dumps the format first.
+        job = preamble_fmt.ensure_format(root_dir) if preamble_fmt else None
+        engine = preamble_fmt.latexmk_args(job) if job else []
+        # .bib edits do not go through sync, so refresh the citation fingerprint here.
+        sync.write_citations(src_dir)
+        if citations_current(src_dir, build_dir, args.name):
+            engine.append("-bibtex-")
+        try:
+            latexmk = subprocess.Popen(
+                [
+                    "latexmk",
+                    "-r", str(src_dir / "latexmkrc"),
+                    *engine,
+                    "-cd",
+                    "-pdf",
+                    "-f",
+                    f"-outdir={build_dir}",
+                    f"-jobname={args.name}",
+                    str(src_dir / "main.tex"),
+                ]
+            )
+        except FileNotFoundError:
+            print("[FAIL] latexmk not found in PATH", file=sys.stderr)
+            return
+        status = latexmk.wait()
+        latexmk = None
+        cites_built = build_dir / f".{args.name}.citations"
+        if status == 0 and (src_dir / ".citations").exists():
+            shutil.copyfile(src_dir / ".citations", cites_built)
+        elif status != 0:
+            cites_built.unlink(missing_ok=True)
+        if build_pdf.exists():
+            shutil.copyfile(build_pdf, out_pdf)
+            print(f"[OK] Updated {out_pdf} ({time.monotonic() - started:.1f}s)")
+        if status != 0:
+            print(f"[WARN] latexmk exited with {status}", file=sys.stderr)
+
+    sync_md()
+    built = src_state(src_dir)
+    build()
+
+    while True:
+        changed = watcher.wait(None)
+        if changed is not None and not changed:
+            continue
+        # Debounce: editors often write a file several times per save.
+        while True:
+            more = watcher.wait(args.debounce)
+            if more is None:
+                changed = None
+            elif not more:
+                break
+            elif changed is not None:
+                changed |= more
+
+        if changed is None or md_path in changed:
+            sync_md()
+        # Rebuild only if an input differs from what the last build saw; this
+        # also swallows the events caused by our own sync writes.
+        current = src_state(src_dir)
+        if current != built:
+            built = current
+            build()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
 """
 
 
@@ -421,15 +1201,76 @@ echo "[OK] Cleaned ${BUILD_DIR}"
 SYNC_PY = r"""#!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+import functools
+import hashlib
+import json
+import os
 import re
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
-
-
-def escape_tex(text: str) -> str:
-    # Keep this conservative: escape only characters that commonly break LaTeX.
-    # Allow backslashes so users can write raw LaTeX when needed.
-    replacements = {
+from typing import Any, Iterator
+
+
+# Opt-in profiling (--profile, STENOGRAPHER_PROFILE=1, STENOGRAPHER_TRACE=FILE):
+# per-stage wall/CPU time and peak RSS, optionally appended to a Chrome trace.
+PROFILE = os.environ.get("STENOGRAPHER_PROFILE") == "1" or bool(os.environ.get("STENOGRAPHER_TRACE"))
+TRACE = os.environ.get("STENOGRAPHER_TRACE") or ""
+SPANS: list[dict[str, Any]] | None = None  # collected only when run as a script
+
+
+@functools.lru_cache(maxsize=None)
+def add_reference() -> Any:
+    # add_reference.py ships next to this script and owns the trace writer (one
+    # "[" header, flock'd appends) and the RSS probe. Loaded only when profiling.
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("add_reference", Path(__file__).with_name("add_reference.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules.setdefault("add_reference", module)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[dict[str, Any]]:
+    if not PROFILE:
+        yield args
+        return
+    ts = time.time_ns() // 1000
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield args
+    finally:
+        rec = {
+            "name": name,
+            "wall_ms": round((time.perf_counter() - wall) * 1000, 3),
+            "cpu_ms": round((time.process_time() - cpu) * 1000, 3),
+            "peak_rss_kb": add_reference().peak_rss_kb(),
+        }
+        if SPANS is not None:
+            SPANS.append(rec)
+        if TRACE:
+            event = {
+                "name": name,
+                "cat": "sync_md_to_tex",
+                "ph": "X",
+                "ts": ts,
+                "dur": round(rec["wall_ms"] * 1000),
+                "pid": os.getpid(),
+                "tid": os.getpid(),
+                "args": {**args, "cpu_ms": rec["cpu_ms"], "peak_rss_kb": rec["peak_rss_kb"]},
+            }
+            add_reference().append_trace(Path(TRACE), [event])
+
+
+# Conservative escaping: only characters that commonly break LaTeX. Backslashes
+# and braces pass through so users can write raw LaTeX when needed.
+TEX_ESCAPE = str.maketrans(
+    {
         "&": r"\&",
         "%": r"\%",
         "#": r"\#",
@@ -437,34 +1278,113 @@ def escape_tex(text: str) -> str:
         "~": r"\textasciitilde{}",
         "^": r"\textasciicircum{}",
     }
-    out = []
-    for ch in text:
-        out.append(replacements.get(ch, ch))
-    return "".join(out)
+)
+# Code spans are literal, so backslashes and braces are escaped too.
+CODE_ESCAPE = str.maketrans(
+    {
+        "\\": r"\textbackslash{}",
+        "{": r"\{",
+        "}": r"\}",
+        "$": r"\$",
+        "&": r"\&",
+        "%": r"\%",
+        "#": r"\#",
+        "_": r"\_",
+        "~": r"\textasciitilde{}",
+        "^": r"\textasciicircum{}",
+    }
+)
+# hyperref takes URLs almost verbatim; only these would end the argument early.
+URL_ESCAPE = str.maketrans({"%": r"\%", "#": r"\#"})
 
 
-LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
-CODE_RE = re.compile(r"`([^`]+)`")
-BIBKEY_RE = re.compile(r"\[@([A-Za-z0-9:_-]+)\]")
+def escape_tex(text: str) -> str:
+    return text.translate(TEX_ESCAPE)
+
+
+CITE_KEY = r"[A-Za-z0-9:_.-]+"
+INLINE_RE = re.compile(
+    r"(?P<code>`+)(?P<code_body>.+?)(?P=code)"
+    r"|(?P<texcmd>\\(?:[a-z]*cite[a-z]*|[a-z]*ref|label|url|input|include)\*?\{[^{}]*\})"
+    r"|(?P<texesc>\\[&%#_$])"
+    r"|(?P<math>\$[^$\n]+\$)"
+    rf"|\[(?P<cite>@{CITE_KEY}(?:\s*;\s*@{CITE_KEY})*)\]"
+    r"|\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)\s]+)\)"
+    r"|\*\*\*(?P<strong_em>[^\s*](?:.*?[^\s\\*])??)\*\*\*"
+    r"|\*\*(?P<strong>.+?)\*\*"
+    r"|\*(?P<em>[^\s*](?:.*?[^\s\\*])??)\*(?!\*)"
+    r"|_(?P<em_>[^\s_](?:.*?[^\s\\_])??)_(?!\w)"
+)
+# Every alternative starts with one of these characters: plain text is skipped
+# with a cheap charset scan and INLINE_RE is only tried where a span can start.
+# The left-boundary rules for emphasis are checked in the loop.
+TRIGGER_RE = re.compile(r"[`\\$\[*_]")
+EM_BLOCKERS = {"em": "*", "em_": "\\"}
 
 
 def inline_md_to_tex(s: str) -> str:
-    s = LINK_RE.sub(lambda m: rf"\href{{{m.group(2)}}}{{{escape_tex(m.group(1))}}}", s)
-    s = BIBKEY_RE.sub(lambda m: rf"\cite{{{m.group(1)}}}", s)
-    s = CODE_RE.sub(lambda m: rf"\texttt{{{escape_tex(m.group(1))}}}", s)
-    s = s.replace("**", "")  # keep simple; author can refine in LaTeX directly
-    return escape_tex(s)
+    # Single pass: each span is converted exactly once and plain text between
+    # spans is escaped exactly once, so cite keys and URLs are never mangled.
+    t = TRIGGER_RE.search(s)
+    if not t:
+        return s.translate(TEX_ESCAPE)
+    out: list[str] = []
+    pos = 0
+    while t:
+        m = INLINE_RE.match(s, t.start())
+        t = TRIGGER_RE.search(s, t.start() + 1)
+        if not m:
+            continue
+        kind = m.lastgroup
+        if kind in EM_BLOCKERS and m.start() > 0:
+            prev = s[m.start() - 1]
+            if prev.isalnum() or prev == "_" or prev == EM_BLOCKERS[kind]:
+                # Intraword * or _ (snake_case, 2*3*4) is plain text.
+                continue
+        if pos < m.start():
+            out.append(s[pos : m.start()].translate(TEX_ESCAPE))
+        pos = m.end()
+        if t and t.start() < pos:
+            t = TRIGGER_RE.search(s, pos)
+        if kind == "code_body":
+            out.append(r"\texttt{" + m.group("code_body").strip().translate(CODE_ESCAPE) + "}")
+        elif kind in ("texcmd", "texesc", "math"):
+            out.append(m.group(kind))
+        elif kind == "cite":
+            keys = [k.strip().lstrip("@") for k in m.group("cite").split(";")]
+            out.append(r"\cite{" + ",".join(keys) + "}")
+        elif kind == "link_url":
+            out.append(
+                r"\href{" + m.group("link_url").translate(URL_ESCAPE) + "}{" + inline_md_to_tex(m.group("link_text")) + "}"
+            )
+        elif kind == "strong_em":
+            out.append(r"\textbf{\emph{" + inline_md_to_tex(m.group("strong_em")) + "}}")
+        elif kind == "strong":
+            out.append(r"\textbf{" + inline_md_to_tex(m.group("strong")) + "}")
+        else:
+            out.append(r"\emph{" + inline_md_to_tex(m.group(kind)) + "}")
+    out.append(s[pos:].translate(TEX_ESCAPE))
+    return "".join(out)
+
+
+BODY_START_RE = re.compile(r"^## (?:1\.|1 |Introduction)")
+ENUM_RE = re.compile(r"^\d+\.\s+")
+HEADING_NUM_RE = re.compile(r"^\d+\.\s*")
 
 
 def convert(md: str) -> tuple[str, str, str, str]:
-    lines = md.splitlines()
+    # Single pass over the Markdown: title/author come from the first 30 lines,
+    # the abstract is the first "## Abstract" section, and the body runs from
+    # the first "## 1." / "## Introduction" heading up to "## References".
     title = ""
     author = ""
     abstract_lines: list[str] = []
-
     content_lines: list[str] = []
 
-    i = 0
+    in_abstract = False
+    abstract_done = False
+    in_body = False
+    body_done = False
     in_code = False
     code_lang = ""
     buf_list: list[str] = []
@@ -481,31 +1401,33 @@ def convert(md: str) -> tuple[str, str, str, str]:
         buf_list = []
         list_kind = None
 
-    # Parse title and lightweight author from the default template
-    for raw in lines[:30]:
-        if raw.startswith("# "):
-            title = raw[2:].strip()
-        if raw.strip().lower().startswith("*author"):
-            author = raw.split(":", 1)[-1].strip().strip("*").strip()
-
-    # Extract abstract block from markdown template: under "## Abstract" until next "## "
-    in_abstract = False
-    for raw in lines:
-        if raw.startswith("## Abstract"):
-            in_abstract = True
-            continue
-        if in_abstract and raw.startswith("## "):
+    for i, raw in enumerate(md.splitlines()):
+        if i < 30:
+            if raw.startswith("# "):
+                title = raw[2:].strip()
+            if raw.strip().lower().startswith("*author"):
+                author = raw.split(":", 1)[-1].strip().strip("*").strip()
+        elif abstract_done and body_done:
             break
-        if in_abstract:
-            abstract_lines.append(raw)
 
-    # Convert the rest to LaTeX content. Keep it simple and robust.
-    in_body = False
-    for raw in lines:
-        if raw.startswith("## 1.") or raw.startswith("## Introduction") or raw.startswith("## 1 "):
+        if not abstract_done:
+            if in_abstract and raw.startswith("## "):
+                in_abstract = False
+                abstract_done = True
+            elif in_abstract:
+                abstract_lines.append(raw)
+                continue
+            elif raw.startswith("## Abstract"):
+                in_abstract = True
+                continue
+
+        if body_done:
+            continue
+        if BODY_START_RE.match(raw):
             in_body = True
         if raw.startswith("## References"):
-            break
+            body_done = True
+            continue
         if not in_body:
             continue
 
@@ -545,19 +1467,18 @@ def convert(md: str) -> tuple[str, str, str, str]:
             continue
         if line.startswith("## "):
             flush_list()
-            heading = line[3:].strip()
             # Strip leading numbering like "1. " to keep LaTeX clean
-            heading = re.sub(r"^\d+\.\s*", "", heading)
+            heading = HEADING_NUM_RE.sub("", line[3:].strip())
             content_lines.append(r"\section{" + inline_md_to_tex(heading) + "}")
             continue
         if line.startswith("# "):
             continue  # title handled separately
 
-        if re.match(r"^\d+\.\s+", line):
+        if ENUM_RE.match(line):
             if list_kind not in (None, "enumerate"):
                 flush_list()
             list_kind = "enumerate"
-            buf_list.append(re.sub(r"^\d+\.\s+", "", line).strip())
+            buf_list.append(ENUM_RE.sub("", line).strip())
             continue
         if line.startswith("- "):
             if list_kind not in (None, "itemize"):
@@ -579,25 +1500,160 @@ def convert(md: str) -> tuple[str, str, str, str]:
     return title_tex, author_tex, abstract_tex, content_tex
 
 
-def main() -> int:
-    if len(sys.argv) != 3:
-        print("usage: sync_md_to_tex.py <paper.md> <latex_src_dir>")
-        return 2
+def split_sections(content_tex: str) -> tuple[str, list[str]]:
+    # Split at top-level \section lines (outside verbatim blocks); returns the
+    # preamble before the first section and one chunk per section.
+    head: list[str] = []
+    sections: list[list[str]] = []
+    in_verbatim = False
+    for line in content_tex.splitlines():
+        if line.startswith(r"\begin{verbatim}"):
+            in_verbatim = True
+        elif line.startswith(r"\end{verbatim}"):
+            in_verbatim = False
+        elif not in_verbatim and line.startswith(r"\section{"):
+            sections.append([])
+        (sections[-1] if sections else head).append(line)
+    return "\n".join(head).strip(), ["\n".join(chunk).strip() for chunk in sections]
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    # Leave the file (and its mtime) alone when the content is unchanged, so
+    # latexmk does not rebuild; otherwise replace it atomically.
+    data = text.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+CITE_RE = re.compile(r"\\[A-Za-z]*cite[A-Za-z]*\*?(?:\[[^\]]*\])*\{([^{}]*)\}")
+BIBRES_RE = re.compile(r"\\(?:addbibresource|bibliography)(?:\[[^\]]*\])?\{([^{}]*)\}")
+BIB_ENTRY_RE = re.compile(r"^[ \t]*@(\w+)[ \t]*[{(][ \t]*([^,\s]*)", re.MULTILINE)
+BIB_LINK_RE = re.compile(r"\b(?:crossref|xref|xdata)\s*=\s*[{\"]?([^,}\"]+)", re.IGNORECASE)
+TEX_COMMENT_RE = re.compile(r"(?<!\\)%.*")
+
+
+def citation_fingerprint(src_dir: Path) -> dict[str, Any]:
+    # What biber's output depends on: the cited keys in order (\nocite{*} means every
+    # entry), the bib entries they resolve to, and the preamble (biblatex options).
+    keys: dict[str, None] = {}
+    bibs: dict[Path, None] = {}
+    preamble = ""
+    for path in sorted(src_dir.glob("*.tex")) + sorted((src_dir / "sections").glob("*.tex")):
+        text = TEX_COMMENT_RE.sub("", path.read_text(encoding="utf-8", errors="replace"))
+        if path.name == "preamble.tex":
+            preamble = text
+        for m in CITE_RE.finditer(text):
+            keys.update((k.strip(), None) for k in m.group(1).split(",") if k.strip())
+        for m in BIBRES_RE.finditer(text):
+            for name in m.group(1).split(","):
+                name = name.strip()
+                if name:
+                    bibs[src_dir / (name if name.endswith(".bib") else name + ".bib")] = None
+
+    h = hashlib.sha256(json.dumps(list(keys)).encode("utf-8") + b"\0" + preamble.encode("utf-8"))
+    for bib in bibs:
+        try:
+            data = bib.read_text(encoding="utf-8", errors="replace")
+        except FileNotFoundError:
+            h.update(f"\0{bib.name}\0missing".encode("utf-8"))
+            continue
+        h.update(f"\0{bib.name}\0".encode("utf-8"))
+        if "*" in keys:
+            h.update(data.encode("utf-8"))
+            continue
+        entries: dict[str, str] = {}
+        starts = list(BIB_ENTRY_RE.finditer(data))
+        for i, m in enumerate(starts):
+            block = data[m.start() : starts[i + 1].start() if i + 1 < len(starts) else len(data)]
+            kind = m.group(1).lower()
+            if kind in ("string", "preamble"):
+                h.update(block.encode("utf-8"))
+            elif kind != "comment":
+                entries.setdefault(m.group(2), block)
+        # Cited entries plus whatever they inherit from (crossref/xref/xdata).
+        pending = list(keys)
+        seen: set[str] = set()
+        while pending:
+            key = pending.pop(0)
+            if key in seen:
+                continue
+            seen.add(key)
+            block = entries.get(key, "")
+            h.update(f"\0{key}\0{block}".encode("utf-8"))
+            pending += [m.group(1).strip() for m in BIB_LINK_RE.finditer(block)]
+    return {"digest": h.hexdigest(), "keys": list(keys)}
+
+
+def write_citations(src_dir: Path) -> bool:
+    # src/.citations: compared by build.sh/watch.py with the copy saved after the last
+    # successful build to decide whether biber has to run.
+    fingerprint = citation_fingerprint(src_dir)
+    return write_if_changed(src_dir / ".citations", json.dumps(fingerprint, ensure_ascii=False) + "\n")
+
+
+def sync(md_path: Path, src_dir: Path, split: bool = False) -> list[Path]:
+    # Regenerate meta/abstract/content (and sections/ when split) from the
+    # Markdown; returns the files that actually changed.
+    with span("sync.read"):
+        md = md_path.read_text(encoding="utf-8")
+    with span("sync.convert", bytes=len(md)):
+        title, author, abstract_tex, content_tex = convert(md)
+
+    outputs: dict[Path, str] = {
+        src_dir / "meta.tex": "\\title{" + escape_tex(title) + "}\n"
+        "\\author{" + escape_tex(author) + "}\n"
+        "\\date{\\today}\n",
+        src_dir / "abstract.tex": abstract_tex + "\n",
+    }
+    sections_dir = src_dir / "sections"
+    if split:
+        head, chunks = split_sections(content_tex)
+        sections_dir.mkdir(exist_ok=True)
+        inputs = [head] if head else []
+        for n, chunk in enumerate(chunks, start=1):
+            outputs[sections_dir / f"{n:02d}.tex"] = chunk + "\n"
+            inputs.append(f"\\input{{sections/{n:02d}}}")
+        outputs[src_dir / "content.tex"] = "\n".join(inputs) + "\n"
+        keep = {p.name for p in outputs if p.parent == sections_dir}
+        for stale in sections_dir.glob("*.tex"):
+            if stale.name not in keep:
+                stale.unlink()
+    else:
+        outputs[src_dir / "content.tex"] = content_tex + "\n"
 
-    md_path = Path(sys.argv[1]).resolve()
-    src_dir = Path(sys.argv[2]).resolve()
+    with span("sync.write", files=len(outputs)) as sp:
+        changed = [path for path, text in outputs.items() if write_if_changed(path, text)]
+        sp["changed"] = len(changed)
+    with span("sync.citations"):
+        write_citations(src_dir)
+    return changed
 
-    md = md_path.read_text(encoding="utf-8")
-    title, author, abstract_tex, content_tex = convert(md)
 
-    (src_dir / "meta.tex").write_text(
-        "\\title{" + escape_tex(title) + "}\n"
-        "\\author{" + escape_tex(author) + "}\n"
-        "\\date{\\today}\n",
-        encoding="utf-8",
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sync <paper.md> into LaTeX meta/abstract/content files.")
+    parser.add_argument("md_path", help="Markdown draft, e.g. paper.md")
+    parser.add_argument("src_dir", help="LaTeX src/ directory to write into")
+    parser.add_argument(
+        "--split-sections",
+        action="store_true",
+        help="Write each \\section into src/sections/NN.tex and make content.tex a list of \\input lines",
     )
-    (src_dir / "abstract.tex").write_text(abstract_tex + "\n", encoding="utf-8")
-    (src_dir / "content.tex").write_text(content_tex + "\n", encoding="utf-8")
+    parser.add_argument("--profile", action="store_true", help="Print per-stage timing as JSON on stderr")
+    args = parser.parse_args()
+
+    global PROFILE, SPANS
+    PROFILE = PROFILE or args.profile
+    SPANS = [] if PROFILE else None
+    sync(Path(args.md_path).resolve(), Path(args.src_dir).resolve(), split=args.split_sections)
+    if SPANS is not None:
+        print(json.dumps({"profile": {"stages": SPANS, "peak_rss_kb": add_reference().peak_rss_kb()}}), file=sys.stderr)
     return 0
 
 
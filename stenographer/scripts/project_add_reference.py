@@ -3,16 +3,44 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import functools
+import hashlib
+import importlib.util
+import io
 import json
 import os
+import queue
 import re
 import shutil
+import signal
+import stat
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from html.parser import HTMLParser
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, TextIO
 from urllib.parse import urlparse
 
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+def _default_file_mode() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+FILE_MODE = _default_file_mode()
+
+# Linux ioctl that clones a file's extents (btrfs, XFS, bcachefs, OCFS2).
+FICLONE = 0x40049409
+
 
 def now_utc_iso() -> str:
     return dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -44,26 +72,638 @@ def run(
     )
 
 
-def fetch_bytes(url: str) -> tuple[bytes, str]:
+@functools.lru_cache(maxsize=None)
+def optional_module(name: str) -> Any:
+    # Import an optional backend once per process; None when unavailable.
+    try:
+        return importlib.import_module(name)
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def tool_path(name: str) -> str | None:
+    return shutil.which(name)
+
+
+def peak_rss_kb() -> int:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - non-POSIX
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def _children_cpu() -> float:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - non-POSIX
+        return 0.0
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+
+def append_trace(path: Path, events: list[dict[str, Any]]) -> None:
+    # Chrome trace-event "JSON Array Format": the closing bracket is optional,
+    # so events from several processes (build.sh, sync, add_reference) can be
+    # appended to one file. Loads in chrome://tracing, Perfetto and speedscope.
+    data = "".join(json.dumps(e, ensure_ascii=False) + ",\n" for e in events)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    init_trace(path)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    try:
+        try:
+            import fcntl
+
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except ImportError:  # pragma: no cover - non-POSIX
+            pass
+        os.write(fd, data.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def init_trace(path: Path) -> None:
+    # Write the "[" header exactly once and before any event, however many
+    # processes share the trace: link(2) publishes it only if the file does not
+    # exist yet (exclusive create where hard links are unsupported).
+    if path.exists():
+        return
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        os.fchmod(fd, FILE_MODE)
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"[\n")
+        try:
+            os.link(tmp_name, path)
+        except FileExistsError:
+            pass
+        except OSError:
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, FILE_MODE)
+            except FileExistsError:
+                return
+            os.write(fd, b"[\n")
+            os.close(fd)
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+class Profiler:
+    """Opt-in per-stage timing (``--profile`` / ``STENOGRAPHER_PROFILE=1``).
+
+    Each span records wall time, this thread's CPU time, CPU of waited child
+    processes (curl, pandoc, pdftotext, uv) and peak RSS. Spans recorded while
+    ``collect()`` is active on a thread are summarised into that job's JSON
+    result; with a trace path (``--trace`` / ``STENOGRAPHER_TRACE``) every span
+    is also appended to a Chrome trace file.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.trace_path: Path | None = None
+        self.local = threading.local()
+        self.carried: list[dict[str, Any]] = []
+
+    def configure(self, enabled: bool, trace_path: str | None) -> None:
+        self.enabled = enabled or bool(trace_path)
+        self.trace_path = Path(trace_path).resolve() if trace_path else None
+        # Spans recorded before ensure_deps re-exec'd into the venv.
+        carried = os.environ.pop("STENOGRAPHER_PROFILE_CARRY", "")
+        if self.enabled and carried:
+            try:
+                self.carried = json.loads(carried)
+            except ValueError:
+                self.carried = []
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[dict[str, Any]]:
+        # Yields the span's args dict so callers can attach results (backend, pages).
+        if not self.enabled:
+            yield args
+            return
+        ts = time.time_ns() // 1000
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        child = _children_cpu()
+        try:
+            yield args
+        finally:
+            rec = {
+                "name": name,
+                "ts": ts,
+                "wall_ms": (time.perf_counter() - wall) * 1000,
+                "cpu_ms": (time.thread_time() - cpu) * 1000,
+                "child_cpu_ms": (_children_cpu() - child) * 1000,
+                "peak_rss_kb": peak_rss_kb(),
+                "args": args,
+            }
+            spans = getattr(self.local, "spans", None)
+            if spans is not None:
+                spans.append(rec)
+            if self.trace_path:
+                event_args = {k: round(rec[k], 3) for k in ("cpu_ms", "child_cpu_ms", "peak_rss_kb")}
+                append_trace(
+                    self.trace_path,
+                    [
+                        {
+                            "name": name,
+                            "cat": "add_reference",
+                            "ph": "X",
+                            "ts": ts,
+                            "dur": round(rec["wall_ms"] * 1000),
+                            "pid": os.getpid(),
+                            "tid": threading.get_native_id(),
+                            "args": {**args, **event_args},
+                        }
+                    ],
+                )
+
+    @contextmanager
+    def collect(self) -> Iterator[list[dict[str, Any]]]:
+        spans: list[dict[str, Any]] = []
+        prev = getattr(self.local, "spans", None)
+        self.local.spans = spans
+        try:
+            yield spans
+        finally:
+            self.local.spans = prev
+
+    def carry(self, env: dict[str, str]) -> None:
+        spans = getattr(self.local, "spans", None)
+        if self.enabled and spans:
+            env["STENOGRAPHER_PROFILE_CARRY"] = json.dumps(spans)
+
+    def summary(self, spans: list[dict[str, Any]]) -> dict[str, Any]:
+        carried, self.carried = self.carried, []
+        stages: dict[str, dict[str, float]] = {}
+        for rec in [*carried, *spans]:
+            st = stages.setdefault(rec["name"], {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0, "child_cpu_ms": 0.0})
+            st["calls"] += 1
+            for k in ("wall_ms", "cpu_ms", "child_cpu_ms"):
+                st[k] += rec[k]
+        for st in stages.values():
+            for k in ("wall_ms", "cpu_ms", "child_cpu_ms"):
+                st[k] = round(st[k], 1)
+        return {"stages": stages, "peak_rss_kb": peak_rss_kb()}
+
+
+PROFILER = Profiler()
+
+
+class OfflineCacheMiss(RuntimeError):
+    pass
+
+
+class DownloadTooLarge(RuntimeError):
+    pass
+
+
+class HttpError(RuntimeError):
+    pass
+
+
+class HttpCache:
+    """On-disk HTTP cache: entries keyed by URL, bodies stored by content hash.
+
+    Layout under ``root``: ``entries/<sha256(url)>.json`` holds the validators
+    (ETag, Last-Modified), Content-Type and the body hash; ``blobs/<sha256(body)>``
+    holds the body. Entries are evicted least-recently-used once the blobs
+    exceed ``max_bytes``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.entries = root / "entries"
+        self.blobs = root / "blobs"
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, url: str) -> Path:
+        return self.entries / (hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def lookup(self, url: str) -> dict[str, Any] | None:
+        try:
+            meta = json.loads(self._entry_path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not (self.blobs / meta.get("sha256", "")).is_file():
+            return None
+        return meta
+
+    def checkout(self, meta: dict[str, Any], dest_dir: Path) -> Path:
+        # Hand out a private path to the cached body that the caller may rename.
+        fd, tmp_name = tempfile.mkstemp(prefix="cached-", dir=dest_dir)
+        os.close(fd)
+        link_or_copy(self.blobs / meta["sha256"], Path(tmp_name))
+        return Path(tmp_name)
+
+    def touch(self, url: str, meta: dict[str, Any]) -> None:
+        meta["used"] = time.time()
+        self._write_entry(url, meta)
+
+    def store(self, url: str, body_path: Path, headers: dict[str, Any]) -> dict[str, Any]:
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        digest = file_sha256(body_path)
+        blob = self.blobs / digest
+        if not blob.exists():
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{digest}.", dir=self.blobs)
+            os.close(fd)
+            link_or_copy(body_path, Path(tmp_name))
+            os.replace(tmp_name, blob)
+        meta = {
+            "url": url,
+            "sha256": digest,
+            "size": str(body_path.stat().st_size),
+            "content_type": headers.get("content-type", ""),
+            "etag": headers.get("etag", ""),
+            "last_modified": headers.get("last-modified", ""),
+            "fetched": now_utc_iso(),
+            # Seconds since the epoch as a float: ISO timestamps tie within a second.
+            "used": time.time(),
+        }
+        self._write_entry(url, meta)
+        self.evict()
+        return meta
+
+    def _write_entry(self, url: str, meta: dict[str, Any]) -> None:
+        self.entries.mkdir(parents=True, exist_ok=True)
+        write_atomic(self._entry_path(url), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def evict(self) -> None:
+        if not self.blobs.exists():
+            return
+        sizes = {e.name: e.stat().st_size for e in os.scandir(self.blobs) if e.is_file()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        entries: list[tuple[float, Path, str]] = []
+        refs: dict[str, int] = {}
+        for e in os.scandir(self.entries):
+            try:
+                meta = json.loads(Path(e.path).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            used = meta.get("used")
+            # Entries from older caches carry an ISO string here; evict them first.
+            entries.append((used if isinstance(used, (int, float)) else 0.0, Path(e.path), meta.get("sha256", "")))
+            refs[meta.get("sha256", "")] = refs.get(meta.get("sha256", ""), 0) + 1
+        for _used, path, digest in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            refs[digest] -= 1
+            if refs[digest] == 0 and digest in sizes:
+                (self.blobs / digest).unlink(missing_ok=True)
+                total -= sizes.pop(digest)
+
+
+class ExtractCache:
+    """Extracted Markdown bodies keyed by the SHA-256 of the source bytes.
+
+    ``<sha256>.md`` holds the body (without the archive front matter) and
+    ``<sha256>.json`` records the format, the backend that produced it, the
+    document's own title and the slug (and title) of the archive entry it was
+    first written to.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def lookup(self, digest: str, fmt: str | None = None) -> dict[str, str] | None:
+        try:
+            meta = json.loads((self.root / f"{digest}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if fmt and meta.get("format") != fmt:
+            return None
+        return meta if (self.root / f"{digest}.md").is_file() else None
+
+    def read_body(self, digest: str) -> str:
+        return (self.root / f"{digest}.md").read_text(encoding="utf-8")
+
+    def copy_body(self, digest: str, out: TextIO) -> None:
+        with (self.root / f"{digest}.md").open("r", encoding="utf-8") as f:
+            shutil.copyfileobj(f, out)
+
+    def store(self, digest: str, meta: dict[str, str], src: Path, offset: int) -> None:
+        # Cache the tail of an already written archive file, starting at `offset`.
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{digest}.", dir=self.root)
+        with os.fdopen(fd, "wb") as dst, src.open("rb") as f:
+            f.seek(offset)
+            shutil.copyfileobj(f, dst)
+        os.replace(tmp_name, self.root / f"{digest}.md")
+        self._write_meta(digest, meta)
+
+    def store_text(self, digest: str, meta: dict[str, str], body: str) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.root / f"{digest}.md", body.encode("utf-8"))
+        self._write_meta(digest, meta)
+
+    def store_pages(self, digest: str, spans: list[tuple[int, int]]) -> None:
+        # Per-page byte spans relative to the start of the cached body.
+        write_atomic(self.root / f"{digest}.pages.json", json.dumps(spans, separators=(",", ":")).encode("utf-8"))
+
+    def read_pages(self, digest: str) -> list[tuple[int, int]] | None:
+        try:
+            return [(a, b) for a, b in json.loads((self.root / f"{digest}.pages.json").read_text(encoding="utf-8"))]
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def update(self, digest: str, fields: dict[str, str]) -> None:
+        meta = self.lookup(digest)
+        if meta is not None:
+            meta.update(fields)
+            self._write_meta(digest, meta)
+
+    def _write_meta(self, digest: str, meta: dict[str, str]) -> None:
+        meta = {"sha256": digest, "created": now_utc_iso(), **meta}
+        write_atomic(self.root / f"{digest}.json", json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+
+def write_page_index(md_path: Path, spans: list[tuple[int, int]] | None, base: int) -> None:
+    # <slug>.pages.json: byte span [start, end) of every PDF page inside <slug>.md
+    # (empty pages have start == end), so readers can mmap the Markdown and slice
+    # one page. md_bytes lets them detect a sidecar that no longer matches.
+    index_path = md_path.with_suffix(".pages.json")
+    if not spans:
+        index_path.unlink(missing_ok=True)
+        return
+    data = {
+        "version": 1,
+        "pages": len(spans),
+        "md_bytes": md_path.stat().st_size,
+        "offsets": [[base + a, base + b] for a, b in spans],
+    }
+    write_atomic(index_path, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def archived_duplicate(
+    refs_dir: Path, cached: dict[str, str] | None, slug: str, digest: str, fmt: str
+) -> tuple[str, str] | None:
+    # Same bytes already archived under another slug, in the same format: link
+    # to that entry instead of writing a second copy. Returns (slug, title) of
+    # that entry; the catalog answers when the extract cache is off or evicted.
+    candidates = [cached] if cached else []
+    candidates += [rec for rec in open_catalog(refs_dir).lookup(digest) if not rec.get("duplicate_of")]
+    for rec in candidates:
+        other = rec.get("slug")
+        if rec.get("format") != fmt:
+            continue
+        if other and other != slug and (refs_dir / f"{other}.md").exists():
+            return other, rec.get("archived_title") or rec.get("title", "")
+    return None
+
+
+def open_http_cache(refs_dir: Path, args: argparse.Namespace) -> HttpCache | None:
+    if args.no_cache:
+        return None
+    return HttpCache(refs_dir / ".cache" / "http", int(args.cache_max_mb * 1024 * 1024))
+
+
+def target_mode(path: Path) -> int:
+    # mkstemp creates 0600 files; keep the target's mode (or the umask default).
+    try:
+        return stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        return FILE_MODE
+
+
+@contextmanager
+def atomic_text(path: Path) -> Iterator[TextIO]:
+    # Streaming counterpart of write_atomic: readers see the old file or the
+    # finished one, and the rename bumps the directory mtime status keys on.
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        os.fchmod(fd, target_mode(path))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yield f
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    mode = target_mode(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+BLOB_DIR = ".blobs"
+
+
+def store_blob(refs_dir: Path, body_path: Path, digest: str) -> Path:
+    # Content-addressed PDF store, References/.blobs/<sha256>.pdf. The download is
+    # renamed in (same filesystem, no copy), or dropped when the bytes are already stored.
+    blobs = refs_dir / BLOB_DIR
+    blobs.mkdir(exist_ok=True)
+    blob = blobs / f"{digest}.pdf"
+    if blob.exists():
+        body_path.unlink()
+    else:
+        os.replace(body_path, blob)
+    return blob
+
+
+def link_into(src: Path, dst: Path) -> None:
+    # Point dst at src's bytes (see link_or_copy), swapped in atomically. rename()
+    # is a no-op when both already name the same inode, so that case returns early.
+    if dst.exists() and os.path.samefile(src, dst):
+        return
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{dst.name}.", dir=dst.parent)
+    os.close(fd)
+    try:
+        link_or_copy(src, Path(tmp_name))
+        os.replace(tmp_name, dst)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def relink_pdfs(refs_dir: Path) -> dict[str, int]:
+    # Migrate References/*.pdf into the blob store (identical files end up as
+    # reflinks of one blob, or read-only hard links to it) and drop blobs no
+    # <slug>.pdf points at any more.
+    blobs = refs_dir / BLOB_DIR
+    blobs.mkdir(exist_ok=True)
+    summary = {"pdfs": 0, "stored": 0, "relinked": 0, "removed": 0, "saved_bytes": 0}
+    with archive_lock(refs_dir):
+        inodes: dict[tuple[int, int], Path] = {}
+        for blob in blobs.glob("*.pdf"):
+            st = blob.stat()
+            inodes[(st.st_dev, st.st_ino)] = blob
+        live: set[Path] = set()
+        for pdf in sorted(refs_dir.glob("*.pdf")):
+            summary["pdfs"] += 1
+            st = pdf.stat()
+            blob = inodes.get((st.st_dev, st.st_ino))
+            if blob is not None and st.st_mode & 0o222:
+                make_read_only(pdf)  # hard-linked before links were made read-only
+            if blob is None:
+                blob = blobs / f"{file_sha256(pdf)}.pdf"
+                if blob.exists():
+                    link_into(blob, pdf)
+                    summary["relinked"] += 1
+                    summary["saved_bytes"] += st.st_size
+                else:
+                    link_into(pdf, blob)
+                    summary["stored"] += 1
+                bst = blob.stat()
+                inodes[(bst.st_dev, bst.st_ino)] = blob
+            live.add(blob)
+        for blob in inodes.values():
+            if blob not in live:
+                blob.unlink(missing_ok=True)
+                summary["removed"] += 1
+    return summary
+
+
+def reflink(src: Path, dst: Path) -> bool:
+    # Copy-on-write clone: blocks are shared until either file is written. False
+    # when the filesystem (or platform) cannot do it; dst is then left absent.
+    if sys.platform == "darwin":
+        import ctypes
+
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+        except (OSError, AttributeError):
+            return False
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - non-POSIX
+        return False
+    try:
+        with src.open("rb") as fsrc, dst.open("xb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+def make_read_only(path: Path) -> None:
+    os.chmod(path, stat.S_IMODE(path.stat().st_mode) & ~0o222)
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    # Replace dst with a reflink of src. Where the filesystem cannot clone, fall
+    # back to a hard link made read-only (an in-place edit of one name would
+    # otherwise rewrite every name sharing the inode), then to a plain copy.
+    dst.unlink(missing_ok=True)
+    if reflink(src, dst):
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+    else:
+        make_read_only(dst)
+
+
+def parse_headers(raw: bytes) -> tuple[int, dict[str, str]]:
+    # `curl -L -D` writes one header block per hop (redirects, 100-continue);
+    # the last block describes the body.
+    status = 0
+    headers: dict[str, str] = {}
+    for block in raw.split(b"\r\n\r\n"):
+        lines = block.decode("iso-8859-1").strip().split("\r\n")
+        if not lines[0].startswith("HTTP/"):
+            continue
+        parts = lines[0].split()
+        status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+    return status, headers
+
+
+def fetch_to_file(
+    url: str,
+    dest_dir: Path,
+    cache: HttpCache | None = None,
+    offline: bool = False,
+    max_bytes: int | None = None,
+) -> tuple[Path, str]:
+    # Stream the body to a private file in dest_dir and return its path; the
+    # caller owns the file and should os.replace() it into place (or unlink it).
+    meta = cache.lookup(url) if cache else None
+    if offline:
+        if not meta:
+            raise OfflineCacheMiss(f"not in cache (offline mode): {url}")
+        cache.touch(url, meta)
+        return cache.checkout(meta, dest_dir), meta["content_type"]
+
+    fd, body_name = tempfile.mkstemp(prefix="download-", dir=dest_dir)
+    os.close(fd)
+    body_path = Path(body_name)
+    # mkstemp creates 0600 files; archived copies should get the usual mode.
+    os.chmod(body_path, FILE_MODE)
+    header_path = body_path.with_name(body_path.name + ".headers")
+
     # Use curl for redirects and reasonable TLS defaults.
-    proc = subprocess.run(
-        ["curl", "-L", "-sS", "-D", "-", url],
-        check=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    raw = proc.stdout
-    header_end = raw.rfind(b"\r\n\r\n")
-    headers = b""
-    body = raw
-    if header_end != -1:
-        headers = raw[:header_end]
-        body = raw[header_end + 4 :]
-    content_type = ""
-    for line in headers.splitlines():
-        if line.lower().startswith(b"content-type:"):
-            content_type = line.split(b":", 1)[1].strip().decode("utf-8", "ignore")
-    return body, content_type
+    cmd = ["curl", "-L", "-sS", "-D", str(header_path), "-o", str(body_path)]
+    if max_bytes:
+        cmd += ["--max-filesize", str(max_bytes)]
+    if meta:
+        if meta.get("etag"):
+            cmd += ["-H", f"If-None-Match: {meta['etag']}"]
+        if meta.get("last_modified"):
+            cmd += ["-H", f"If-Modified-Since: {meta['last_modified']}"]
+    try:
+        proc = subprocess.run([*cmd, url], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        # 63: curl's "maximum file size exceeded".
+        if proc.returncode == 63 or (max_bytes and body_path.stat().st_size > max_bytes):
+            raise DownloadTooLarge(f"response exceeds {max_bytes} bytes: {url}")
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, [*cmd, url], stderr=proc.stderr)
+        status, headers = parse_headers(header_path.read_bytes())
+        # An error page is not the source: never archive (or cache) it.
+        if status >= 400:
+            raise HttpError(f"HTTP {status} for {url}")
+    except BaseException:
+        body_path.unlink(missing_ok=True)
+        raise
+    finally:
+        header_path.unlink(missing_ok=True)
+
+    if cache and meta and status == 304:
+        body_path.unlink(missing_ok=True)
+        cache.touch(url, meta)
+        return cache.checkout(meta, dest_dir), meta["content_type"]
+    if cache and status == 200:
+        cache.store(url, body_path, headers)
+    return body_path, headers.get("content-type", "")
+
+
+def fetch_bytes(url: str, cache: HttpCache | None = None, offline: bool = False) -> tuple[bytes, str]:
+    with tempfile.TemporaryDirectory() as td:
+        body_path, content_type = fetch_to_file(url, Path(td), cache, offline)
+        return body_path.read_bytes(), content_type
+
+
+def read_head(path: Path, n: int = 8) -> bytes:
+    with path.open("rb") as f:
+        return f.read(n)
 
 
 def looks_like_pdf(url: str, content_type: str, body: bytes) -> bool:
@@ -82,127 +722,526 @@ def ensure_dirs(project_root: Path) -> tuple[Path, Path]:
     return refs, tmp
 
 
-def append_index(refs_dir: Path, title: str, slug: str, url: str, bibkey: str | None) -> None:
-    index = refs_dir / "index.md"
-    if not index.exists():
-        index.write_text("# References (local archive)\n\n## Index\n\n", encoding="utf-8")
+# Serializes index.md/references.bib writes between worker threads; the flock on
+# References/.lock extends that to concurrent add_reference.py processes. Both are
+# reentrant for the holding thread (the catalog may first be opened mid-write).
+WRITE_LOCK = threading.RLock()
+_FLOCKED: set[Path] = set()
+
+
+@contextmanager
+def archive_lock(refs_dir: Path) -> Iterator[None]:
+    with WRITE_LOCK:
+        try:
+            import fcntl
+        except ImportError:  # pragma: no cover - non-POSIX
+            yield
+            return
+        if refs_dir in _FLOCKED:
+            yield
+            return
+        with (refs_dir / ".lock").open("a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            _FLOCKED.add(refs_dir)
+            try:
+                yield
+            finally:
+                _FLOCKED.discard(refs_dir)
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+INDEX_HEADER = "# References (local archive)\n\n## Index\n"
+INDEX_LINE_RE = re.compile(
+    r"^- \[(?P<title>.*)\]\(\./(?P<slug>.+?)\.md\) — <(?P<url>[^>]+)>"
+    r"(?: \(`(?P<bibkey>[^`]+)`\))?(?: — retrieved (?P<retrieved>\S+))?\s*$"
+)
+
+
+def split_index(text: str) -> tuple[str, str, str]:
+    # (header through the "## Index" line, the list section, any later sections);
+    # a file without that heading is all list section.
+    m = re.search(r"^## Index[^\n]*\n", text, flags=re.MULTILINE)
+    if not m:
+        return INDEX_HEADER, text, ""
+    body = text[m.end() :]
+    end = re.search(r"^#{1,2} ", body, flags=re.MULTILINE)
+    if not end:
+        return text[: m.end()], body, ""
+    return text[: m.end()], body[: end.start()], body[end.start() :]
+
+
+class Catalog:
+    """Structured archive catalog: ``References/catalog.jsonl``.
+
+    One JSON record per line, keyed by URL (a later line for the same URL
+    replaces the earlier one). Records carry slug, title, bibkey, sha256,
+    format, retrieval time and file sizes, and are indexed in memory by URL,
+    slug, bibkey and sha256. ``index.md`` is rendered from the catalog.
+    """
+
+    LOOKUP_FIELDS = ("slug", "bibkey", "sha256")
+
+    def __init__(self, refs_dir: Path) -> None:
+        self.refs_dir = refs_dir
+        self.path = refs_dir / "catalog.jsonl"
+        self.index_path = refs_dir / "index.md"
+        self.by_url: dict[str, dict[str, str]] = {}
+        self._keys: dict[str, dict[str, list[str]]] = {f: {} for f in self.LOOKUP_FIELDS}
+        self._offset = 0
+        self._lock = threading.Lock()
+        if not self.path.exists():
+            self._import_index()
+        self.refresh()
+
+    def refresh(self) -> None:
+        # Pick up lines appended by other processes since the last read.
+        with self._lock:
+            try:
+                with self.path.open("rb") as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return
+            end = data.rfind(b"\n") + 1  # never consume a partially written line
+            for raw in data[:end].splitlines():
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and rec.get("url"):
+                    self._index(rec)
+            self._offset += end
+
+    def _index(self, rec: dict[str, str]) -> None:
+        self.by_url[rec["url"]] = rec
+        for field in self.LOOKUP_FIELDS:
+            value = rec.get(field)
+            if value:
+                urls = self._keys[field].setdefault(value, [])
+                if rec["url"] not in urls:
+                    urls.append(rec["url"])
+
+    def lookup(self, key: str) -> list[dict[str, str]]:
+        if key in self.by_url:
+            return [self.by_url[key]]
+        found: list[dict[str, str]] = []
+        for field in self.LOOKUP_FIELDS:
+            for url in self._keys[field].get(key, []):
+                rec = self.by_url[url]
+                if rec.get(field) == key and rec not in found:
+                    found.append(rec)
+        return found
 
-    # Ensure the list is preceded by a blank line.
-    existing = index.read_text(encoding="utf-8", errors="ignore")
-    prefix = "" if existing.endswith("\n\n") else "\n"
+    def add(self, rec: dict[str, str]) -> None:
+        # Callers hold archive_lock, so appends from concurrent writers never interleave.
+        self.refresh()
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line)
+        with self._lock:
+            self._index(rec)
+            self._offset += len(line.encode("utf-8"))
 
-    line = f"- [{title}](./{slug}.md) — <{url}>"
+    def render_index(self) -> None:
+        # Regenerate the entries under "## Index"; anything else in that section
+        # (notes, hand-written entries the catalog does not know) is kept verbatim
+        # ahead of the generated list, and later sections are left untouched.
+        try:
+            existing = self.index_path.read_text(encoding="utf-8", errors="ignore")
+        except FileNotFoundError:
+            existing = ""
+        header, body, trailer = split_index(existing)
+        kept = []
+        for raw in body.splitlines():
+            entry = INDEX_LINE_RE.match(raw)
+            if raw.strip() and not (entry and entry.group("url") in self.by_url):
+                kept.append(raw + "\n")
+        lines = []
+        for rec in self.by_url.values():
+            line = f"- [{rec.get('title') or rec['slug']}](./{rec['slug']}.md) — <{rec['url']}>"
+            if rec.get("bibkey"):
+                line += f" (`{rec['bibkey']}`)"
+            if rec.get("retrieved"):
+                line += f" — retrieved {rec['retrieved']}"
+            lines.append(line + "\n")
+        text = header.rstrip("\n") + "\n\n"
+        if kept:
+            text += "".join(kept) + "\n"
+        text += "".join(lines)
+        if trailer:
+            text += "\n" + trailer
+        write_atomic(self.index_path, text.encode("utf-8"))
+
+    def _import_index(self) -> None:
+        # Older projects only have index.md: seed the catalog from its list items.
+        # Locked and atomic, so a concurrent writer never appends to (or reads) a
+        # half-imported catalog, and only the first process imports.
+        if not self.index_path.exists():
+            return
+        with archive_lock(self.refs_dir):
+            if self.path.exists():
+                return
+            try:
+                text = self.index_path.read_text(encoding="utf-8", errors="ignore")
+            except FileNotFoundError:
+                return
+            recs = []
+            for raw in split_index(text)[1].splitlines():
+                m = INDEX_LINE_RE.match(raw)
+                if m:
+                    rec = {k: v for k, v in m.groupdict().items() if v}
+                    pdf = self.refs_dir / f"{rec['slug']}.pdf"
+                    rec["format"] = "pdf" if pdf.exists() else "html"
+                    recs.append(rec)
+            if recs:
+                data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in recs)
+                write_atomic(self.path, data.encode("utf-8"))
+
+
+_CATALOGS: dict[Path, Catalog] = {}
+_CATALOGS_LOCK = threading.Lock()
+
+
+def open_catalog(refs_dir: Path) -> Catalog:
+    with _CATALOGS_LOCK:
+        catalog = _CATALOGS.get(refs_dir)
+        if catalog is None:
+            catalog = _CATALOGS[refs_dir] = Catalog(refs_dir)
+    catalog.refresh()
+    return catalog
+
+
+def append_index(
+    refs_dir: Path,
+    title: str,
+    slug: str,
+    url: str,
+    bibkey: str | None,
+    *,
+    render: bool = True,
+    **fields: str,
+) -> dict[str, str]:
+    # Record the source in the catalog and (unless deferred) re-render index.md.
+    rec = {"url": url, "slug": slug, "title": title, "retrieved": now_utc_iso(), **fields}
     if bibkey:
-        line += f" (`{bibkey}`)"
-    line += f" — retrieved {now_utc_iso()}\n"
-    with index.open("a", encoding="utf-8") as f:
-        f.write(prefix + line)
+        rec["bibkey"] = bibkey
+    catalog = open_catalog(refs_dir)
+    catalog.add(rec)
+    if render:
+        catalog.render_index()
+    return rec
 
 
-def extract_pdf_to_text(pdf_path: Path) -> str:
-    try:
-        import fitz  # type: ignore
-
-        doc = fitz.open(pdf_path)
-        parts: list[str] = []
-        for page in doc:
-            t = (page.get_text("text") or "").strip()
-            if t:
-                parts.append(t)
-        return "\n\n".join(parts) + "\n"
-    except Exception:
-        pass
+# Text backends in order of preference; each page falls back independently.
+PDF_BACKENDS = ("fitz", "pdfplumber", "pypdf", "pdftotext")
+# Pages per work unit handed to the process pool; documents this short are
+# extracted in-process.
+PAGE_CHUNK = 8
 
-    try:
-        import pdfplumber  # type: ignore
-
-        parts = []
-        with pdfplumber.open(str(pdf_path)) as pdf:
-            for p in pdf.pages:
-                t = (p.extract_text() or "").strip()
-                if t:
-                    parts.append(t)
-        return "\n\n".join(parts) + "\n"
-    except Exception:
-        pass
+_PAGE_POOL: ProcessPoolExecutor | None = None
+_PAGE_POOL_LOCK = threading.Lock()
 
-    try:
-        from pypdf import PdfReader  # type: ignore
-
-        reader = PdfReader(str(pdf_path))
-        parts = []
-        for page in reader.pages:
-            t = (page.extract_text() or "").strip()
-            if t:
-                parts.append(t)
-        return "\n\n".join(parts) + "\n"
-    except Exception:
-        pass
 
-    if shutil.which("pdftotext"):
-        with tempfile.TemporaryDirectory() as td:
-            out_txt = Path(td) / "out.txt"
-            subprocess.run(["pdftotext", str(pdf_path), str(out_txt)], check=False)
-            if out_txt.exists():
-                return out_txt.read_text(encoding="utf-8", errors="ignore")
+def page_pool(jobs: int) -> ProcessPoolExecutor:
+    # One pool per process, shared by all batch workers so concurrent ingests
+    # never oversubscribe the CPU.
+    global _PAGE_POOL
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is None:
+            # Imported here: multiprocessing is only needed for page-parallel extraction.
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
 
-    return ""
+            # Batch and service workers are threads: fork() would copy whatever
+            # locks they hold into the children. Start workers from a clean
+            # forkserver (spawn where that is unavailable) instead.
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _PAGE_POOL = ProcessPoolExecutor(max_workers=jobs, mp_context=ctx)
+        return _PAGE_POOL
 
 
-def html_to_md(url: str, html: str) -> tuple[str, str]:
-    # Prefer pandoc when available for higher fidelity.
-    if shutil.which("pandoc"):
-        with tempfile.TemporaryDirectory() as td:
-            in_path = Path(td) / "in.html"
-            in_path.write_text(html, encoding="utf-8", errors="ignore")
+def pdf_page_count(pdf_path: Path) -> int:
+    fitz = optional_module("fitz")
+    if fitz is not None:
+        try:
+            with fitz.open(pdf_path) as doc:
+                return doc.page_count
+        except Exception:
+            pass
+    pypdf = optional_module("pypdf")
+    if pypdf is not None:
+        try:
+            return len(pypdf.PdfReader(str(pdf_path)).pages)
+        except Exception:
+            pass
+    pdfplumber = optional_module("pdfplumber")
+    if pdfplumber is not None:
+        try:
+            with pdfplumber.open(str(pdf_path)) as pdf:
+                return len(pdf.pages)
+        except Exception:
+            pass
+    if tool_path("pdfinfo"):
+        proc = subprocess.run(["pdfinfo", str(pdf_path)], text=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        m = re.search(r"^Pages:\s+(\d+)", proc.stdout or "", flags=re.MULTILINE)
+        if m:
+            return int(m.group(1))
+    return 0
+
+
+def _open_pdf_backend(name: str, pdf_path: str) -> Any:
+    if name == "pdftotext":
+        if not tool_path("pdftotext"):
+            raise RuntimeError("pdftotext not found")
+        return pdf_path
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"unknown PDF backend: {name}")
+    mod = optional_module(name)
+    if mod is None:
+        raise RuntimeError(f"{name} is not installed")
+    if name == "pypdf":
+        return mod.PdfReader(pdf_path)
+    return mod.open(pdf_path)
+
+
+def _page_text(name: str, handle: Any, n: int) -> str:
+    if name == "fitz":
+        return handle[n].get_text("text") or ""
+    if name in ("pdfplumber", "pypdf"):
+        return handle.pages[n].extract_text() or ""
+    proc = subprocess.run(
+        ["pdftotext", "-f", str(n + 1), "-l", str(n + 1), handle, "-"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    return proc.stdout.decode("utf-8", errors="ignore")
+
+
+def extract_page_range(pdf_path: str, start: int, stop: int, backends: tuple[str, ...]) -> list[tuple[str, str]]:
+    # Runs in a pool worker: returns (text, backend) per page in [start, stop).
+    handles: dict[str, Any] = {}
+    broken: set[str] = set()
+    pages: list[tuple[str, str]] = []
+    try:
+        for n in range(start, stop):
+            text, used = "", ""
+            for name in backends:
+                if name in broken:
+                    continue
+                try:
+                    if name not in handles:
+                        handles[name] = _open_pdf_backend(name, pdf_path)
+                    text = _page_text(name, handles[name], n).strip()
+                except Exception:
+                    if name not in handles:
+                        broken.add(name)
+                    continue
+                if text:
+                    used = name
+                    break
+            pages.append((text, used))
+    finally:
+        for handle in handles.values():
+            close = getattr(handle, "close", None)
+            if close:
+                try:
+                    close()
+                except Exception:
+                    pass
+    return pages
+
+
+def extract_pdf_pages(
+    pdf_path: Path,
+    out: TextIO,
+    jobs: int = 1,
+    backends: tuple[str, ...] = PDF_BACKENDS,
+    pages: list[tuple[int, int]] | None = None,
+) -> dict[str, int]:
+    # Stream page texts (blank-line separated) to `out` in page order as chunks
+    # complete. Returns how many pages each backend produced. When `pages` is
+    # given it receives the UTF-8 byte span of every page relative to the
+    # first byte written here.
+    used: dict[str, int] = {}
+    wrote = False
+    pos = 0
+    total = pdf_page_count(pdf_path)
+
+    if total == 0:
+        # Page count unknown: only a whole-document pdftotext pass is left.
+        if "pdftotext" in backends and tool_path("pdftotext"):
             proc = subprocess.run(
-                ["pandoc", str(in_path), "--from=html", "--to=gfm", "--wrap=none"],
-                text=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                check=False,
+                ["pdftotext", str(pdf_path), "-"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=False
             )
-            md = (proc.stdout or "").strip()
-            if md:
-                title = ""
-                m = re.search(r"^#\s+(.+)$", md, flags=re.MULTILINE)
-                if m:
-                    title = m.group(1).strip()
-                return (title or "Reference"), md + "\n"
+            text = proc.stdout.decode("utf-8", errors="ignore").strip()
+            if text:
+                out.write(text + "\n")
+                used["pdftotext"] = 1
+        return used
 
-    title = ""
-    md = ""
-    try:
-        import trafilatura  # type: ignore
+    ranges = [(start, min(start + PAGE_CHUNK, total)) for start in range(0, total, PAGE_CHUNK)]
+    if jobs > 1 and len(ranges) > 1:
+        pool = page_pool(jobs)
+        futures = [pool.submit(extract_page_range, str(pdf_path), a, b, backends) for a, b in ranges]
+        chunks: Iterator[list[tuple[str, str]]] = (f.result() for f in futures)
+    else:
+        chunks = (extract_page_range(str(pdf_path), a, b, backends) for a, b in ranges)
 
-        extracted = trafilatura.extract(html, include_comments=False, include_tables=True, output_format="markdown")
-        if extracted:
-            md = extracted
-        meta = trafilatura.metadata.extract_metadata(html)
-        if meta and getattr(meta, "title", None):
-            title = meta.title
+    for chunk in chunks:
+        for text, backend in chunk:
+            if not text:
+                if pages is not None:
+                    pages.append((pos, pos))
+                continue
+            sep = "\n\n" if wrote else ""
+            out.write(sep + text)
+            wrote = True
+            used[backend] = used.get(backend, 0) + 1
+            if pages is not None:
+                start = pos + len(sep)
+                pos = start + len(text.encode("utf-8"))
+                pages.append((start, pos))
+    if wrote:
+        out.write("\n")
+    return used
+
+
+def extract_pdf_to_text(pdf_path: Path, backends: tuple[str, ...] = PDF_BACKENDS, jobs: int = 1) -> str:
+    buf = io.StringIO()
+    extract_pdf_pages(pdf_path, buf, jobs=jobs, backends=backends)
+    return buf.getvalue()
+
+
+class PageScanner(HTMLParser):
+    """Collects title candidates and visible text from an HTML page in one pass."""
+
+    SKIP = {"script", "style", "noscript", "template", "svg", "head"}
+    BLOCK = {
+        "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption",
+        "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol",
+        "p", "pre", "section", "table", "td", "th", "tr", "ul",
+    }
+    TITLE_META = ("citation_title", "dc.title", "og:title", "twitter:title")
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.h1 = ""
+        self.meta: dict[str, str] = {}
+        self._text: list[str] = []
+        self._skip = 0
+        self._in_title = False
+        self._in_h1 = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "meta":
+            a = dict(attrs)
+            key = (a.get("name") or a.get("property") or "").strip().lower()
+            if key and a.get("content") and key not in self.meta:
+                self.meta[key] = a["content"].strip()
+            return
+        if tag == "title":
+            self._in_title = True
+        elif tag in self.SKIP:
+            self._skip += 1
+        elif tag == "h1" and not self.h1:
+            self._in_h1 = True
+        if tag in self.BLOCK:
+            self._text.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+        elif tag in self.SKIP and self._skip:
+            self._skip -= 1
+        elif tag == "h1":
+            self._in_h1 = False
+        if tag in self.BLOCK:
+            self._text.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip:
+            return
+        if self._in_h1:
+            self.h1 += data
+        self._text.append(data)
+
+    def best_title(self, prefer_h1: bool) -> str:
+        candidates = [self.meta.get(k, "") for k in self.TITLE_META] + [self.title]
+        if prefer_h1:
+            candidates.insert(0, self.h1)
+        for c in candidates:
+            c = re.sub(r"\s+", " ", c).strip()
+            if c:
+                return c
+        return ""
+
+    def text(self) -> str:
+        text = "".join(self._text)
+        text = re.sub(r"[ \t\r\f\v]+", " ", text)
+        text = re.sub(r" *\n *", "\n", text)
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def scan_page(html: str) -> PageScanner:
+    scanner = PageScanner()
+    try:
+        scanner.feed(html)
+        scanner.close()
     except Exception:
         pass
+    return scanner
 
-    if not title:
-        m = re.search(r"<title[^>]*>(.*?)</title>", html, flags=re.IGNORECASE | re.DOTALL)
-        if m:
-            title = re.sub(r"\s+", " ", m.group(1)).strip()
 
-    if not md:
+def title_head(html: str) -> str:
+    # The part of a page that best_title(prefer_h1=True) reads: through the first
+    # </h1>, or the <head> when there is no h1.
+    m = re.search(r"</h1\s*>", html, flags=re.IGNORECASE) or re.search(r"<body[\s>]", html, flags=re.IGNORECASE)
+    return html[: m.end()] if m else html
+
+
+def convert_html(url: str, html: str) -> tuple[str, str, str]:
+    # Returns (title, markdown, backend). pandoc (preferred, fed over stdin) or
+    # trafilatura provide the Markdown body when available; otherwise the page is
+    # scanned once for title metadata and plain text. Next to pandoc only the
+    # head of the page is scanned for the title, so the body is parsed once.
+    if tool_path("pandoc"):
+        proc = subprocess.run(
+            ["pandoc", "--from=html", "--to=gfm", "--wrap=none"],
+            input=html,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        md = (proc.stdout or "").strip()
+        if md:
+            return (scan_page(title_head(html)).best_title(prefer_h1=True) or "Reference"), md + "\n", "pandoc"
+
+    scanner = scan_page(html)
+    title = scanner.best_title(prefer_h1=False)
+    trafilatura = optional_module("trafilatura")
+    if trafilatura is not None:
         try:
-            from bs4 import BeautifulSoup  # type: ignore
-
-            soup = BeautifulSoup(html, "html.parser")
-            for tag in soup(["script", "style", "noscript"]):
-                tag.decompose()
-            text = soup.get_text("\n")
-            text = re.sub(r"\n{3,}", "\n\n", text).strip()
-            md = text
+            extracted = trafilatura.extract(
+                html, include_comments=False, include_tables=True, output_format="markdown"
+            )
         except Exception:
-            md = html
+            extracted = None
+        if extracted:
+            return (title or url), extracted.strip() + "\n", "trafilatura"
 
-    return (title or url), md.strip() + "\n"
+    return (title or url), (scanner.text() or html.strip()) + "\n", "text"
+
+
+def html_to_md(url: str, html: str) -> tuple[str, str]:
+    title, md, _backend = convert_html(url, html)
+    return title, md
 
 
 def select_latex_dir(project_root: Path, paper: str | None, latex_dir_arg: str | None) -> Path | None:
@@ -223,131 +1262,888 @@ def select_latex_dir(project_root: Path, paper: str | None, latex_dir_arg: str |
     return None
 
 
-def update_bib(latex_dir: Path, bibkey: str, title: str, url: str, accessed_iso: str) -> None:
-    bib_path = latex_dir / "src" / "references.bib"
-    bib_path.parent.mkdir(parents=True, exist_ok=True)
-    if bib_path.exists():
-        existing = bib_path.read_text(encoding="utf-8", errors="ignore")
-        if re.search(rf"@\w+\{{\s*{re.escape(bibkey)}\s*,", existing):
-            return
+class BibFile:
+    """A references.bib parsed once and indexed by entry key and URL.
+
+    Updates are staged in memory (``stage``) and written with a single atomic
+    rewrite (``save``); entries that were not touched are written back
+    verbatim. If the file changed on disk since it was parsed, ``save``
+    re-parses it and re-applies the staged entries first.
+    """
+
+    ENTRY_RE = re.compile(r"@(\w+)\s*[{(]")
+    URL_RE = re.compile(r"\burl\s*=\s*[{\"]\s*([^}\"]+?)\s*[}\"]", flags=re.IGNORECASE)
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.staged: list[tuple[str, str]] = []  # (key, entry text) not yet on disk
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            self.text = self.path.read_text(encoding="utf-8", errors="ignore")
+            st = self.path.stat()
+            self.stamp = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            self.text = ""
+            self.stamp = None
+        self.by_key: dict[str, str] = {}  # key -> url ("" when the entry has none)
+        self.by_url: dict[str, str] = {}  # url -> key
+        for key, body in self._entries(self.text):
+            self._index(key, body)
+        for key, body in self.staged:
+            self._index(key, body)
+
+    def _entries(self, text: str) -> Iterator[tuple[str, str]]:
+        pos = 0
+        while True:
+            m = self.ENTRY_RE.search(text, pos)
+            if not m:
+                return
+            # Braces nest inside field values whatever the entry delimiter is; the
+            # entry ends at its own closing delimiter outside braces and quotes.
+            close = "}" if text[m.end() - 1] == "{" else ")"
+            depth, quoted, i = 0, False, m.end()
+            while i < len(text):
+                c = text[i]
+                if c == "{":
+                    depth += 1
+                elif c == "}":
+                    if not depth and close == "}":
+                        break
+                    depth = max(depth - 1, 0)
+                elif not depth:
+                    if c == '"':
+                        quoted = not quoted
+                    elif c == close and not quoted:
+                        break
+                i += 1
+            body = text[m.end() : i]
+            pos = i + 1
+            if m.group(1).lower() in ("comment", "string", "preamble"):
+                continue
+            key = body.split(",", 1)[0].strip()
+            if key:
+                yield key, body
+
+    def _index(self, key: str, body: str) -> None:
+        m = self.URL_RE.search(body)
+        url = normalize_url(m.group(1)) if m else ""
+        self.by_key.setdefault(key, url)
+        if url:
+            self.by_url.setdefault(url, key)
+
+    def stage(self, bibkey: str, title: str, url: str, accessed_iso: str) -> str:
+        # Returns "added", "exists" or a "conflict: ..." description.
+        with self.lock:
+            norm = normalize_url(url)
+            if bibkey in self.by_key:
+                have = self.by_key[bibkey]
+                if have and have != norm:
+                    return f"conflict: key {bibkey!r} already cites {have}"
+                return "exists"
+            if norm in self.by_url:
+                return f"conflict: {url} is already cited as {self.by_url[norm]!r}"
+            entry = (
+                f"@online{{{bibkey},\n"
+                f"  title   = {{{title}}},\n"
+                f"  url     = {{{url}}},\n"
+                f"  urldate = {{{accessed_iso[:10]}}},\n"
+                f"}}\n\n"
+            )
+            self.staged.append((bibkey, entry))
+            self._index(bibkey, entry)
+            return "added"
+
+    def save(self) -> int:
+        with self.lock:
+            if not self.staged:
+                return 0
+            try:
+                st = self.path.stat()
+                stamp = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                stamp = None
+            if stamp != self.stamp:
+                staged, self.staged = self.staged, []
+                self._load()
+                self.staged = [(k, e) for k, e in staged if k not in self.by_key]
+            text = self.text
+            if text and not text.endswith("\n"):
+                text += "\n"
+            text += "".join(entry for _key, entry in self.staged)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(self.path, text.encode("utf-8"))
+            added = len(self.staged)
+            # Staged entries are already indexed; no need to re-parse what we just wrote.
+            self.staged = []
+            self.text = text
+            st = self.path.stat()
+            self.stamp = (st.st_mtime_ns, st.st_size)
+            return added
+
+
+def normalize_url(url: str) -> str:
+    return url.strip().rstrip("/")
+
+
+_BIBS: dict[Path, BibFile] = {}
+_BIBS_LOCK = threading.Lock()
+
+
+def open_bib(bib_path: Path) -> BibFile:
+    with _BIBS_LOCK:
+        bib = _BIBS.get(bib_path)
+        if bib is None:
+            bib = _BIBS[bib_path] = BibFile(bib_path)
+        return bib
+
+
+def bib_paths(project_root: Path, args: argparse.Namespace) -> list[Path]:
+    # Every *_latex variant when --all-variants; otherwise the selected one.
+    if getattr(args, "all_variants", False):
+        dirs = sorted(p for p in project_root.glob("*_latex") if p.is_dir())
+    else:
+        latex_dir = select_latex_dir(project_root, args.paper, args.latex_dir)
+        dirs = [latex_dir] if latex_dir else []
+    return [d / "src" / "references.bib" for d in dirs]
+
+
+def update_bib(latex_dir: Path, bibkey: str, title: str, url: str, accessed_iso: str) -> str:
+    bib = open_bib(latex_dir / "src" / "references.bib")
+    status = bib.stage(bibkey, title, url, accessed_iso)
+    bib.save()
+    return status
+
+
+DEPS_STAMP = ".stenographer-deps.json"
+# Top-level modules each extra must make importable (pyproject.toml written by init).
+DEPS_MODULES = {
+    "basic": ("markdownify",),
+    "full": ("trafilatura", "markdownify", "pypdf", "pdfplumber", "fitz"),
+}
+
+
+def deps_fingerprint(project_root: Path) -> str:
+    h = hashlib.sha256()
+    for name in ("pyproject.toml", "uv.lock"):
+        path = project_root / name
+        h.update(name.encode() + b"\0")
+        if path.exists():
+            h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def venv_identity(venv: Path) -> dict[str, Any]:
+    # Recreating .venv or pointing it at another interpreter rewrites pyvenv.cfg,
+    # so a stamp from before no longer describes what is installed.
+    cfg = venv / "pyvenv.cfg"
+    try:
+        mtime = cfg.stat().st_mtime_ns
+        text = cfg.read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return {}
+    m = re.search(r"^version(?:_info)?\s*=\s*(\S+)", text, flags=re.MULTILINE)
+    return {
+        "python": os.path.realpath(venv / "bin" / "python"),
+        "python_version": m.group(1) if m else "",
+        "pyvenv_mtime": mtime,
+    }
+
 
-    entry = (
-        f"@online{{{bibkey},\n"
-        f"  title   = {{{title}}},\n"
-        f"  url     = {{{url}}},\n"
-        f"  urldate = {{{accessed_iso[:10]}}},\n"
-        f"}}\n\n"
+def deps_ready(venv: Path, level: str, fingerprint: str) -> bool:
+    # "full" is a superset of "basic"; the stamp only ever holds the extra of
+    # the last sync because `uv sync` removes packages of other extras.
+    if not (venv / "bin" / "python").exists():
+        return False
+    try:
+        stamp = json.loads((venv / DEPS_STAMP).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    return (
+        stamp.get("fingerprint") == fingerprint
+        and stamp.get("venv") == venv_identity(venv)
+        and (stamp.get("extra") == level or stamp.get("extra") == "full")
     )
-    with bib_path.open("a", encoding="utf-8") as f:
-        f.write(entry)
 
 
-def ensure_deps(project_root: Path, level: str) -> None:
+def missing_modules(level: str) -> list[str]:
+    importlib.invalidate_caches()
+    return [name for name in DEPS_MODULES.get(level, ()) if importlib.util.find_spec(name) is None]
+
+
+def ensure_deps(project_root: Path, level: str, *, trusted: bool = False) -> None:
+    # trusted: a parent process already checked the stamp and exec'd us into the venv.
     if level == "none":
         return
-    if not shutil.which("uv"):
-        raise SystemExit(
-            "[FAIL] uv is required to install optional dependencies. Install it (macOS: `brew install uv`, or `curl -LsSf https://astral.sh/uv/install.sh | sh`)."
-        )
+    venv = project_root / ".venv"
+    py = venv / "bin" / "python"
+    in_venv = Path(sys.prefix).resolve() == venv.resolve()
 
-    # Ensure a uv-managed virtualenv exists and install extras declared in pyproject.toml.
-    # This creates/updates `.venv/` at the project root by default.
-    extra = level
-    run(["uv", "sync", "--quiet", "--extra", extra], cwd=project_root)
+    # uv sync only runs when pyproject.toml/uv.lock or the venv itself changed since the stamp was written.
+    synced = False
+    if not (trusted or deps_ready(venv, level, deps_fingerprint(project_root))):
+        if not shutil.which("uv"):
+            raise SystemExit(
+                "[FAIL] uv is required to install optional dependencies. Install it (macOS: `brew install uv`, or `curl -LsSf https://astral.sh/uv/install.sh | sh`)."
+            )
+        # Ensure a uv-managed virtualenv exists and install extras declared in pyproject.toml.
+        # This creates/updates `.venv/` at the project root by default.
+        with PROFILER.span("deps.uv_sync", extra=level):
+            run(["uv", "sync", "--quiet", "--extra", level], cwd=project_root)
+        if not py.exists():
+            raise SystemExit("[FAIL] uv sync did not create .venv/bin/python as expected.")
+        # uv sync may have written uv.lock, so fingerprint after it ran.
+        stamp = {
+            "extra": level,
+            "fingerprint": deps_fingerprint(project_root),
+            "venv": venv_identity(venv),
+            "synced": now_utc_iso(),
+        }
+        write_atomic(venv / DEPS_STAMP, (json.dumps(stamp) + "\n").encode("utf-8"))
+        optional_module.cache_clear()
+        synced = True
 
-    py = project_root / ".venv" / "bin" / "python"
-    if not py.exists():
-        raise SystemExit("[FAIL] uv sync did not create .venv/bin/python as expected.")
+    if in_venv:
+        missing = missing_modules(level)
+        if missing and not synced:
+            # The stamp vouched for packages that are gone (removed behind uv's
+            # back): drop it and sync once more.
+            print(f"[WARN] .venv is missing {', '.join(missing)}; re-running uv sync", file=sys.stderr)
+            (venv / DEPS_STAMP).unlink(missing_ok=True)
+            ensure_deps(project_root, level)
+        elif missing:
+            raise SystemExit(
+                f"[FAIL] .venv is still missing {', '.join(missing)} after uv sync; remove .venv and try again."
+            )
+        return
+    if trusted:
+        return  # already re-exec'd once; never loop
     env = os.environ.copy()
     env["STENOGRAPHER_DEPS_READY"] = "1"
+    PROFILER.carry(env)
     os.execve(str(py), [str(py), *sys.argv], env)
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(
-        description="Archive a cited source into root References/ as Markdown (and PDF+MD when applicable)."
-    )
-    parser.add_argument("url", help="Source URL (HTML or PDF)")
-    parser.add_argument("--paper", help="Base name (stem) like 'paper' (used to locate <paper>_latex/)")
-    parser.add_argument("--latex-dir", help="Override path to *_latex directory")
-    parser.add_argument("--title", help="Override title used for filename and headings")
-    parser.add_argument("--slug", help="Override filename slug (without extension)")
-    parser.add_argument("--bibkey", help="Bib key to use for citations (use in Markdown as [@bibkey])")
-    parser.add_argument("--update-bib", action="store_true", help="Append an @online entry to LaTeX references.bib")
-    parser.add_argument(
-        "--deps",
-        choices=["none", "basic", "full"],
-        default="none",
-        help="Install optional deps via uv into .venv (best fidelity: full).",
-    )
-    args = parser.parse_args()
+def register_reference(
+    refs_dir: Path,
+    bibs: list[Path],
+    args: argparse.Namespace,
+    *,
+    title: str,
+    slug: str,
+    url: str,
+    bibkey: str | None,
+    accessed: str,
+    record: bool = True,
+    **fields: str,
+) -> dict[str, Any]:
+    # Record the source in the catalog and stage its bib entry; returns the
+    # per-bib status for the JSON result.
+    md = refs_dir / f"{slug}.md"
+    pdf = refs_dir / f"{slug}.pdf"
+    fields.setdefault("md_bytes", str(md.stat().st_size) if md.exists() else "0")
+    if pdf.exists():
+        fields.setdefault("pdf_bytes", str(pdf.stat().st_size))
+    extra: dict[str, Any] = {}
+    with archive_lock(refs_dir):
+        # In batch mode index.md and the bib files are written once at the end of the run.
+        if record:
+            with PROFILER.span("catalog.append", render=not args.batch):
+                append_index(refs_dir, title, slug, url, bibkey, render=not args.batch, **fields)
+        if args.update_bib and bibkey and bibs:
+            status = {}
+            with PROFILER.span("bib.update", files=len(bibs)):
+                for path in bibs:
+                    bib = open_bib(path)
+                    status[str(path)] = bib.stage(bibkey, title, url, accessed)
+                    if not args.batch:
+                        bib.save()
+            extra["bib"] = status
+    return extra
 
-    project_root = Path(__file__).resolve().parents[2]
-    refs_dir, tmp_dir = ensure_dirs(project_root)
 
-    if args.deps != "none" and os.environ.get("STENOGRAPHER_DEPS_READY") != "1":
-        ensure_deps(project_root, args.deps)
+def known_reference(
+    refs_dir: Path, bibs: list[Path], job: dict[str, str], args: argparse.Namespace
+) -> dict[str, Any] | None:
+    # URL already archived: answer from the catalog without touching the network.
+    rec = open_catalog(refs_dir).by_url.get(job["url"])
+    if not rec or not (refs_dir / f"{rec['slug']}.md").exists():
+        return None
+    bibkey = job.get("bibkey") or rec.get("bibkey")
+    extra: dict[str, Any] = {}
+    if bibkey != rec.get("bibkey") or (args.update_bib and bibkey and bibs):
+        fields = {k: v for k, v in rec.items() if k not in ("url", "slug", "title", "bibkey")}
+        extra = register_reference(
+            refs_dir,
+            bibs,
+            args,
+            title=rec.get("title", ""),
+            slug=rec["slug"],
+            url=job["url"],
+            bibkey=bibkey,
+            accessed=rec.get("retrieved") or now_utc_iso(),
+            record=bibkey != rec.get("bibkey"),
+            **fields,
+        )
+    result: dict[str, Any] = {"slug": rec["slug"], "title": rec.get("title", ""), "md": str(refs_dir / f"{rec['slug']}.md")}
+    if rec.get("format") == "pdf":
+        result["pdf"] = str(refs_dir / f"{rec['slug']}.pdf")
+    result["existing"] = True
+    result.update(extra)
+    return result
+
 
-    body, content_type = fetch_bytes(args.url)
+def ingest(project_root: Path, job: dict[str, str], args: argparse.Namespace) -> dict[str, Any]:
+    refs_dir, tmp_dir = ensure_dirs(project_root)
+    url = job["url"]
+    bibkey = job.get("bibkey") or None
+    bibs = bib_paths(project_root, args)
+    if not args.refresh:
+        known = known_reference(refs_dir, bibs, job, args)
+        if known:
+            return known
+
+    max_bytes = int(args.max_size_mb * 1024 * 1024) if args.max_size_mb > 0 else None
+    with PROFILER.span("fetch", url=url) as sp:
+        body_path, content_type = fetch_to_file(url, tmp_dir, open_http_cache(refs_dir, args), args.offline, max_bytes)
+        sp["bytes"] = body_path.stat().st_size
     accessed = now_utc_iso()
+    extract_cache = None if args.no_cache else ExtractCache(refs_dir / ".cache" / "extract")
 
-    if looks_like_pdf(args.url, content_type, body):
-        tmp_pdf = tmp_dir / "download.pdf"
-        tmp_pdf.write_bytes(body)
+    if looks_like_pdf(url, content_type, read_head(body_path)):
+        url_name = Path(urlparse(url).path).name
+        title = job.get("title") or (Path(url_name).stem if url_name else "Reference")
+        slug = job.get("slug") or slugify(title)
 
-        url_name = Path(urlparse(args.url).path).name
-        title = args.title or (Path(url_name).stem if url_name else "Reference")
-        slug = args.slug or slugify(title)
+        with PROFILER.span("pdf.hash"):
+            digest = file_sha256(body_path)
+        cached = extract_cache.lookup(digest, "pdf") if extract_cache else None
+        duplicate = archived_duplicate(refs_dir, cached, slug, digest, "pdf")
+        if duplicate:
+            body_path.unlink(missing_ok=True)
+            existing, title = duplicate[0], duplicate[1] or title
+            extra = register_reference(
+                refs_dir,
+                bibs,
+                args,
+                title=title,
+                slug=existing,
+                url=url,
+                bibkey=bibkey,
+                accessed=accessed,
+                format="pdf",
+                sha256=digest,
+                duplicate_of=existing,
+            )
+            return {
+                "slug": existing,
+                "title": title,
+                "md": str(refs_dir / f"{existing}.md"),
+                "pdf": str(refs_dir / f"{existing}.pdf"),
+                "duplicate_of": existing,
+                **extra,
+            }
 
         pdf_out = refs_dir / f"{slug}.pdf"
         md_out = refs_dir / f"{slug}.md"
-        shutil.copyfile(tmp_pdf, pdf_out)
+        with archive_lock(refs_dir):
+            # Held so `--relink` cannot prune the blob between storing and linking it.
+            link_into(store_blob(refs_dir, body_path, digest), pdf_out)
 
-        extracted = extract_pdf_to_text(pdf_out)
         header = (
-            f"---\nsource_url: {args.url}\nretrieved_utc: {accessed}\nformat: pdf\n"
-            + (f"bibkey: {args.bibkey}\n" if args.bibkey else "")
+            f"---\nsource_url: {url}\nretrieved_utc: {accessed}\nformat: pdf\n"
+            + (f"bibkey: {bibkey}\n" if bibkey else "")
             + "---\n\n"
             + f"# {title}\n\n"
         )
-        if extracted.strip():
-            md_out.write_text(header + extracted, encoding="utf-8")
-        else:
-            md_out.write_text(
-                header + "PDF saved alongside this file. Text extraction produced empty output.\n",
-                encoding="utf-8",
-            )
-
-        append_index(refs_dir, title, slug, args.url, args.bibkey)
+        backend = ""
+        spans: list[tuple[int, int]] | None = []
+        with atomic_text(md_out) as f:
+            f.write(header)
+            if cached:
+                with PROFILER.span("pdf.extract_cached"):
+                    extract_cache.copy_body(digest, f)
+                backend = cached.get("backend", "")
+                spans = extract_cache.read_pages(digest)
+            else:
+                with PROFILER.span("pdf.extract", jobs=args.extract_jobs) as sp:
+                    used = extract_pdf_pages(pdf_out, f, jobs=args.extract_jobs, pages=spans)
+                    backend = "+".join(sorted(used, key=used.__getitem__, reverse=True))
+                    sp.update(backend=backend, pages=sum(used.values()))
+                if not used:
+                    f.write("PDF saved alongside this file. Text extraction produced empty output.\n")
+        header_bytes = len(header.encode("utf-8"))
+        write_page_index(md_out, spans, header_bytes)
+        if extract_cache and backend:
+            meta = {"format": "pdf", "backend": backend, "title": title, "slug": slug, "url": url}
+            if cached:
+                extract_cache.update(digest, meta)
+            else:
+                extract_cache.store(digest, meta, md_out, header_bytes)
+                if spans:
+                    extract_cache.store_pages(digest, spans)
 
-        latex_dir = select_latex_dir(project_root, args.paper, args.latex_dir)
-        if args.update_bib and args.bibkey and latex_dir:
-            update_bib(latex_dir, args.bibkey, title, args.url, accessed)
+        extra = register_reference(
+            refs_dir, bibs, args, title=title, slug=slug, url=url, bibkey=bibkey, accessed=accessed,
+            format="pdf", sha256=digest,
+        )
+        return {"slug": slug, "title": title, "md": str(md_out), "pdf": str(pdf_out), **extra}
 
-        print(json.dumps({"slug": slug, "title": title, "md": str(md_out), "pdf": str(pdf_out)}, ensure_ascii=False))
-        return 0
+    try:
+        raw = body_path.read_bytes()
+    finally:
+        body_path.unlink(missing_ok=True)
+    digest = hashlib.sha256(raw).hexdigest()
+    cached = extract_cache.lookup(digest, "html") if extract_cache else None
+    if cached:
+        # "title" is the document's own; a --title override only applies to this job.
+        title, md = cached.get("title", ""), extract_cache.read_body(digest)
+    else:
+        with PROFILER.span("html.convert", bytes=len(raw)) as sp:
+            title, md, backend = convert_html(url, raw.decode("utf-8", errors="ignore"))
+            sp["backend"] = backend
+        if extract_cache:
+            extract_cache.store_text(digest, {"format": "html", "backend": backend, "title": title}, md)
+    if job.get("title"):
+        title = job["title"]
+    slug = job.get("slug") or slugify(title)
 
-    html = body.decode("utf-8", errors="ignore")
-    title, md = html_to_md(args.url, html)
-    if args.title:
-        title = args.title
-    slug = args.slug or slugify(title)
+    duplicate = archived_duplicate(refs_dir, cached, slug, digest, "html")
+    if duplicate:
+        existing, title = duplicate[0], duplicate[1] or title
+        extra = register_reference(
+            refs_dir, bibs, args, title=title, slug=existing, url=url, bibkey=bibkey, accessed=accessed,
+            format="html", sha256=digest, duplicate_of=existing,
+        )
+        return {
+            "slug": existing,
+            "title": title,
+            "md": str(refs_dir / f"{existing}.md"),
+            "duplicate_of": existing,
+            **extra,
+        }
 
     md_out = refs_dir / f"{slug}.md"
     header = (
-        f"---\nsource_url: {args.url}\nretrieved_utc: {accessed}\nformat: html\n"
-        + (f"bibkey: {args.bibkey}\n" if args.bibkey else "")
+        f"---\nsource_url: {url}\nretrieved_utc: {accessed}\nformat: html\n"
+        + (f"bibkey: {bibkey}\n" if bibkey else "")
         + "---\n\n"
         + f"# {title}\n\n"
     )
-    md_out.write_text(header + md, encoding="utf-8")
-    append_index(refs_dir, title, slug, args.url, args.bibkey)
+    write_atomic(md_out, (header + md).encode("utf-8"))
+    if extract_cache:
+        extract_cache.update(digest, {"slug": slug, "url": url, "archived_title": title})
+
+    extra = register_reference(
+        refs_dir, bibs, args, title=title, slug=slug, url=url, bibkey=bibkey, accessed=accessed,
+        format="html", sha256=digest,
+    )
+    return {"slug": slug, "title": title, "md": str(md_out), **extra}
+
+
+def profiled_ingest(project_root: Path, job: dict[str, str], args: argparse.Namespace) -> dict[str, Any]:
+    if not PROFILER.enabled:
+        return ingest(project_root, job, args)
+    with PROFILER.collect() as spans:
+        with PROFILER.span("ingest", url=job["url"]):
+            result = ingest(project_root, job, args)
+    result["profile"] = PROFILER.summary(spans)
+    return result
+
+
+def read_batch(source: str) -> list[dict[str, str]]:
+    # One source per line: a bare URL, or a JSON object with url/title/slug/bibkey.
+    # Blank lines and lines starting with '#' are ignored.
+    text = sys.stdin.read() if source == "-" else Path(source).read_text(encoding="utf-8")
+    jobs: list[dict[str, str]] = []
+    for n, raw in enumerate(text.splitlines(), start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                job = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise SystemExit(f"[FAIL] {source}:{n}: invalid JSON: {e}")
+            if not isinstance(job, dict) or not job.get("url"):
+                raise SystemExit(f"[FAIL] {source}:{n}: JSON entries need a 'url' field")
+            jobs.append({k: str(v) for k, v in job.items() if v is not None})
+        else:
+            jobs.append({"url": line})
+    return jobs
+
+
+def run_batch(project_root: Path, jobs: list[dict[str, str]], args: argparse.Namespace) -> int:
+    print_lock = threading.Lock()
+    failed = 0
+
+    def emit(result: dict[str, Any]) -> None:
+        with print_lock:
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {pool.submit(profiled_ingest, project_root, job, args): job for job in jobs}
+        for fut in as_completed(futures):
+            job = futures[fut]
+            try:
+                emit({"url": job["url"], **fut.result()})
+            except Exception as e:
+                failed += 1
+                emit({"url": job["url"], "error": f"{type(e).__name__}: {e}"})
+
+    refs_dir = project_root / "References"
+    with archive_lock(refs_dir):
+        with PROFILER.span("index.render"):
+            open_catalog(refs_dir).render_index()
+        with PROFILER.span("bib.save"):
+            for path in bib_paths(project_root, args):
+                open_bib(path).save()
+    return 1 if failed else 0
+
+
+# Per-job fields and option overrides accepted by the "ingest" RPC method.
+JOB_FIELDS = ("url", "title", "slug", "bibkey")
+JOB_OPTIONS = ("update_bib", "all_variants", "refresh", "offline", "no_cache", "paper", "latex_dir")
+
+
+class IngestService:
+    """Bounded job queue shared by every client of ``--serve`` / ``--socket``.
+
+    ``submit`` blocks while the queue is full, so a client that sends faster
+    than the workers can ingest simply stops being read (back-pressure).
+    ``close`` lets queued jobs finish before the workers exit.
+    """
+
+    def __init__(self, project_root: Path, args: argparse.Namespace) -> None:
+        self.project_root = project_root
+        self.args = args
+        self.queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, args.queue_size))
+        self.workers = [threading.Thread(target=self._work, daemon=True) for _ in range(max(1, args.jobs))]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, params: dict[str, Any], respond: Any) -> None:
+        self.queue.put((params, respond))
+
+    def _work(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            params, respond = item
+            try:
+                respond(result=self.ingest(params))
+            except (Exception, SystemExit) as e:
+                respond(error=(-32000, f"{type(e).__name__}: {e}"))
+
+    def ingest(self, params: dict[str, Any]) -> dict[str, Any]:
+        # Same result object the CLI prints for a single URL.
+        job = {k: str(params.get(k) or "") for k in JOB_FIELDS}
+        args = argparse.Namespace(**vars(self.args))
+        for k in JOB_OPTIONS:
+            if k in params:
+                setattr(args, k, params[k])
+        return profiled_ingest(self.project_root, job, args)
+
+    def close(self) -> None:
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+
+
+class RpcConnection:
+    # Line-delimited JSON-RPC 2.0 over one stream. Replies may arrive out of
+    # order (matched by id); `drain` waits until every request got its reply.
+
+    def __init__(self, service: IngestService, write: Any) -> None:
+        self.service = service
+        self.write = write
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.pending = 0
+
+    def send(self, msg: dict[str, Any]) -> None:
+        with self.lock:
+            try:
+                self.write(json.dumps(msg, ensure_ascii=False) + "\n")
+            except (OSError, ValueError):
+                pass  # client went away; the job itself still completed
+            if msg.get("id") is not None:
+                self.pending -= 1
+                self.idle.notify_all()
+
+    def handle(self, line: str) -> bool:
+        # Returns False when the client asked the service to shut down.
+        try:
+            req = json.loads(line)
+        except ValueError as e:
+            self.send({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": f"Parse error: {e}"}})
+            return True
+        if not isinstance(req, dict) or not isinstance(req.get("method"), str):
+            self.send({"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid request"}})
+            return True
+        rid = req.get("id")
+        method = req["method"]
+        params = req.get("params") or {}
+        if rid is not None:
+            with self.lock:
+                self.pending += 1
+
+        def respond(result: Any = None, error: tuple[int, str] | None = None) -> None:
+            if rid is None:
+                return
+            msg: dict[str, Any] = {"jsonrpc": "2.0", "id": rid}
+            if error:
+                msg["error"] = {"code": error[0], "message": error[1]}
+            else:
+                msg["result"] = result
+            self.send(msg)
+
+        if method == "ingest":
+            if not isinstance(params, dict) or not params.get("url"):
+                respond(error=(-32602, "ingest needs params with a 'url'"))
+            else:
+                self.service.submit(params, respond)
+        elif method == "lookup":
+            key = str(params.get("key", "")) if isinstance(params, dict) else ""
+            respond(result=open_catalog(self.service.project_root / "References").lookup(key))
+        elif method == "ping":
+            respond(result={"status": "ok", "queued": self.service.queue.qsize()})
+        elif method == "shutdown":
+            respond(result={"status": "draining"})
+            return False
+        else:
+            respond(error=(-32601, f"Unknown method {method!r}"))
+        return True
+
+    def drain(self) -> None:
+        with self.lock:
+            while self.pending > 0:
+                self.idle.wait()
+
+
+def _interrupt(_signum: int, _frame: Any) -> None:
+    raise KeyboardInterrupt
+
+
+def run_service(project_root: Path, args: argparse.Namespace) -> int:
+    # Keep the process (imported backends, page pool, catalog/bib indexes) warm
+    # across many ingests instead of paying a cold start per citation.
+    warm = [name for name in ("fitz", "pdfplumber", "pypdf", "trafilatura") if optional_module(name) is not None]
+    warm += [name for name in ("pandoc", "pdftotext") if tool_path(name)]
+    service = IngestService(project_root, args)
+
+    if args.serve:
+        print(f"[OK] Serving JSON-RPC on stdin/stdout (backends: {', '.join(warm) or 'built-in'})", file=sys.stderr)
+        conn = RpcConnection(service, lambda text: (sys.stdout.write(text), sys.stdout.flush()))
+        # SIGTERM/SIGINT only break out of the blocking read; raised anywhere
+        # else they could leave a request half handled (and drain() waiting for
+        # a reply that was never counted), so the loop stops after that line.
+        reading = stopping = False
+
+        def terminate(_signum: int, _frame: Any) -> None:
+            nonlocal stopping
+            stopping = True
+            if reading:
+                raise KeyboardInterrupt
+
+        signal.signal(signal.SIGTERM, terminate)
+        signal.signal(signal.SIGINT, terminate)
+        try:
+            while not stopping:
+                reading = True
+                line = sys.stdin.readline()
+                reading = False
+                if not line or (line.strip() and not conn.handle(line)):
+                    break
+        except KeyboardInterrupt:
+            pass
+        service.close()
+        conn.drain()
+        return 0
+
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    import socketserver
+
+    sock_path = Path(args.socket).resolve()
+    if sock_path.exists():
+        import socket
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(sock_path))
+        except OSError:
+            sock_path.unlink()  # stale socket from a crashed service
+        else:
+            raise SystemExit(f"[FAIL] A service is already listening on {sock_path}")
+        finally:
+            probe.close()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            def write(text: str) -> None:
+                self.wfile.write(text.encode("utf-8"))
+                self.wfile.flush()
+
+            conn = RpcConnection(service, write)
+            for raw in self.rfile:
+                line = raw.decode("utf-8", errors="replace")
+                if line.strip() and not conn.handle(line):
+                    threading.Thread(target=server.shutdown, daemon=True).start()
+                    break
+            conn.drain()
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    old_umask = os.umask(0o177)  # socket readable/writable by this user only
+    try:
+        server = Server(str(sock_path), Handler)
+    finally:
+        os.umask(old_umask)
+    print(f"[OK] Serving JSON-RPC on {sock_path} (backends: {', '.join(warm) or 'built-in'})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sock_path.unlink(missing_ok=True)
+    service.close()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Archive a cited source into root References/ as Markdown (and PDF+MD when applicable)."
+    )
+    parser.add_argument("url", nargs="?", help="Source URL (HTML or PDF)")
+    parser.add_argument(
+        "--lookup",
+        metavar="KEY",
+        help="Print catalog records matching a URL, slug, bibkey or sha256 (one JSON line each) and exit",
+    )
+    parser.add_argument(
+        "--relink",
+        action="store_true",
+        help="Move existing References/*.pdf into the References/.blobs store, hard-link duplicates, drop unused blobs, and exit",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-archive URLs that are already in References/catalog.jsonl (default: report the existing entry)",
+    )
+    parser.add_argument("--paper", help="Base name (stem) like 'paper' (used to locate <paper>_latex/)")
+    parser.add_argument("--latex-dir", help="Override path to *_latex directory")
+    parser.add_argument("--title", help="Override title used for filename and headings")
+    parser.add_argument("--slug", help="Override filename slug (without extension)")
+    parser.add_argument("--bibkey", help="Bib key to use for citations (use in Markdown as [@bibkey])")
+    parser.add_argument("--update-bib", action="store_true", help="Append an @online entry to LaTeX references.bib")
+    parser.add_argument(
+        "--all-variants",
+        action="store_true",
+        help="With --update-bib, update references.bib in every *_latex variant (multi-language projects)",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Archive many sources: read one URL (or JSON object with url/title/slug/bibkey) per line; '-' for stdin",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=min(8, os.cpu_count() or 1),
+        help="Concurrent workers in --batch mode (default: min(8, CPUs))",
+    )
+    parser.add_argument(
+        "--extract-jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for page-parallel PDF text extraction (default: CPUs)",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve sources only from the HTTP cache (References/.cache/http); never touch the network",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the HTTP cache entirely")
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=float(os.environ.get("STENOGRAPHER_CACHE_MAX_MB", "1024")),
+        help="Size limit of the HTTP cache before least-recently-used entries are evicted (default: 1024)",
+    )
+    parser.add_argument(
+        "--max-size-mb",
+        type=float,
+        default=float(os.environ.get("STENOGRAPHER_MAX_DOWNLOAD_MB", "512")),
+        help="Abort downloads larger than this (default: 512; 0 disables the limit)",
+    )
+    parser.add_argument(
+        "--deps",
+        choices=["none", "basic", "full"],
+        default="none",
+        help="Install optional deps via uv into .venv (best fidelity: full).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=os.environ.get("STENOGRAPHER_PROFILE") == "1",
+        help="Add per-stage wall/CPU time and peak RSS to each JSON result (env STENOGRAPHER_PROFILE=1)",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        default=os.environ.get("STENOGRAPHER_TRACE") or None,
+        help="Append spans to a Chrome trace-event file for chrome://tracing, Perfetto or speedscope (env STENOGRAPHER_TRACE)",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a service: line-delimited JSON-RPC 2.0 on stdin/stdout (methods: ingest, lookup, ping, shutdown)",
+    )
+    parser.add_argument("--socket", metavar="PATH", help="Run as a service listening on a Unix socket (same protocol)")
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=64,
+        help="Service mode: pending jobs before clients are back-pressured (default: 64)",
+    )
+    args = parser.parse_args()
+    PROFILER.configure(args.profile, args.trace)
+    project_root = Path(__file__).resolve().parents[2]
+    refs_dir, _tmp_dir = ensure_dirs(project_root)
+
+    if args.lookup:
+        matches = open_catalog(refs_dir).lookup(args.lookup)
+        for rec in matches:
+            print(json.dumps(rec, ensure_ascii=False))
+        return 0 if matches else 1
+    if args.relink:
+        print(json.dumps(relink_pdfs(refs_dir)))
+        return 0
+    if sum(map(bool, (args.url, args.batch, args.serve or args.socket))) != 1:
+        parser.error("pass exactly one of <url>, --batch FILE, --serve or --socket PATH")
+
+    if args.deps != "none":
+        with PROFILER.collect():
+            ensure_deps(project_root, args.deps, trusted=os.environ.get("STENOGRAPHER_DEPS_READY") == "1")
 
-    latex_dir = select_latex_dir(project_root, args.paper, args.latex_dir)
-    if args.update_bib and args.bibkey and latex_dir:
-        update_bib(latex_dir, args.bibkey, title, args.url, accessed)
+    if args.serve or args.socket:
+        return run_service(project_root, args)
+    if args.batch:
+        return run_batch(project_root, read_batch(args.batch), args)
 
-    print(json.dumps({"slug": slug, "title": title, "md": str(md_out)}, ensure_ascii=False))
+    job = {"url": args.url, "title": args.title or "", "slug": args.slug or "", "bibkey": args.bibkey or ""}
+    try:
+        result = profiled_ingest(project_root, job, args)
+    except (OfflineCacheMiss, DownloadTooLarge, HttpError) as e:
+        raise SystemExit(f"[FAIL] {e}")
+    print(json.dumps(result, ensure_ascii=False))
     return 0
 
 
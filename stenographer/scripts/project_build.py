@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+
+def find_variants(root: Path) -> list[str]:
+    stems: list[str] = []
+    for entry in sorted(root.iterdir()):
+        if entry.is_dir() and entry.name.endswith("_latex") and (entry / "scripts" / "build.sh").exists():
+            stems.append(entry.name[: -len("_latex")])
+    return stems
+
+
+def preflight(root: Path) -> bool:
+    doctor = root / "doctor.sh"
+    if doctor.exists() and os.access(doctor, os.X_OK):
+        if subprocess.run([str(doctor), "--quiet"], cwd=root).returncode != 0:
+            return False
+    rumdl = shutil.which("rumdl")
+    if rumdl and subprocess.run([rumdl, "check", str(root)], cwd=root).returncode != 0:
+        return False
+    return True
+
+
+def build_variant(root: Path, stem: str) -> tuple[str, int, float, str]:
+    env = dict(os.environ, STENOGRAPHER_SKIP_PREFLIGHT="1")
+    started = time.monotonic()
+    proc = subprocess.run(
+        [str(root / f"{stem}_latex" / "scripts" / "build.sh"), stem],
+        cwd=root,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+    )
+    return stem, proc.returncode, time.monotonic() - started, proc.stdout
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Build all <stem>_latex variants concurrently (preflight and lint run once)."
+    )
+    parser.add_argument("stems", nargs="*", help="Variants to build (default: every <stem>_latex/ in the project)")
+    parser.add_argument("--path", default=".", help="Project path (default: .)")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=int(os.environ.get("STENOGRAPHER_BUILD_JOBS", "0")),
+        help="Concurrent builds (default: one per variant; env STENOGRAPHER_BUILD_JOBS)",
+    )
+    parser.add_argument("--no-preflight", action="store_true", help="Skip doctor.sh and rumdl")
+    parser.add_argument("--verbose", action="store_true", help="Print each variant's full build log")
+    args = parser.parse_args()
+
+    root = Path(args.path).resolve()
+    available = find_variants(root)
+    stems = args.stems or available
+    missing = [s for s in stems if s not in available]
+    if missing:
+        print(f"[FAIL] No build script for: {', '.join(missing)}", file=sys.stderr)
+        return 2
+    if not stems:
+        print(f"[FAIL] No <stem>_latex/ folders under {root}", file=sys.stderr)
+        return 2
+
+    if not args.no_preflight and not preflight(root):
+        print("[FAIL] Preflight failed", file=sys.stderr)
+        return 1
+
+    jobs = min(args.jobs, len(stems)) if args.jobs > 0 else len(stems)
+    started = time.monotonic()
+    results: list[tuple[str, int, float]] = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(build_variant, root, stem) for stem in stems]
+        for fut in as_completed(futures):
+            stem, status, elapsed, log = fut.result()
+            results.append((stem, status, elapsed))
+            # Logs are captured per variant so concurrent latexmk output never interleaves.
+            if args.verbose or status != 0:
+                for line in log.splitlines():
+                    print(f"[{stem}] {line}")
+            if status == 0:
+                print(f"[OK] {stem}: {root / f'{stem}.pdf'} ({elapsed:.1f}s)")
+            else:
+                print(f"[FAIL] {stem}: build.sh exited with {status} ({elapsed:.1f}s)", file=sys.stderr)
+
+    failed = [stem for stem, status, _ in results if status != 0]
+    total = time.monotonic() - started
+    print(f"[INFO] Built {len(results) - len(failed)}/{len(results)} variant(s) in {total:.1f}s with {jobs} job(s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,9 +2,13 @@
 set -euo pipefail
 
 QUIET=0
-if [[ "${1:-}" == "--quiet" ]]; then
-  QUIET=1
-fi
+REFRESH=0
+for arg in "$@"; do
+  case "$arg" in
+    --quiet) QUIET=1 ;;
+    --refresh) REFRESH=1 ;;
+  esac
+done
 
 say() {
   if [[ "$QUIET" == "0" ]]; then
@@ -21,6 +25,44 @@ ok() { say "[OK] $@"; }
 warn() { say "[WARN] $@"; }
 info() { say "[INFO] $@"; }
 
+TOOLS=(python3 curl latexmk lualatex biber uv rumdl)
+
+# Cached preflight: a passing probe is stored in .cache/doctor.env, keyed by
+# PATH and the resolved path of every tool. It is reused while the key matches
+# and no tool binary is newer than the cache (builtins only, no forks).
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+CACHE_FILE="${ROOT_DIR}/.cache/doctor.env"
+CACHE_KEY="v1|${OSTYPE:-}|${PATH}"
+TOOL_PATHS=()
+for c in "${TOOLS[@]}"; do
+  p="$(command -v "$c" 2>/dev/null || true)"
+  TOOL_PATHS+=("$p")
+  CACHE_KEY+="|${c}=${p}"
+done
+
+if [[ "$REFRESH" == "0" && -f "$CACHE_FILE" ]]; then
+  cached_key=""
+  IFS= read -r cached_key < "$CACHE_FILE" || true
+  fresh=1
+  if [[ "$cached_key" != "$CACHE_KEY" ]]; then
+    fresh=0
+  fi
+  for p in "${TOOL_PATHS[@]}"; do
+    if [[ -z "$p" || "$p" -nt "$CACHE_FILE" ]]; then
+      fresh=0
+    fi
+  done
+  if [[ "$fresh" == "1" ]]; then
+    if [[ "$QUIET" == "0" ]]; then
+      while IFS= read -r line; do
+        [[ "$line" == "[OK]"* || "$line" == "[INFO]"* ]] && echo "$line"
+      done < "$CACHE_FILE"
+      echo "[INFO] Cached result (run ./doctor.sh --refresh to re-probe)"
+    fi
+    exit 0
+  fi
+fi
+
 OS="$(uname -s | tr '[:upper:]' '[:lower:]')"
 SHELL_PATH="${SHELL:-unknown}"
 SHELL_NAME="$(basename "$SHELL_PATH" 2>/dev/null || echo unknown)"
@@ -125,4 +167,22 @@ if [[ "${#missing[@]}" -gt 0 ]]; then
 fi
 
 ok "All required tools are installed."
-ok "rumdl: $(rumdl --version 2>/dev/null | head -n 1 || echo installed)"
+
+# Snapshot tool versions alongside the key; written atomically so concurrent
+# builds never read a half-written cache.
+snapshot=("[INFO] OS: ${OS}" "[OK] All required tools are installed.")
+for i in "${!TOOLS[@]}"; do
+  c="${TOOLS[$i]}"
+  v="$("$c" --version 2>/dev/null | head -n 1 || true)"
+  snapshot+=("[OK] ${c}: ${v:-installed} (${TOOL_PATHS[$i]})")
+done
+if [[ "$QUIET" == "0" ]]; then
+  printf '%s\n' "${snapshot[@]:2}"
+fi
+
+mkdir -p "${ROOT_DIR}/.cache"
+tmp="${CACHE_FILE}.$$"
+{
+  printf '%s\n' "$CACHE_KEY"
+  printf '%s\n' "${snapshot[@]}"
+} > "$tmp" && mv -f "$tmp" "$CACHE_FILE"
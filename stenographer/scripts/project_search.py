@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS docs (
+    slug TEXT PRIMARY KEY,
+    title TEXT,
+    bibkeys TEXT,
+    mtime_ns INTEGER,
+    size INTEGER,
+    sha256 TEXT
+);
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL,
+    ord INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS passages_slug ON passages(slug);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5(
+    text, content='passages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS passages_ai AFTER INSERT ON passages BEGIN
+    INSERT INTO passages_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS passages_ad AFTER DELETE ON passages BEGIN
+    INSERT INTO passages_fts(passages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# Bump when the tables change; older index files are rebuilt from scratch.
+SCHEMA_VERSION = "1"
+
+# Target passage size in characters; paragraphs are grouped up to this length.
+PASSAGE_CHARS = 800
+PARA_SEP_RE = re.compile(r"\n\s*\n")
+
+
+def find_project_root(start: Path) -> Path:
+    cur = start.resolve()
+    for _ in range(10):
+        if (cur / "pyproject.toml").exists() and (cur / "References").exists():
+            return cur
+        if cur.parent == cur:
+            break
+        cur = cur.parent
+    return start.resolve()
+
+
+def load_page_index(md_path: Path) -> list[tuple[int, int]] | None:
+    # <slug>.pages.json written by add_reference.py for archived PDFs; None when
+    # missing or stale (the Markdown changed size since it was written).
+    try:
+        data = json.loads(md_path.with_suffix(".pages.json").read_text(encoding="utf-8"))
+        if data.get("md_bytes") != md_path.stat().st_size:
+            return None
+        return [(a, b) for a, b in data["offsets"]]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def read_page(md_path: Path, page: int) -> str:
+    # Page N (1-based) of an archived PDF without reading the whole Markdown file.
+    offsets = load_page_index(md_path)
+    if offsets is None:
+        raise LookupError(f"No page index for {md_path.name}")
+    if not 1 <= page <= len(offsets):
+        raise LookupError(f"{md_path.name} has {len(offsets)} pages")
+    start, end = offsets[page - 1]
+    if start == end:
+        return ""
+    with md_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm[start:end].decode("utf-8", errors="replace")
+
+
+def page_of(offsets: list[tuple[int, int]], offset: int) -> int:
+    # 1-based page containing a byte offset (the preceding page when it falls between pages).
+    return max(1, bisect.bisect_right([start for start, _ in offsets], offset))
+
+
+def split_front_matter(text: str) -> tuple[dict[str, str], str]:
+    meta: dict[str, str] = {}
+    if not text.startswith("---\n"):
+        return meta, text
+    end = text.find("\n---\n", 4)
+    if end == -1:
+        return meta, text
+    for line in text[4:end].splitlines():
+        if ":" in line:
+            k, v = line.split(":", 1)
+            meta[k.strip()] = v.strip()
+    return meta, text[end + 5 :]
+
+
+def passages(body: str) -> list[tuple[int, str]]:
+    # (character offset in body, text): paragraphs grouped up to PASSAGE_CHARS.
+    out: list[tuple[int, str]] = []
+    cur = ""
+    cur_start = 0
+    pos = 0
+    bounds = [(m.start(), m.end()) for m in PARA_SEP_RE.finditer(body)] + [(len(body), len(body))]
+    for end, next_pos in bounds:
+        raw = body[pos:end]
+        para = raw.strip()
+        para_start = pos + len(raw) - len(raw.lstrip())
+        pos = next_pos
+        if not para:
+            continue
+        if cur and len(cur) + len(para) > PASSAGE_CHARS:
+            out.append((cur_start, cur))
+            cur = ""
+        if cur:
+            cur = f"{cur}\n\n{para}"
+        else:
+            cur, cur_start = para, para_start
+    if cur:
+        out.append((cur_start, cur))
+    return out
+
+
+def byte_offsets(text: str, char_offsets: list[int]) -> list[int]:
+    # Convert ascending character offsets to UTF-8 byte offsets in one pass.
+    out: list[int] = []
+    prev = 0
+    nbytes = 0
+    for off in char_offsets:
+        nbytes += len(text[prev:off].encode("utf-8"))
+        prev = off
+        out.append(nbytes)
+    return out
+
+
+def catalog_bibkeys(refs: Path) -> dict[str, list[str]]:
+    keys: dict[str, list[str]] = {}
+    try:
+        with (refs / "catalog.jsonl").open(encoding="utf-8") as f:
+            for raw in f:
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and rec.get("slug") and rec.get("bibkey"):
+                    slot = keys.setdefault(rec["slug"], [])
+                    if rec["bibkey"] not in slot:
+                        slot.append(rec["bibkey"])
+    except FileNotFoundError:
+        pass
+    return keys
+
+
+def open_index(refs: Path) -> sqlite3.Connection:
+    db_path = refs / ".cache" / "search.sqlite"
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if (row[0] if row else None) != SCHEMA_VERSION:
+            # The index is derived data: rebuild rather than migrate.
+            conn.executescript(
+                "DROP TABLE IF EXISTS passages_fts; DROP TABLE IF EXISTS passages; DROP TABLE IF EXISTS docs; DELETE FROM meta;"
+            )
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)", (SCHEMA_VERSION,))
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        raise SystemExit(f"[FAIL] SQLite FTS5 is not available in this Python build: {e}")
+    return conn
+
+
+def update_index(conn: sqlite3.Connection, refs: Path) -> tuple[int, int]:
+    # Re-index only new or changed References/*.md (by mtime/size, then hash).
+    # Returns (indexed, removed).
+    known = {row[0]: row[1:] for row in conn.execute("SELECT slug, mtime_ns, size, sha256 FROM docs")}
+    seen: set[str] = set()
+    indexed = 0
+
+    catalog = refs / "catalog.jsonl"
+    catalog_mtime = str(catalog.stat().st_mtime_ns) if catalog.exists() else ""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'catalog_mtime'").fetchone()
+    catalog_changed = (row[0] if row else None) != catalog_mtime
+    bibkeys: dict[str, list[str]] | None = catalog_bibkeys(refs) if catalog_changed else None
+
+    with conn:
+        for entry in os.scandir(refs):
+            if not entry.name.endswith(".md") or entry.name == "index.md" or not entry.is_file():
+                continue
+            slug = entry.name[: -len(".md")]
+            seen.add(slug)
+            st = entry.stat()
+            prev = known.get(slug)
+            if prev and prev[0] == st.st_mtime_ns and prev[1] == st.st_size:
+                continue
+            data = Path(entry.path).read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            if prev and prev[2] == digest:
+                conn.execute("UPDATE docs SET mtime_ns = ?, size = ? WHERE slug = ?", (st.st_mtime_ns, st.st_size, slug))
+                continue
+            text = data.decode("utf-8", errors="ignore")
+            meta, body = split_front_matter(text)
+            m = re.search(r"^#\s+(.+)$", body, flags=re.MULTILINE)
+            if bibkeys is None:
+                bibkeys = catalog_bibkeys(refs)
+            keys = bibkeys.get(slug) or ([meta["bibkey"]] if meta.get("bibkey") else [])
+            chunks = passages(body)
+            body_start = len(text) - len(body)
+            offsets = byte_offsets(text, [body_start + off for off, _ in chunks])
+            conn.execute("DELETE FROM passages WHERE slug = ?", (slug,))
+            conn.executemany(
+                "INSERT INTO passages (slug, ord, offset, text) VALUES (?, ?, ?, ?)",
+                [(slug, i, offsets[i], chunk) for i, (_off, chunk) in enumerate(chunks)],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO docs (slug, title, bibkeys, mtime_ns, size, sha256) VALUES (?, ?, ?, ?, ?, ?)",
+                (slug, m.group(1).strip() if m else slug, ",".join(keys), st.st_mtime_ns, st.st_size, digest),
+            )
+            indexed += 1
+
+        removed = [slug for slug in known if slug not in seen]
+        for slug in removed:
+            conn.execute("DELETE FROM passages WHERE slug = ?", (slug,))
+            conn.execute("DELETE FROM docs WHERE slug = ?", (slug,))
+
+        if catalog_changed and bibkeys is not None:
+            for slug, keys in bibkeys.items():
+                conn.execute("UPDATE docs SET bibkeys = ? WHERE slug = ?", (",".join(keys), slug))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('catalog_mtime', ?)", (catalog_mtime,))
+    return indexed, len(removed)
+
+
+def to_fts_query(text: str) -> str:
+    # Plain claims become an OR of quoted terms so bm25 ranks by overlap and
+    # punctuation never trips the FTS5 query parser.
+    terms = re.findall(r"\w+", text, flags=re.UNICODE)
+    return " OR ".join(f'"{t}"' for t in terms)
+
+
+def search(conn: sqlite3.Connection, refs: Path, query: str, limit: int) -> list[dict[str, object]]:
+    rows = conn.execute(
+        """
+        SELECT p.slug, d.title, d.bibkeys, p.ord, p.offset,
+               snippet(passages_fts, 0, '[', ']', ' … ', 32), bm25(passages_fts) AS score
+        FROM passages_fts
+        JOIN passages p ON p.id = passages_fts.rowid
+        JOIN docs d ON d.slug = p.slug
+        WHERE passages_fts MATCH ?
+        ORDER BY score
+        LIMIT ?
+        """,
+        (query, limit),
+    ).fetchall()
+    page_indexes: dict[str, list[tuple[int, int]] | None] = {}
+    hits: list[dict[str, object]] = []
+    for slug, title, bibkeys, ord_, offset, snippet, score in rows:
+        if slug not in page_indexes:
+            page_indexes[slug] = load_page_index(refs / f"{slug}.md")
+        offsets = page_indexes[slug]
+        hits.append(
+            {
+                "slug": slug,
+                "title": title,
+                "bibkeys": [k for k in (bibkeys or "").split(",") if k],
+                "passage": ord_,
+                "offset": offset,
+                "page": page_of(offsets, offset) if offsets else None,
+                "score": round(-score, 3),
+                "snippet": snippet,
+            }
+        )
+    return hits
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Full-text search over the archived References/*.md (SQLite FTS5, updated incrementally)."
+    )
+    parser.add_argument("query", nargs="?", help="Claim or keywords to look up in the archived sources")
+    parser.add_argument("--path", default=".", help="Project path (default: .)")
+    parser.add_argument("--limit", type=int, default=10, help="Maximum passages to return (default: 10)")
+    parser.add_argument("--raw", action="store_true", help="Pass the query to FTS5 verbatim (phrases, NEAR, AND/OR)")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per hit")
+    parser.add_argument("--update", action="store_true", help="Only refresh the index and report what changed")
+    parser.add_argument(
+        "--page",
+        metavar="SLUG:N",
+        help="Print page N of an archived PDF's Markdown using its <slug>.pages.json index",
+    )
+    args = parser.parse_args()
+
+    root = find_project_root(Path(args.path))
+    refs = root / "References"
+    if not refs.is_dir():
+        print(f"[FAIL] No References/ folder under {root}", file=sys.stderr)
+        return 1
+
+    if args.page:
+        slug, _, num = args.page.rpartition(":")
+        if not slug or not num.isdigit():
+            print("[FAIL] --page expects SLUG:N, e.g. my-paper:12", file=sys.stderr)
+            return 2
+        try:
+            print(read_page(refs / f"{slug}.md", int(num)))
+        except (OSError, LookupError) as e:
+            print(f"[FAIL] {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    conn = open_index(refs)
+    indexed, removed = update_index(conn, refs)
+    if args.update or not args.query:
+        print(f"[OK] Search index up to date ({indexed} re-indexed, {removed} removed)")
+        return 0
+
+    query = args.query if args.raw else to_fts_query(args.query)
+    if not query:
+        print("[FAIL] Empty query", file=sys.stderr)
+        return 2
+    try:
+        hits = search(conn, refs, query, args.limit)
+    except sqlite3.OperationalError as e:
+        print(f"[FAIL] Invalid FTS5 query: {e}", file=sys.stderr)
+        return 2
+
+    for n, hit in enumerate(hits, start=1):
+        if args.json:
+            print(json.dumps(hit, ensure_ascii=False))
+            continue
+        keys = ", ".join(f"`{k}`" for k in hit["bibkeys"]) or "no bibkey"
+        where = f", p. {hit['page']}" if hit["page"] else ""
+        print(f"{n}. {hit['slug']}{where} ({keys}) — score {hit['score']}")
+        print(f"   {' '.join(str(hit['snippet']).split())}")
+    return 0 if hits else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,7 +3,9 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import json
 import os
+import re
 from pathlib import Path
 
 
@@ -32,74 +34,275 @@ def find_project_root(start: Path) -> Path:
     return start.resolve()
 
 
-def list_variants(root: Path) -> list[str]:
+def load_catalog(refs: Path) -> dict[str, dict[str, str]]:
+    # References/catalog.jsonl (written by add_reference.py): last record per URL wins.
+    records: dict[str, dict[str, str]] = {}
+    try:
+        with (refs / "catalog.jsonl").open(encoding="utf-8") as f:
+            for raw in f:
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and rec.get("url"):
+                    records[rec["url"]] = rec
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def lookup_reference(records: dict[str, dict[str, str]], key: str) -> list[dict[str, str]]:
+    if key in records:
+        return [records[key]]
+    by_key: dict[str, list[dict[str, str]]] = {}
+    for rec in records.values():
+        for field in ("slug", "bibkey", "sha256"):
+            if rec.get(field):
+                by_key.setdefault(rec[field], []).append(rec)
+    return by_key.get(key, [])
+
+
+PAGES_RE = re.compile(rb'"pages":\s*(\d+)')
+
+
+def page_count(refs: Path, slug: str) -> int | None:
+    # The count sits at the head of <slug>.pages.json; skip parsing the offsets list.
+    try:
+        with (refs / f"{slug}.pages.json").open("rb") as f:
+            m = PAGES_RE.search(f.read(128))
+    except OSError:
+        return None
+    return int(m.group(1)) if m else None
+
+
+# Bump when the snapshot layout changes; older .cache/status.json files are ignored.
+SNAPSHOT_VERSION = 1
+RECENT_LIMIT = 5
+
+
+def stat_info(path: Path) -> dict[str, object] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return {"mtime": st.st_mtime, "size": st.st_size}
+
+
+def scan_root(root: Path) -> dict[str, object]:
     stems: list[str] = []
-    for p in sorted(root.glob("*_latex")):
-        if p.is_dir():
-            stems.append(p.name[: -len("_latex")])
-    return stems
+    names: set[str] = set()
+    with os.scandir(root) as it:
+        for entry in it:
+            names.add(entry.name)
+            if entry.name.endswith("_latex") and entry.is_dir():
+                stems.append(entry.name[: -len("_latex")])
+    return {
+        "stems": sorted(stems),
+        "doctor": "doctor.sh" in names and os.access(root / "doctor.sh", os.X_OK),
+        "uv_lock": "uv.lock" in names,
+    }
+
 
+def scan_references(refs: Path) -> dict[str, object]:
+    # One scandir pass; DirEntry.stat() is cached, so each file is stat'ed at most once.
+    md: list[tuple[float, str]] = []
+    pdf = 0
+    sidecars: list[str] = []
+    names: set[str] = set()
+    try:
+        it = os.scandir(refs)
+    except FileNotFoundError:
+        return {"folder": str(refs), "present": False}
+    with it:
+        for entry in it:
+            name = entry.name
+            names.add(name)
+            if not entry.is_file():
+                continue
+            if name.endswith(".pages.json"):
+                sidecars.append(name[: -len(".pages.json")])
+            elif name.endswith(".md") and name != "index.md":
+                md.append((entry.stat().st_mtime, name[:-3]))
+            elif name.endswith(".pdf"):
+                pdf += 1
 
-def file_info(path: Path) -> tuple[str, str]:
-    if not path.exists():
+    info: dict[str, object] = {
+        "folder": str(refs),
+        "present": True,
+        "index": "index.md" in names,
+        "catalog": "catalog.jsonl" in names,
+        "markdown": len(md),
+        "pdf": pdf,
+    }
+    records = load_catalog(refs) if info["catalog"] else {}
+    if records:
+        slugs = {rec["slug"] for rec in records.values() if rec.get("slug")}
+        pdf_slugs = {rec["slug"] for rec in records.values() if rec.get("format") == "pdf" and rec.get("slug")}
+        recent = sorted(
+            [rec for rec in records.values() if not rec.get("duplicate_of")],
+            key=lambda r: r.get("retrieved", ""),
+            reverse=True,
+        )
+        info.update(
+            sources=len(records),
+            archived=len(slugs),
+            markdown=len(slugs),
+            pdf=len(pdf_slugs),
+            recent=[{"slug": rec["slug"], "retrieved": rec.get("retrieved")} for rec in recent[:RECENT_LIMIT]],
+        )
+        sidecars = [slug for slug in sidecars if slug in pdf_slugs]
+    else:
+        md.sort(reverse=True)
+        info["recent"] = [{"slug": slug, "mtime": mtime} for mtime, slug in md[:RECENT_LIMIT]]
+    pages = [n for n in (page_count(refs, slug) for slug in sidecars) if n is not None]
+    info["pages"] = sum(pages) if pages else None
+    return info
+
+
+def snapshot_key(root: Path) -> dict[str, object]:
+    # Creating, renaming or deleting files bumps the parent directory mtime. add_reference.py
+    # writes its .md extracts and sidecars through a temp file and rename, so the two
+    # directories plus the catalog cover it; an in-place edit by hand is not seen
+    # until the next archive change (or --refresh).
+    key: dict[str, object] = {"version": SNAPSHOT_VERSION}
+    for name, path in (("root", root), ("references", root / "References"), ("catalog", root / "References" / "catalog.jsonl")):
+        try:
+            st = path.stat()
+            key[name] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            key[name] = None
+    return key
+
+
+def collect_state(root: Path, use_cache: bool = True) -> dict[str, object]:
+    cache_dir = root / ".cache"
+    cache_file = cache_dir / "status.json"
+    try:
+        # Create .cache/ before taking the key so the first write does not invalidate it.
+        cache_dir.mkdir(exist_ok=True)
+    except OSError:
+        use_cache = False
+    key = snapshot_key(root)
+
+    state: dict[str, object] | None = None
+    if use_cache:
+        try:
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+            if cached.get("key") == key:
+                state = cached["state"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            state = None
+    if state is None:
+        state = {"root": str(root), **scan_root(root), "references": scan_references(root / "References")}
+        if use_cache:
+            tmp = cache_file.with_name(f".status.{os.getpid()}.tmp")
+            try:
+                tmp.write_text(json.dumps({"key": key, "state": state}), encoding="utf-8")
+                os.replace(tmp, cache_file)
+            except OSError:
+                tmp.unlink(missing_ok=True)
+
+    # Variant outputs are rewritten in place by builds, which leaves directory mtimes alone;
+    # re-stat them every time (two stats per variant).
+    state["variants"] = [
+        {
+            "stem": stem,
+            "md": stat_info(root / f"{stem}.md"),
+            "pdf": stat_info(root / f"{stem}.pdf"),
+            "latex_dir": f"{stem}_latex",
+        }
+        for stem in state["stems"]
+    ]
+    return state
+
+
+def describe(info: dict[str, object] | None) -> tuple[str, str]:
+    if info is None:
         return ("missing", "n/a")
-    st = path.stat()
-    return (fmt_time(st.st_mtime), human_bytes(st.st_size))
+    return (fmt_time(info["mtime"]), human_bytes(info["size"]))
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Show current stenographer project state and suggested next commands.")
     parser.add_argument("path", nargs="?", default=".", help="Project path (default: .)")
+    parser.add_argument(
+        "--ref",
+        metavar="KEY",
+        help="Look up an archived reference by URL, slug, bibkey or sha256 and print its catalog record(s)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the project state snapshot as JSON")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached snapshot in .cache/status.json")
     args = parser.parse_args()
 
     root = find_project_root(Path(args.path))
+    if args.ref:
+        refs = root / "References"
+        matches = lookup_reference(load_catalog(refs), args.ref)
+        for rec in matches:
+            pages = page_count(refs, rec["slug"]) if rec.get("format") == "pdf" and rec.get("slug") else None
+            if pages is not None:
+                rec = dict(rec, pages=pages)
+            print(json.dumps(rec, ensure_ascii=False))
+        return 0 if matches else 1
+
+    state = collect_state(root, use_cache=not args.refresh)
+    if args.json:
+        state.pop("stems", None)
+        print(json.dumps(state, indent=2, ensure_ascii=False))
+        return 0 if state["variants"] else 1
+
     print(f"Project root: {root}")
     print(f"Working dir:  {Path.cwd()}")
     print("")
 
-    doctor = root / "doctor.sh"
-    if doctor.exists() and os.access(doctor, os.X_OK):
+    if state["doctor"]:
         print("Preflight: ./doctor.sh (run to verify tooling)")
     else:
         print("Preflight: doctor.sh not found (older project)")
     print("")
 
-    stems = list_variants(root)
+    stems = state["stems"]
     if not stems:
         print("[WARN] No *_latex variants found. Expected at least one <stem>_latex/ directory.")
         return 1
 
     print("Variants:")
-    for stem in stems:
-        md = root / f"{stem}.md"
-        pdf = root / f"{stem}.pdf"
-        latex_dir = root / f"{stem}_latex"
-        md_mtime, md_size = file_info(md)
-        pdf_mtime, pdf_size = file_info(pdf)
+    for variant in state["variants"]:
+        stem = variant["stem"]
+        md_mtime, md_size = describe(variant["md"])
+        pdf_mtime, pdf_size = describe(variant["pdf"])
         print(f"- {stem}")
-        print(f"  - Markdown: {md.name}  (mtime: {md_mtime}, size: {md_size})")
-        print(f"  - PDF:      {pdf.name} (mtime: {pdf_mtime}, size: {pdf_size})")
-        print(f"  - LaTeX:    {latex_dir.name}/")
+        print(f"  - Markdown: {stem}.md  (mtime: {md_mtime}, size: {md_size})")
+        print(f"  - PDF:      {stem}.pdf (mtime: {pdf_mtime}, size: {pdf_size})")
+        print(f"  - LaTeX:    {variant['latex_dir']}/")
     print("")
 
-    refs = root / "References"
-    idx = refs / "index.md"
-    if refs.exists():
-        md_files = sorted([p for p in refs.glob("*.md") if p.name != "index.md"], key=lambda p: p.stat().st_mtime, reverse=True)
-        pdf_files = sorted(list(refs.glob("*.pdf")), key=lambda p: p.stat().st_mtime, reverse=True)
+    refs = state["references"]
+    idx = root / "References" / "index.md"
+    if refs.get("sources"):
+        page_note = f" ({refs['pages']} pages indexed)" if refs.get("pages") else ""
+        print("References archive:")
+        print(f"- Folder:  {refs['folder']}")
+        print(f"- Catalog: {root / 'References' / 'catalog.jsonl'} ({refs['sources']} sources, {refs['archived']} archived entries)")
+        print(f"- Index:   {idx} ({'present' if refs['index'] else 'missing'})")
+        print(f"- Files:   {refs['markdown']} markdown, {refs['pdf']} pdf{page_note}")
+        print("- Recent:")
+        for rec in refs["recent"]:
+            print(f"  - {rec['slug']}.md (retrieved: {rec.get('retrieved') or 'n/a'})")
+        print("")
+    elif refs["present"]:
         print("References archive:")
-        print(f"- Folder: {refs}")
-        print(f"- Index:  {idx} ({'present' if idx.exists() else 'missing'})")
-        print(f"- Files:  {len(md_files)} markdown, {len(pdf_files)} pdf")
-        if md_files:
+        print(f"- Folder: {refs['folder']}")
+        print(f"- Index:  {idx} ({'present' if refs['index'] else 'missing'})")
+        print(f"- Files:  {refs['markdown']} markdown, {refs['pdf']} pdf")
+        if refs["recent"]:
             print("- Recent:")
-            for p in md_files[:5]:
-                st = p.stat()
-                print(f"  - {p.name} (mtime: {fmt_time(st.st_mtime)})")
+            for rec in refs["recent"]:
+                print(f"  - {rec['slug']}.md (mtime: {fmt_time(rec['mtime'])})")
         print("")
 
     extras_hint = "uv sync --extra full"
-    if (root / "uv.lock").exists():
+    if state["uv_lock"]:
         print(f"Python env: uv.lock present; recommended: `{extras_hint}` (if you need full extraction fidelity)")
     else:
         print(f"Python env: uv.lock missing; run `{extras_hint}` if you need optional deps")
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import importlib.util
+import shutil
+import subprocess
+import sys
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+# init_steno_paper imports its sibling project_add_reference by name.
+sys.path.insert(0, str(SCRIPTS))
+
+
+def load_script(name: str) -> types.ModuleType:
+    # The helpers are standalone scripts, not a package: import them by path.
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def add_reference() -> types.ModuleType:
+    return load_script("project_add_reference")
+
+
+@pytest.fixture(scope="session")
+def init_steno() -> types.ModuleType:
+    return load_script("init_steno_paper")
+
+
+@pytest.fixture(scope="session")
+def sync_module(init_steno: types.ModuleType) -> types.ModuleType:
+    # sync_md_to_tex.py only exists inside projects; build it from the embedded source.
+    module = types.ModuleType("sync_md_to_tex")
+    exec(compile(init_steno.SYNC_PY, "sync_md_to_tex.py", "exec"), module.__dict__)
+    return module
+
+
+def make_pdf(pages: list[str]) -> bytes:
+    # Minimal uncompressed PDF with one line of Helvetica text per page.
+    objs = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+        objs.append(f"<< /Length {len(stream)} >>\nstream\n{stream.decode('latin-1')}\nendstream")
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {len(objs)} 0 R >>"
+        )
+        kids.append(f"{len(objs)} 0 R")
+    objs[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+class FixtureServer:
+    """Local HTTP server with per-path bodies, ETags and a request log."""
+
+    def __init__(self) -> None:
+        self.pages: dict[str, tuple[bytes, str, str]] = {}  # path -> (body, content type, etag)
+        self.requests: list[tuple[str, dict[str, str], int]] = []
+        self.gates: dict[str, threading.Event] = {}  # path -> held until set
+        self._seen: dict[str, threading.Event] = {}
+        self._seen_lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                headers = {k.lower(): v for k, v in self.headers.items()}
+                server.seen(self.path).set()
+                gate = server.gates.get(self.path)
+                if gate is not None:
+                    gate.wait(60)
+                page = server.pages.get(self.path)
+                if page is None:
+                    status = 404
+                    self.send_response(404)
+                    self.end_headers()
+                elif page[2] and headers.get("if-none-match") == page[2]:
+                    status = 304
+                    self.send_response(304)
+                    self.send_header("ETag", page[2])
+                    self.end_headers()
+                else:
+                    status = 200
+                    body, content_type, etag = page
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    if etag:
+                        self.send_header("ETag", etag)
+                    self.end_headers()
+                    self.wfile.write(body)
+                server.requests.append((self.path, headers, status))
+
+            def log_message(self, *_args: object) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def url(self, path: str) -> str:
+        return self.base + path
+
+    def seen(self, path: str) -> threading.Event:
+        # Set once a request for `path` has arrived (before any gate releases it).
+        with self._seen_lock:
+            return self._seen.setdefault(path, threading.Event())
+
+
+@pytest.fixture
+def http_server() -> Iterator[FixtureServer]:
+    server = FixtureServer()
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        for gate in server.gates.values():
+            gate.set()
+        server.httpd.shutdown()
+        server.httpd.server_close()
+
+
+class Project:
+    """A throwaway project root with the helper scripts installed under skill/scripts."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.scripts = root / "skill" / "scripts"
+        self.scripts.mkdir(parents=True)
+        for script in SCRIPTS.glob("*.py"):
+            shutil.copy2(script, self.scripts / script.name)
+        self.refs = root / "References"
+
+    def command(self, script: str, *args: str) -> list[str]:
+        return [sys.executable, str(self.scripts / script), *args]
+
+    def run(self, script: str, *args: str) -> subprocess.CompletedProcess[str]:
+        return subprocess.run(
+            self.command(script, *args), cwd=self.root, capture_output=True, text=True, timeout=60
+        )
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Project:
+    return Project(tmp_path / "project")
+
+
+FAKE_TOOL = """#!/usr/bin/env bash
+[[ "${1:-}" == "--version" ]] && { echo "$(basename "$0") 1.0"; exit 0; }
+echo "$(basename "$0") $*" >> "${FAKE_TOOL_LOG}"
+"""
+# Writes the .pdf (and the .bbl unless biber is skipped with -bibtex-) and logs how
+# many fake latexmk runs overlap, so tests can tell parallel builds from serial ones.
+FAKE_LATEXMK = FAKE_TOOL + """for a; do case $a in -outdir=*) d=${a#-outdir=};; -jobname=*) j=${a#-jobname=};; -bibtex-) nb=1;; esac; done
+touch "${FAKE_TOOL_LOG}.running.$j"
+echo "overlap $(ls "${FAKE_TOOL_LOG}".running.* | wc -l)" >> "${FAKE_TOOL_LOG}"
+sleep "${FAKE_LATEXMK_SLEEP:-0}"
+[[ -z "${nb:-}" ]] && echo bbl > "$d/$j.bbl"
+echo pdf > "$d/$j.pdf"
+rm -f "${FAKE_TOOL_LOG}.running.$j"
+"""
+
+
+class Paper:
+    """A project created by init_steno_paper.py, with logging stand-ins for the TeX toolchain."""
+
+    def __init__(self, base: Path, langs: str = "") -> None:
+        self.root = base / "paper"
+        self.bin = base / "bin"
+        self.log = base / "tools.log"
+        self.bin.mkdir(parents=True)
+        for tool in ("lualatex", "biber", "uv", "rumdl", "curl"):
+            (self.bin / tool).write_text(FAKE_TOOL)
+        (self.bin / "latexmk").write_text(FAKE_LATEXMK)
+        for tool in self.bin.iterdir():
+            tool.chmod(0o755)
+        (self.bin / "python3").symlink_to(sys.executable)
+        self.env = {"PATH": f"{self.bin}:/usr/bin:/bin", "HOME": str(base), "FAKE_TOOL_LOG": str(self.log)}
+        args = ["--langs", langs] if langs else []
+        result = self.run(sys.executable, str(SCRIPTS / "init_steno_paper.py"), "paper", "--dir", str(self.root),
+                          "--no-store", *args, cwd=base)
+        assert result.returncode == 0, result.stderr
+        self.log.write_text("")
+
+    def run(self, *cmd: str, cwd: Path | None = None, **env: str) -> subprocess.CompletedProcess[str]:
+        return subprocess.run(
+            list(cmd), cwd=cwd or self.root, env={**self.env, **env}, capture_output=True, text=True, timeout=60
+        )
+
+    def build(self, stem: str = "paper", **env: str) -> subprocess.CompletedProcess[str]:
+        return self.run("bash", str(self.root / f"{stem}_latex" / "scripts" / "build.sh"), stem, **env)
+
+    def calls(self, tool: str) -> list[str]:
+        return [line for line in self.log.read_text().splitlines() if line.split(" ", 1)[0] == tool]
+
+
+@pytest.fixture
+def paper(tmp_path: Path) -> Paper:
+    return Paper(tmp_path)
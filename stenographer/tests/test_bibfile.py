@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+
+BIB = """% hand-maintained
+@string{acm = "ACM"}
+
+@article{knuth84,
+  author = {Knuth, Donald},
+  title  = {Literate {Programming}},
+  url    = {https://example.org/knuth/},
+}
+
+@online(nourl,
+  title = "No URL here",
+)
+"""
+
+
+def test_parses_keys_and_urls(add_reference, tmp_path):
+    path = tmp_path / "references.bib"
+    path.write_text(BIB, encoding="utf-8")
+    bib = add_reference.BibFile(path)
+    assert bib.by_key == {"knuth84": "https://example.org/knuth", "nourl": ""}
+    assert bib.by_url == {"https://example.org/knuth": "knuth84"}
+
+
+def test_stage_reports_added_exists_and_conflicts(add_reference, tmp_path):
+    path = tmp_path / "references.bib"
+    path.write_text(BIB, encoding="utf-8")
+    bib = add_reference.BibFile(path)
+    assert bib.stage("knuth84", "Literate", "https://example.org/knuth", "2026-01-01T00:00:00Z") == "exists"
+    assert bib.stage("nourl", "Anything", "https://example.org/x", "2026-01-01T00:00:00Z") == "exists"
+    assert bib.stage("knuth84", "Other", "https://example.org/other", "2026-01-01T00:00:00Z").startswith(
+        "conflict: key 'knuth84'"
+    )
+    assert bib.stage("dup", "Literate", "https://example.org/knuth/", "2026-01-01T00:00:00Z").startswith(
+        "conflict: https://example.org/knuth/ is already cited"
+    )
+    assert bib.stage("fresh", "Fresh", "https://example.org/fresh", "2026-01-01T00:00:00Z") == "added"
+    assert bib.stage("fresh", "Fresh", "https://example.org/fresh", "2026-01-01T00:00:00Z") == "exists"
+
+
+def test_save_appends_staged_entries_and_keeps_existing_text(add_reference, tmp_path):
+    path = tmp_path / "references.bib"
+    path.write_text(BIB.rstrip("\n"), encoding="utf-8")
+    bib = add_reference.BibFile(path)
+    bib.stage("fresh", "Fresh {Title}", "https://example.org/fresh", "2026-03-04T05:06:07Z")
+    assert bib.save() == 1
+    assert bib.save() == 0
+
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith(BIB)
+    assert "@online{fresh,\n  title   = {Fresh {Title}},\n" in text
+    assert "urldate = {2026-03-04}" in text
+    assert add_reference.BibFile(path).by_key["fresh"] == "https://example.org/fresh"
+
+
+def test_save_reparses_a_file_changed_on_disk(add_reference, tmp_path):
+    path = tmp_path / "references.bib"
+    path.write_text(BIB, encoding="utf-8")
+    bib = add_reference.BibFile(path)
+    bib.stage("a", "A", "https://example.org/a", "2026-01-01T00:00:00Z")
+    bib.stage("b", "B", "https://example.org/b", "2026-01-01T00:00:00Z")
+
+    # Another process writes entry "a" (and more) before we save.
+    with path.open("a", encoding="utf-8") as f:
+        f.write("\n@misc{a,\n  url = {https://example.org/a},\n}\n@misc{other, title = {Other}}\n")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert bib.save() == 1
+    text = path.read_text(encoding="utf-8")
+    assert text.count("@misc{a,") == 1
+    assert "@online{a," not in text
+    assert "@misc{other" in text and "@online{b," in text
+    assert set(add_reference.BibFile(path).by_key) == {"knuth84", "nourl", "a", "other", "b"}
+
+
+def test_update_bib_creates_missing_file(add_reference, tmp_path):
+    latex_dir = tmp_path / "paper_latex"
+    status = add_reference.update_bib(latex_dir, "k", "T", "https://example.org/t", "2026-01-01T00:00:00Z")
+    assert status == "added"
+    assert "@online{k," in (latex_dir / "src" / "references.bib").read_text(encoding="utf-8")
+
+
+def test_parentheses_and_quotes_do_not_end_an_entry(add_reference, tmp_path):
+    path = tmp_path / "references.bib"
+    path.write_text(
+        "@online{a1,\n  title = {Part 1) Intro},\n  url = {https://example.org/a1},\n}\n"
+        '@misc(p1,\n  title = "Odd ) and } in quotes (x",\n  note = {(nested (parens)},\n'
+        "  url = {https://example.org/p1},\n)\n"
+        '@book{q1, title = "A {"}quoted{"} brace", url = "https://example.org/q1"}\n',
+        encoding="utf-8",
+    )
+    bib = add_reference.BibFile(path)
+    assert bib.by_key == {
+        "a1": "https://example.org/a1",
+        "p1": "https://example.org/p1",
+        "q1": "https://example.org/q1",
+    }
+    assert bib.by_url["https://example.org/a1"] == "a1"
+
+
+def test_save_keeps_the_file_mode(add_reference, tmp_path):
+    path = tmp_path / "references.bib"
+    path.write_text(BIB, encoding="utf-8")
+    path.chmod(0o640)
+    bib = add_reference.BibFile(path)
+    bib.stage("fresh", "Fresh", "https://example.org/fresh", "2026-01-01T00:00:00Z")
+    bib.save()
+    assert path.stat().st_mode & 0o777 == 0o640
+
+    new = tmp_path / "new.bib"
+    add_reference.write_atomic(new, b"")
+    assert new.stat().st_mode & 0o777 == add_reference.FILE_MODE
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from conftest import Paper
+
+
+@pytest.fixture
+def langs_paper(tmp_path) -> Paper:
+    return Paper(tmp_path, langs="en,ru,de")
+
+
+def overlaps(paper: Paper) -> list[int]:
+    return [int(line.split()[1]) for line in paper.log.read_text().splitlines() if line.startswith("overlap ")]
+
+
+def test_variants_build_concurrently_with_one_preflight(langs_paper):
+    result = langs_paper.run(sys.executable, "build.py", FAKE_LATEXMK_SLEEP="0.5")
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert len(langs_paper.calls("latexmk")) == 3
+    assert max(overlaps(langs_paper)) > 1
+    assert len(langs_paper.calls("rumdl")) == 1
+    for stem in ("paper_en", "paper_ru", "paper_de"):
+        assert (langs_paper.root / f"{stem}.pdf").exists()
+        assert f"[OK] {stem}: " in result.stdout
+    assert "Built 3/3 variant(s)" in result.stdout
+
+
+def test_jobs_limits_concurrency(langs_paper):
+    result = langs_paper.run(sys.executable, "build.py", "--jobs", "1", "paper_en", "paper_de", FAKE_LATEXMK_SLEEP="0.2")
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert overlaps(langs_paper) == [1, 1]
+    assert not (langs_paper.root / "paper_ru.pdf").exists()
+    assert "with 1 job(s)" in result.stdout
+
+
+def test_unknown_variant_is_refused(langs_paper):
+    result = langs_paper.run(sys.executable, "build.py", "paper_fr")
+    assert result.returncode == 2
+    assert "[FAIL] No build script for: paper_fr" in result.stderr
+    assert langs_paper.calls("latexmk") == []
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import threading
+
+LEGACY_INDEX = """# References (local archive)
+
+Notes kept above the list survive.
+
+## Index
+
+- [Paper One](./paper-one.md) — <https://example.org/one> (`one2020`) — retrieved 2024-01-02T03:04:05Z
+- [Blog Post](./blog-post.md) — <https://example.org/blog>
+"""
+
+
+def test_imports_legacy_index_into_catalog(add_reference, tmp_path):
+    (tmp_path / "index.md").write_text(LEGACY_INDEX, encoding="utf-8")
+    (tmp_path / "paper-one.pdf").write_bytes(b"%PDF-1.4")
+    catalog = add_reference.Catalog(tmp_path)
+
+    records = [json.loads(line) for line in (tmp_path / "catalog.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert records == [
+        {
+            "title": "Paper One",
+            "slug": "paper-one",
+            "url": "https://example.org/one",
+            "bibkey": "one2020",
+            "retrieved": "2024-01-02T03:04:05Z",
+            "format": "pdf",
+        },
+        {"title": "Blog Post", "slug": "blog-post", "url": "https://example.org/blog", "format": "html"},
+    ]
+    assert [r["slug"] for r in catalog.lookup("one2020")] == ["paper-one"]
+    assert catalog.lookup("blog-post")[0]["url"] == "https://example.org/blog"
+
+
+def test_import_waits_for_the_archive_lock(add_reference, tmp_path):
+    (tmp_path / "index.md").write_text(LEGACY_INDEX, encoding="utf-8")
+    with add_reference.archive_lock(tmp_path):
+        importer = threading.Thread(target=add_reference.Catalog, args=(tmp_path,))
+        importer.start()
+        importer.join(0.2)
+        assert importer.is_alive() and not (tmp_path / "catalog.jsonl").exists()
+        # A writer holding the lock got there first; the import must not clobber it.
+        (tmp_path / "catalog.jsonl").write_text('{"url": "https://example.org/new", "slug": "new"}\n')
+    importer.join(5)
+    assert (tmp_path / "catalog.jsonl").read_text().count("\n") == 1
+    with add_reference.archive_lock(tmp_path):
+        (tmp_path / "catalog.jsonl").unlink()
+        assert len(add_reference.Catalog(tmp_path).by_url) == 2  # reentrant for the holding thread
+
+
+def test_render_index_round_trips_and_keeps_header(add_reference, tmp_path):
+    (tmp_path / "index.md").write_text(LEGACY_INDEX, encoding="utf-8")
+    catalog = add_reference.Catalog(tmp_path)
+    catalog.render_index()
+    assert (tmp_path / "index.md").read_text(encoding="utf-8") == LEGACY_INDEX
+
+
+def test_append_index_adds_record_and_renders(add_reference, tmp_path, monkeypatch):
+    monkeypatch.setattr(add_reference, "now_utc_iso", lambda: "2026-05-06T07:08:09Z")
+    rec = add_reference.append_index(tmp_path, "New", "new", "https://example.org/new", "new2026", format="html")
+    assert rec["retrieved"] == "2026-05-06T07:08:09Z"
+    assert (tmp_path / "index.md").read_text(encoding="utf-8") == (
+        add_reference.INDEX_HEADER
+        + "\n- [New](./new.md) — <https://example.org/new> (`new2026`) — retrieved 2026-05-06T07:08:09Z\n"
+    )
+    assert add_reference.open_catalog(tmp_path).lookup("new2026") == [rec]
+
+
+def test_refresh_picks_up_records_from_other_writers(add_reference, tmp_path):
+    catalog = add_reference.Catalog(tmp_path)
+    with (tmp_path / "catalog.jsonl").open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"url": "https://example.org/x", "slug": "x"}) + "\n")
+        f.write('{"url": "https://example.org/partial"')  # writer still mid-line
+    catalog.refresh()
+    assert list(catalog.by_url) == ["https://example.org/x"]
+
+
+def test_ingest_keeps_hand_edited_index_lines(project, http_server):
+    http_server.pages["/new.html"] = (b"<title>New Source</title><p>text</p>", "text/html", "")
+    project.refs.mkdir(parents=True)
+    (project.refs / "index.md").write_text(
+        "# References (local archive)\n"
+        "\n"
+        "## Index\n"
+        "\n"
+        "Sources marked (!) still need a stable URL.\n"
+        "- [Paper One](./paper-one.md) — <https://example.org/one> (`one2020`)\n"
+        "- Smith 2019, conference talk (!)\n"
+        "- [Draft](drafts/draft.md) — shared by email\n"
+        "\n"
+        "## Reading notes\n"
+        "\n"
+        "- [Not an entry](./notes.md) — <https://example.org/notes>\n",
+        encoding="utf-8",
+    )
+
+    result = project.run("project_add_reference.py", "--deps", "none", http_server.url("/new.html"))
+    assert result.returncode == 0, result.stderr
+
+    index = (project.refs / "index.md").read_text(encoding="utf-8")
+    head, section = index.split("## Index\n", 1)
+    section, notes = section.split("## Reading notes\n", 1)
+    assert head == "# References (local archive)\n\n"
+    assert section.splitlines()[:5] == [
+        "",
+        "Sources marked (!) still need a stable URL.",
+        "- Smith 2019, conference talk (!)",
+        "- [Draft](drafts/draft.md) — shared by email",
+        "",
+    ]
+    assert "- [Paper One](./paper-one.md) — <https://example.org/one> (`one2020`)" in section
+    assert f"- [New Source](./New-Source.md) — <{http_server.url('/new.html')}>" in section
+    assert notes == "\n- [Not an entry](./notes.md) — <https://example.org/notes>\n"
+
+    catalog = [json.loads(line)["url"] for line in (project.refs / "catalog.jsonl").read_text().splitlines()]
+    assert catalog == ["https://example.org/one", http_server.url("/new.html")]
+
+
+def test_render_keeps_entries_the_catalog_does_not_know(add_reference, tmp_path):
+    (tmp_path / "catalog.jsonl").write_text('{"url": "https://example.org/a", "slug": "a"}\n', encoding="utf-8")
+    (tmp_path / "index.md").write_text(
+        add_reference.INDEX_HEADER + "\n- [Manual](./manual.md) — <https://example.org/manual>\n", encoding="utf-8"
+    )
+    add_reference.Catalog(tmp_path).render_index()
+    first = (tmp_path / "index.md").read_text(encoding="utf-8")
+    assert first == (
+        add_reference.INDEX_HEADER
+        + "\n- [Manual](./manual.md) — <https://example.org/manual>\n\n- [a](./a.md) — <https://example.org/a>\n"
+    )
+    add_reference.Catalog(tmp_path).render_index()
+    assert (tmp_path / "index.md").read_text(encoding="utf-8") == first
+
+
+def test_title_override_does_not_leak_into_the_extract_cache(project, http_server):
+    http_server.pages["/doc.html"] = (b"<title>Own Title</title><p>text</p>", "text/html", "")
+    url = http_server.url("/doc.html")
+    result = project.run("project_add_reference.py", "--deps", "none", "--title", "Custom", url)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)["title"] == "Custom"
+
+    # Same bytes under a new URL once the first copy is gone: served from the
+    # extract cache, titled from the document.
+    (project.refs / "Custom.md").unlink()
+    http_server.pages["/mirror.html"] = http_server.pages["/doc.html"]
+    result = project.run("project_add_reference.py", "--deps", "none", http_server.url("/mirror.html"))
+    assert result.returncode == 0, result.stderr
+    out = json.loads(result.stdout)
+    assert (out["slug"], out["title"]) == ("Own-Title", "Own Title")
+    assert "# Own Title\n" in (project.refs / "Own-Title.md").read_text(encoding="utf-8")
+
+
+def test_duplicates_are_only_linked_within_one_format(project, http_server):
+    body = b"<title>Same Bytes</title><p>identical</p>"
+    http_server.pages["/x.pdf"] = (body, "application/pdf", "")
+    http_server.pages["/y.html"] = (body, "text/html", "")
+    http_server.pages["/z.html"] = (body, "text/html", "")
+    first = project.run("project_add_reference.py", "--deps", "none", "--slug", "x", http_server.url("/x.pdf"))
+    assert first.returncode == 0, first.stderr
+
+    second = json.loads(
+        project.run("project_add_reference.py", "--deps", "none", http_server.url("/y.html")).stdout
+    )
+    assert "duplicate_of" not in second
+    assert (second["slug"], second["title"]) == ("Same-Bytes", "Same Bytes")
+
+    third = json.loads(
+        project.run("project_add_reference.py", "--deps", "none", "--slug", "z", http_server.url("/z.html")).stdout
+    )
+    assert third["duplicate_of"] == "Same-Bytes"
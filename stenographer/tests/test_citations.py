@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+
+BIB = """@string{pub = "Press"}
+@book{knuth84, title = {The TeXbook}, publisher = pub}
+@inproceedings{lamport94, title = {LaTeX}, crossref = {proc94}}
+@proceedings{proc94, title = {Proceedings}}
+@article{unused, title = {Never cited}}
+"""
+
+
+@pytest.fixture
+def src(tmp_path):
+    (tmp_path / "preamble.tex").write_text("\\usepackage[backend=biber]{biblatex}\n\\addbibresource{references.bib}\n")
+    (tmp_path / "content.tex").write_text("See \\cite{knuth84} and \\parencite[p.~3]{lamport94}. % \\cite{unused}\n")
+    (tmp_path / "references.bib").write_text(BIB)
+    return tmp_path
+
+
+def test_fingerprint_covers_cited_entries_only(sync_module, src):
+    base = sync_module.citation_fingerprint(src)
+    assert base["keys"] == ["knuth84", "lamport94"]
+    bib = src / "references.bib"
+
+    bib.write_text(BIB.replace("Never cited", "Still never cited"))
+    assert sync_module.citation_fingerprint(src)["digest"] == base["digest"]
+    for old, new in [("The TeXbook", "The METAFONTbook"), ("Proceedings", "Proc."), ('"Press"', '"AW"')]:
+        bib.write_text(BIB.replace(old, new))
+        assert sync_module.citation_fingerprint(src)["digest"] != base["digest"], old
+
+
+def test_fingerprint_follows_cited_keys_and_nocite_star(sync_module, src):
+    base = sync_module.citation_fingerprint(src)["digest"]
+    content = src / "content.tex"
+    content.write_text(content.read_text().replace("See", "Also see"))
+    assert sync_module.citation_fingerprint(src)["digest"] == base
+    content.write_text(content.read_text() + "\\cite{unused}\n")
+    assert sync_module.citation_fingerprint(src)["digest"] != base
+
+    content.write_text("\\nocite{*}\n")
+    star = sync_module.citation_fingerprint(src)["digest"]
+    (src / "references.bib").write_text(BIB.replace("Never cited", "Still never cited"))
+    assert sync_module.citation_fingerprint(src)["digest"] != star
+
+
+def skipped_biber(paper) -> bool:
+    result = paper.build()
+    assert result.returncode == 0, result.stdout + result.stderr
+    return paper.calls("latexmk")[-1].split().count("-bibtex-") == 1
+
+
+def test_build_skips_biber_until_the_bibliography_changes(paper):
+    md = paper.root / "paper.md"
+    bib = paper.root / "paper_latex" / "src" / "references.bib"
+    assert not skipped_biber(paper)
+    md.write_text(md.read_text() + "\nA prose-only edit.\n")
+    assert skipped_biber(paper)
+    bib.write_text(bib.read_text() + "@book{new, title = {New}}\n")
+    assert not skipped_biber(paper)
+    md.write_text(md.read_text() + "\nAnother prose edit.\n")
+    assert skipped_biber(paper)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+FAKE_UV = """#!{python}
+# Stand-in for `uv sync --extra basic`: a real venv whose "packages" are empty
+# modules, unless FAKE_UV_BROKEN is set.
+import os, pathlib, subprocess, sys
+log = pathlib.Path(os.environ["FAKE_UV_LOG"])
+log.write_text(log.read_text() + " ".join(sys.argv[1:]) + "\\n" if log.exists() else " ".join(sys.argv[1:]) + "\\n")
+venv = pathlib.Path(".venv")
+if not (venv / "bin" / "python").exists():
+    subprocess.run([{python!r}, "-m", "venv", "--without-pip", str(venv)], check=True)
+if not os.environ.get("FAKE_UV_BROKEN"):
+    site = next(venv.glob("lib/python*/site-packages"))
+    for name in ("markdownify",):
+        (site / (name + ".py")).write_text("")
+"""
+
+
+@pytest.fixture
+def deps_project(project, http_server, tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    uv = bin_dir / "uv"
+    uv.write_text(FAKE_UV.format(python=sys.executable))
+    uv.chmod(0o755)
+    (project.root / "pyproject.toml").write_text('[project]\nname = "paper"\nversion = "0"\n')
+    http_server.pages["/doc.html"] = (b"<title>Doc</title><p>text</p>", "text/html", "")
+    log = tmp_path / "uv.log"
+    env = {**os.environ, "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}", "FAKE_UV_LOG": str(log)}
+    env.pop("STENOGRAPHER_DEPS_READY", None)
+
+    def run(**extra: str) -> subprocess.CompletedProcess[str]:
+        cmd = project.command("project_add_reference.py", "--deps", "basic", "--refresh", http_server.url("/doc.html"))
+        return subprocess.run(cmd, cwd=project.root, env={**env, **extra}, capture_output=True, text=True, timeout=120)
+
+    def syncs() -> int:
+        return len(log.read_text().splitlines()) if log.exists() else 0
+
+    return project, run, syncs
+
+
+def test_stamp_tracks_the_venv_interpreter(deps_project):
+    project, run, syncs = deps_project
+    assert run().returncode == 0
+    assert syncs() == 1
+    stamp = json.loads((project.root / ".venv" / ".stenographer-deps.json").read_text())
+    assert stamp["venv"]["python"] == os.path.realpath(project.root / ".venv" / "bin" / "python")
+    assert stamp["venv"]["python_version"].startswith(f"{sys.version_info[0]}.{sys.version_info[1]}")
+
+    result = run()
+    assert result.returncode == 0, result.stderr
+    assert syncs() == 1
+
+    # Recreating the venv rewrites pyvenv.cfg.
+    cfg = project.root / ".venv" / "pyvenv.cfg"
+    st = cfg.stat()
+    os.utime(cfg, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert run().returncode == 0
+    assert syncs() == 2
+
+
+def test_missing_module_drops_the_stamp_and_resyncs_once(deps_project):
+    project, run, syncs = deps_project
+    assert run().returncode == 0
+    site = next((project.root / ".venv").glob("lib/python*/site-packages"))
+    (site / "markdownify.py").unlink()
+
+    result = run()
+    assert result.returncode == 0, result.stderr
+    assert "[WARN] .venv is missing markdownify; re-running uv sync" in result.stderr
+    assert syncs() == 2
+    assert (site / "markdownify.py").exists()
+
+    (site / "markdownify.py").unlink()
+    result = run(FAKE_UV_BROKEN="1")
+    assert result.returncode != 0
+    assert "[FAIL] .venv is still missing markdownify after uv sync" in result.stderr
+    assert syncs() == 3
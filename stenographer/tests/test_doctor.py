@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import os
+
+CACHED = "[INFO] Cached result"
+
+
+def doctor(paper, *args: str, **env: str):
+    return paper.run("bash", str(paper.root / "doctor.sh"), *args, **env)
+
+
+def test_probe_is_cached_until_refresh(paper):
+    first = doctor(paper)
+    assert first.returncode == 0, first.stdout + first.stderr
+    assert CACHED not in first.stdout
+    assert "[OK] latexmk: latexmk 1.0" in first.stdout
+    cache = paper.root / ".cache" / "doctor.env"
+    assert cache.exists()
+
+    second = doctor(paper)
+    assert second.returncode == 0
+    assert CACHED in second.stdout
+    assert "[OK] latexmk: latexmk 1.0" in second.stdout
+    quiet = doctor(paper, "--quiet")
+    assert quiet.returncode == 0 and quiet.stdout == ""
+
+    assert CACHED not in doctor(paper, "--refresh").stdout
+
+
+def test_path_and_tool_changes_invalidate_the_cache(paper, tmp_path):
+    doctor(paper)
+    extra = tmp_path / "extra"
+    extra.mkdir()
+    assert CACHED not in doctor(paper, PATH=f"{extra}:{paper.env['PATH']}").stdout
+    assert CACHED not in doctor(paper).stdout
+
+    assert CACHED in doctor(paper).stdout
+    tool = paper.bin / "biber"
+    future = (paper.root / ".cache" / "doctor.env").stat().st_mtime + 60
+    os.utime(tool, (future, future))
+    assert CACHED not in doctor(paper).stdout
+
+
+def test_failed_probe_is_not_cached(paper):
+    (paper.bin / "rumdl").unlink()
+    result = doctor(paper)
+    assert result.returncode == 1
+    assert "Missing required tools: rumdl" in result.stdout
+    assert not (paper.root / ".cache" / "doctor.env").exists()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+
+def built(paper, **env) -> bool:
+    # True when build.sh ran latexmk, False when it short-circuited on the manifest.
+    before = len(paper.calls("latexmk"))
+    result = paper.build(**env)
+    assert result.returncode == 0, result.stdout + result.stderr
+    ran = len(paper.calls("latexmk")) > before
+    assert ran != ("[OK] Up to date" in result.stdout)
+    return ran
+
+
+def test_touch_skips_and_edit_rebuilds(paper):
+    md = paper.root / "paper.md"
+    assert built(paper)
+    assert not built(paper)
+    assert len(paper.calls("rumdl")) == 1  # the no-op build skips preflight and lint too
+
+    st = md.stat()
+    os.utime(md, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert not built(paper)
+    md.write_text(md.read_text() + "\nOne more line.\n")
+    assert built(paper)
+    assert not built(paper)
+
+
+@pytest.mark.parametrize("path", ["paper_latex/src/references.bib", "paper_latex/src/preamble.tex"])
+def test_src_edits_rebuild(paper, path):
+    assert built(paper)
+    target = paper.root / path
+    target.write_text(target.read_text() + "\n% edited\n")
+    assert built(paper)
+
+
+def test_flags_force_and_missing_pdf_rebuild(paper):
+    assert built(paper)
+    assert built(paper, STENOGRAPHER_SPLIT_SECTIONS="1")
+    assert not built(paper, STENOGRAPHER_SPLIT_SECTIONS="1")
+    assert built(paper, STENOGRAPHER_SPLIT_SECTIONS="1", STENOGRAPHER_FORCE_BUILD="1")
+    (paper.root / "paper_latex" / "build" / "paper.pdf").unlink()
+    assert built(paper, STENOGRAPHER_SPLIT_SECTIONS="1")
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+PAGE = (
+    "<html><head><title>Site | Page</title><meta property='og:title' content='OG Title'></head>"
+    "<body><nav>menu</nav><h1>The <em>Real</em> Title</h1>"
+    + "<p>paragraph</p>" * 200
+    + "<script>var x = 1;</script></body></html>"
+)
+
+
+@pytest.fixture
+def fake_pandoc(add_reference, tmp_path, monkeypatch):
+    pandoc = tmp_path / "pandoc"
+    pandoc.write_text("#!/bin/sh\ncat > /dev/null\necho '# The *Real* Title'\necho\necho 'paragraph'\n")
+    pandoc.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    add_reference.tool_path.cache_clear()
+    yield
+    add_reference.tool_path.cache_clear()
+
+
+def test_title_head_stops_after_the_first_h1(add_reference):
+    head = add_reference.title_head(PAGE)
+    assert head.endswith("</h1>") and "<p>" not in head
+    assert add_reference.title_head("<head><title>T</title></head><body><p>x</p>") == "<head><title>T</title></head><body>"
+    assert add_reference.title_head("no markup") == "no markup"
+
+
+def test_pandoc_path_scans_only_the_head(add_reference, fake_pandoc, monkeypatch):
+    fed: list[int] = []
+    feed = add_reference.PageScanner.feed
+    monkeypatch.setattr(add_reference.PageScanner, "feed", lambda self, data: (fed.append(len(data)), feed(self, data)))
+    title, md, backend = add_reference.convert_html("https://example.org/p", PAGE)
+    assert backend == "pandoc"
+    assert title == "The Real Title"
+    assert md.startswith("# The *Real* Title")
+    assert fed == [len(add_reference.title_head(PAGE))]
+
+
+def test_builtin_path_uses_metadata_title_and_text(add_reference, monkeypatch):
+    monkeypatch.setattr(add_reference, "tool_path", lambda name: None)
+    monkeypatch.setattr(add_reference, "optional_module", lambda name: None)
+    title, md, backend = add_reference.convert_html("https://example.org/p", PAGE)
+    assert (title, backend) == ("OG Title", "text")
+    assert "menu" in md and "var x" not in md
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+needs_curl = pytest.mark.skipif(shutil.which("curl") is None, reason="curl not installed")
+
+
+@pytest.fixture
+def cache(add_reference, tmp_path):
+    return add_reference.HttpCache(tmp_path / "http", 1 << 20)
+
+
+@needs_curl
+def test_revalidates_with_etag_and_serves_304_from_cache(add_reference, cache, http_server, tmp_path):
+    http_server.pages["/a.html"] = (b"<p>hello</p>", "text/html", '"v1"')
+    url = http_server.url("/a.html")
+
+    first, ctype = add_reference.fetch_to_file(url, tmp_path, cache)
+    assert first.read_bytes() == b"<p>hello</p>"
+    assert ctype == "text/html"
+    first.unlink()
+
+    second, ctype = add_reference.fetch_to_file(url, tmp_path, cache)
+    assert second.read_bytes() == b"<p>hello</p>"
+    assert ctype == "text/html"
+    assert [status for _path, _headers, status in http_server.requests] == [200, 304]
+    assert http_server.requests[1][1]["if-none-match"] == '"v1"'
+    assert len(list((cache.root / "blobs").iterdir())) == 1
+
+
+@needs_curl
+def test_changed_etag_replaces_cached_body(add_reference, cache, http_server, tmp_path):
+    http_server.pages["/a.html"] = (b"old", "text/html", '"v1"')
+    url = http_server.url("/a.html")
+    add_reference.fetch_to_file(url, tmp_path, cache)[0].unlink()
+
+    http_server.pages["/a.html"] = (b"new", "text/html", '"v2"')
+    body, _ctype = add_reference.fetch_to_file(url, tmp_path, cache)
+    assert body.read_bytes() == b"new"
+    assert cache.lookup(url)["etag"] == '"v2"'
+
+
+@needs_curl
+def test_offline_serves_cache_and_reports_misses(add_reference, cache, http_server, tmp_path):
+    http_server.pages["/a.html"] = (b"cached", "text/html", '"v1"')
+    url = http_server.url("/a.html")
+    add_reference.fetch_to_file(url, tmp_path, cache)[0].unlink()
+    http_server.httpd.shutdown()
+
+    body, ctype = add_reference.fetch_to_file(url, tmp_path, cache, offline=True)
+    assert body.read_bytes() == b"cached"
+    assert ctype == "text/html"
+    with pytest.raises(add_reference.OfflineCacheMiss):
+        add_reference.fetch_to_file(http_server.url("/missing.html"), tmp_path, cache, offline=True)
+    with pytest.raises(add_reference.OfflineCacheMiss):
+        add_reference.fetch_to_file(url, tmp_path, None, offline=True)
+
+
+def test_evicts_least_recently_used_entries(add_reference, tmp_path):
+    # All within one second: ordering must not depend on timestamp granularity.
+    cache = add_reference.HttpCache(tmp_path / "http", 250)
+
+    def store(url: str, data: bytes) -> None:
+        body = tmp_path / url.rsplit("/", 1)[1]
+        body.write_bytes(data)
+        cache.store(url, body, {"content-type": "text/plain"})
+
+    store("http://x/a", b"a" * 100)
+    store("http://x/b", b"b" * 100)
+    cache.touch("http://x/a", cache.lookup("http://x/a"))  # a is now more recent than b
+    store("http://x/c", b"c" * 100)
+
+    assert cache.lookup("http://x/b") is None
+    assert cache.lookup("http://x/a") is not None
+    assert cache.lookup("http://x/c") is not None
+    assert sum(p.stat().st_size for p in (cache.root / "blobs").iterdir()) <= 250
+
+
+def test_eviction_keeps_blobs_shared_with_live_entries(add_reference, tmp_path):
+    cache = add_reference.HttpCache(tmp_path / "http", 150)
+    body = tmp_path / "body"
+    body.write_bytes(b"m" * 100)
+    cache.store("http://mirror/1", body, {})
+    cache.store("http://mirror/2", body, {})
+    other = tmp_path / "other"
+    other.write_bytes(b"z" * 100)
+    cache.store("http://other", other, {})
+
+    assert cache.lookup("http://mirror/1") is None
+    assert cache.lookup("http://mirror/2") is None
+    assert cache.lookup("http://other") is not None
+    assert len(list((cache.root / "blobs").iterdir())) == 1
+
+
+def test_entries_from_older_caches_are_evicted_first(add_reference, tmp_path):
+    cache = add_reference.HttpCache(tmp_path / "http", 150)
+    old = tmp_path / "old"
+    old.write_bytes(b"o" * 100)
+    meta = cache.store("http://x/old", old, {})
+    meta["used"] = "2099-01-01T00:00:00Z"
+    cache._write_entry("http://x/old", meta)
+    new = tmp_path / "new"
+    new.write_bytes(b"n" * 100)
+    cache.store("http://x/new", new, {})
+    assert cache.lookup("http://x/old") is None
+    assert cache.lookup("http://x/new") is not None
+
+
+def test_stored_blobs_cannot_be_edited_through_the_download(add_reference, cache, tmp_path):
+    body = tmp_path / "body"
+    body.write_bytes(b"data")
+    meta = cache.store("http://x/a", body, {})
+    blob = cache.root / "blobs" / meta["sha256"]
+    if os.path.samefile(body, blob):
+        assert not blob.stat().st_mode & 0o222
+    body.unlink()
+    body.write_bytes(b"edit")
+    assert blob.read_bytes() == b"data"
+
+
+def test_relink_folds_duplicates_and_protects_shared_links(add_reference, tmp_path):
+    refs = tmp_path / "References"
+    refs.mkdir()
+    (refs / "a.pdf").write_bytes(b"%PDF same")
+    os.link(refs / "a.pdf", refs / "b.pdf")  # hard link left by an older archive
+    (refs / "c.pdf").write_bytes(b"%PDF same")
+    summary = add_reference.relink_pdfs(refs)
+    assert summary["pdfs"] == 3 and summary["stored"] == 1
+    blob = refs / ".blobs" / f"{add_reference.file_sha256(refs / 'a.pdf')}.pdf"
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        pdf = refs / name
+        assert pdf.read_bytes() == b"%PDF same"
+        if os.path.samefile(pdf, blob):
+            assert not pdf.stat().st_mode & 0o222
+
+
+def test_checkout_hands_out_private_paths(add_reference, cache, tmp_path):
+    body = tmp_path / "body"
+    body.write_bytes(b"data")
+    meta = cache.store("http://x/a", body, {})
+    out = cache.checkout(meta, tmp_path)
+    assert out.read_bytes() == b"data"
+    out.unlink()
+    assert cache.lookup("http://x/a") is not None
+
+
+@needs_curl
+def test_error_status_is_not_a_download(add_reference, cache, http_server, tmp_path):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    with pytest.raises(add_reference.HttpError, match="HTTP 404"):
+        add_reference.fetch_to_file(http_server.url("/missing.pdf"), dest, cache)
+    assert list(dest.iterdir()) == []
+    assert cache.lookup(http_server.url("/missing.pdf")) is None
+
+
+@needs_curl
+def test_cli_refuses_to_archive_an_error_page(project, http_server):
+    result = project.run("project_add_reference.py", "--deps", "none", http_server.url("/paper.pdf"))
+    assert result.returncode != 0
+    assert f"[FAIL] HTTP 404 for {http_server.url('/paper.pdf')}" in result.stderr
+    assert not list(project.refs.glob("*.pdf")) and not list(project.refs.glob("*.md"))
+    assert not (project.refs / "catalog.jsonl").exists()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+from conftest import SCRIPTS
+
+
+def init(*args: str, cwd) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, str(SCRIPTS / "init_steno_paper.py"), *args], cwd=cwd, capture_output=True, text=True, timeout=60
+    )
+
+
+def test_projects_get_their_own_files(tmp_path):
+    store = tmp_path / "store"
+    for name in ("one", "two"):
+        result = init(name, "--dir", name, "--store", str(store), cwd=tmp_path)
+        assert result.returncode == 0, result.stderr
+
+    build_sh = tmp_path / "one" / "one_latex" / "scripts" / "build.sh"
+    other = tmp_path / "two" / "two_latex" / "scripts" / "build.sh"
+    (published,) = store.iterdir()
+    stored = published / "scripts" / "build.sh"
+    assert build_sh.stat().st_mode & 0o777 == 0o755
+    assert build_sh.stat().st_ino not in (stored.stat().st_ino, other.stat().st_ino)
+    assert build_sh.stat().st_nlink == 1
+
+    build_sh.write_text(build_sh.read_text() + "# local tweak\n")
+    assert "# local tweak" not in stored.read_text()
+    assert "# local tweak" not in other.read_text()
+
+
+def test_manifest_uses_cli_langs_as_default(tmp_path):
+    (tmp_path / "projects.json").write_text(
+        json.dumps(["plain", {"name": "german", "langs": "de"}, {"name": "single", "langs": ""}])
+    )
+    result = init("--manifest", "projects.json", "--langs", "en,ru", "--no-store", cwd=tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert sorted(p.name for p in (tmp_path / "plain").glob("*_latex")) == ["plain_en_latex", "plain_ru_latex"]
+    assert [p.name for p in (tmp_path / "german").glob("*_latex")] == ["german_latex"]
+    assert [p.name for p in (tmp_path / "single").glob("*_latex")] == ["single_latex"]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from conftest import make_pdf
+
+pytest.importorskip("pypdf")
+
+
+def test_batch_extracts_pages_through_the_process_pool(project, http_server):
+    # Two 20-page PDFs ingested by concurrent batch threads, each split into
+    # PAGE_CHUNK ranges handed to the shared page pool.
+    for name in ("a", "b"):
+        pdf = make_pdf([f"Document {name} page {i}" for i in range(1, 21)])
+        http_server.pages[f"/{name}.pdf"] = (pdf, "application/pdf", "")
+    batch = project.root / "batch.txt"
+    project.root.mkdir(exist_ok=True)
+    lines = [json.dumps({"url": http_server.url(f"/{n}.pdf"), "slug": n}) for n in ("a", "b")]
+    batch.write_text("\n".join(lines) + "\n")
+
+    result = project.run("project_add_reference.py", "--deps", "none", "--jobs", "2", "--extract-jobs", "2", "--batch", str(batch))
+    assert result.returncode == 0, result.stderr
+
+    for name in ("a", "b"):
+        text = (project.refs / f"{name}.md").read_text(encoding="utf-8")
+        found = [line for line in text.splitlines() if line.startswith(f"Document {name} page ")]
+        assert found == [f"Document {name} page {i}" for i in range(1, 21)]
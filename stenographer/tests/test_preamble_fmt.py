@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPTS
+
+FAKE_PDFLATEX = """#!/bin/sh
+[ "$1" = "--version" ] && { echo "pdfTeX 3.14 (fake)"; exit 0; }
+for a in "$@"; do
+  case "$a" in -jobname=*) job="${a#-jobname=}";; -output-directory=*) out="${a#-output-directory=}";; esac
+done
+echo fmt > "$out/$job.fmt"
+"""
+
+
+@pytest.fixture
+def variant(tmp_path, monkeypatch):
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS / "init_steno_paper.py"), "paper", "--no-store"],
+        cwd=tmp_path, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "pdflatex").write_text(FAKE_PDFLATEX)
+    (bin_dir / "pdflatex").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    root = tmp_path / "paper_latex"
+    spec = importlib.util.spec_from_file_location("preamble_fmt", root / "scripts" / "preamble_fmt.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return root, module
+
+
+def test_latin_variant_gets_a_format(variant, capsys):
+    root, fmt = variant
+    (root / "src" / "content.tex").write_text("Café, naïve, Łódź — 50 €.\n", encoding="utf-8")
+    job = fmt.ensure_format(root)
+    assert job and (root / "build" / "fmt" / f"{job}.fmt").exists()
+    assert "[OK] Dumped preamble format" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("text", ["Привет, мир", "Ελληνικά", "日本語"])
+def test_non_latin_variant_builds_with_lualatex(variant, capsys, text):
+    root, fmt = variant
+    (root / "src" / "content.tex").write_text(f"Intro. {text}\n", encoding="utf-8")
+    assert fmt.ensure_format(root) is None
+    err = capsys.readouterr().err
+    assert "src/content.tex contains non-Latin text" in err and "building with lualatex" in err
+    assert not (root / "build" / "fmt").exists()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import queue
+import signal
+import subprocess
+import threading
+from typing import Any
+
+import pytest
+
+TIMEOUT = 30
+
+
+class ServeClient:
+    """Drives ``add_reference.py --serve`` over its stdin/stdout pipes."""
+
+    def __init__(self, project, *args: str) -> None:
+        self.proc = subprocess.Popen(
+            project.command("project_add_reference.py", "--deps", "none", "--serve", *args),
+            cwd=project.root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        self.replies: queue.Queue[dict[str, Any]] = queue.Queue()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+        assert "[OK] Serving JSON-RPC" in self.proc.stderr.readline()
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            self.replies.put(json.loads(line))
+
+    def send(self, rid: int | None, method: str, **params: Any) -> None:
+        msg: dict[str, Any] = {"jsonrpc": "2.0", "method": method, "params": params}
+        if rid is not None:
+            msg["id"] = rid
+        self.proc.stdin.write(json.dumps(msg) + "\n")
+        self.proc.stdin.flush()
+
+    def reply(self, timeout: float = TIMEOUT) -> dict[str, Any]:
+        return self.replies.get(timeout=timeout)
+
+    def no_reply(self, wait: float = 0.5) -> bool:
+        try:
+            self.replies.get(timeout=wait)
+        except queue.Empty:
+            return True
+        return False
+
+    def finish(self) -> int:
+        code = self.proc.wait(TIMEOUT)
+        self.reader.join(TIMEOUT)
+        return code
+
+    def close(self) -> None:
+        if self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+
+
+@pytest.fixture
+def serve(project, http_server):
+    project.root.mkdir(parents=True, exist_ok=True)
+    clients: list[ServeClient] = []
+
+    def start(*args: str) -> ServeClient:
+        client = ServeClient(project, *args)
+        clients.append(client)
+        return client
+
+    yield start
+    for client in clients:
+        client.close()
+
+
+def add_page(server, name: str, gated: bool = False) -> str:
+    path = f"/{name}.html"
+    server.pages[path] = (f"<title>{name}</title><p>{name} body</p>".encode(), "text/html", "")
+    if gated:
+        server.gates[path] = threading.Event()
+    return server.url(path)
+
+
+def test_replies_arrive_out_of_order(serve, http_server):
+    slow = add_page(http_server, "slow", gated=True)
+    fast = add_page(http_server, "fast")
+    client = serve("--jobs", "2")
+
+    client.send(1, "ingest", url=slow)
+    assert http_server.seen("/slow.html").wait(TIMEOUT)
+    client.send(2, "ingest", url=fast)
+    first = client.reply()
+    assert first["id"] == 2 and first["result"]["slug"] == "fast"
+
+    http_server.gates["/slow.html"].set()
+    second = client.reply()
+    assert second["id"] == 1 and second["result"]["slug"] == "slow"
+
+    client.proc.stdin.close()
+    assert client.finish() == 0
+
+
+def test_full_queue_stops_reading_requests(serve, http_server):
+    urls = [add_page(http_server, "held", gated=True)] + [add_page(http_server, f"p{i}") for i in range(3)]
+    client = serve("--jobs", "1", "--queue-size", "1")
+
+    client.send(1, "ingest", url=urls[0])  # taken by the only worker, held at the server
+    assert http_server.seen("/held.html").wait(TIMEOUT)
+    client.send(2, "ingest", url=urls[1])  # fills the queue
+    client.send(3, "ingest", url=urls[2])  # blocks the reader
+    client.send(4, "ping")
+    assert client.no_reply(), "service kept reading while its queue was full"
+
+    http_server.gates["/held.html"].set()
+    replies = {}
+    for _ in range(4):
+        msg = client.reply()
+        replies[msg["id"]] = msg
+    assert sorted(replies) == [1, 2, 3, 4]
+    assert all("result" in msg for msg in replies.values())
+    assert replies[4]["result"]["status"] == "ok"
+
+    client.send(5, "ingest", url=urls[3])
+    assert client.reply()["id"] == 5
+    client.proc.stdin.close()
+    assert client.finish() == 0
+
+
+def start_busy(serve, http_server) -> ServeClient:
+    # One job in flight at the server, one still queued behind it.
+    held = add_page(http_server, "held", gated=True)
+    queued = add_page(http_server, "queued")
+    client = serve("--jobs", "1")
+    client.send(1, "ingest", url=held)
+    assert http_server.seen("/held.html").wait(TIMEOUT)
+    client.send(2, "ingest", url=queued)
+    return client
+
+
+def assert_drained(client: ServeClient, http_server) -> None:
+    assert client.no_reply(), "a job finished before its source was served"
+    assert client.proc.poll() is None, "service exited with jobs in flight"
+    http_server.gates["/held.html"].set()
+    replies = {msg["id"]: msg for msg in (client.reply() for _ in range(2))}
+    assert replies[1]["result"]["slug"] == "held"
+    assert replies[2]["result"]["slug"] == "queued"
+    assert client.finish() == 0
+    assert client.replies.empty()
+
+
+def test_shutdown_drains_jobs_in_flight(serve, http_server):
+    client = start_busy(serve, http_server)
+    client.send(3, "shutdown")
+    assert client.reply() == {"jsonrpc": "2.0", "id": 3, "result": {"status": "draining"}}
+    assert_drained(client, http_server)
+
+
+def test_eof_drains_jobs_in_flight(serve, http_server):
+    client = start_busy(serve, http_server)
+    client.proc.stdin.close()
+    assert_drained(client, http_server)
+
+
+def test_sigterm_drains_jobs_in_flight(serve, http_server):
+    client = start_busy(serve, http_server)
+    client.send(3, "ping")  # round trip: job 2 has been read and queued
+    assert client.reply()["id"] == 3
+    client.proc.send_signal(signal.SIGTERM)
+    assert_drained(client, http_server)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+
+PAPER = """# A Title
+
+**Author:** Ada
+
+## Abstract
+
+Short abstract.
+
+## Introduction
+
+Intro text.
+
+## Method
+
+Method text.
+"""
+
+
+def test_write_if_changed_keeps_mtime_of_unchanged_files(sync_module, tmp_path):
+    path = tmp_path / "meta.tex"
+    assert sync_module.write_if_changed(path, "one\n")
+    os.utime(path, ns=(1, 1))
+    assert not sync_module.write_if_changed(path, "one\n")
+    assert path.stat().st_mtime_ns == 1
+    assert sync_module.write_if_changed(path, "two\n")
+    assert path.read_text() == "two\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["meta.tex"]
+
+
+def test_resync_only_rewrites_what_changed(sync_module, tmp_path):
+    md = tmp_path / "paper.md"
+    md.write_text(PAPER, encoding="utf-8")
+    src = tmp_path / "src"
+    src.mkdir()
+    first = sync_module.sync(md, src)
+    assert {p.name for p in first} == {"meta.tex", "abstract.tex", "content.tex"}
+    assert sync_module.sync(md, src) == []
+    md.write_text(PAPER.replace("Intro text.", "Intro text, revised."), encoding="utf-8")
+    assert sync_module.sync(md, src) == [src / "content.tex"]
+
+
+def test_split_sections_writes_one_file_per_section(sync_module, tmp_path):
+    md = tmp_path / "paper.md"
+    md.write_text(PAPER + "\n## Results\n\nResult text.\n", encoding="utf-8")
+    src = tmp_path / "src"
+    src.mkdir()
+    sync_module.sync(md, src, split=True)
+    sections = src / "sections"
+    assert sorted(p.name for p in sections.iterdir()) == ["01.tex", "02.tex", "03.tex"]
+    assert (src / "content.tex").read_text().split() == [
+        r"\input{sections/01}",
+        r"\input{sections/02}",
+        r"\input{sections/03}",
+    ]
+    assert "Method text." in (sections / "02.tex").read_text()
+
+    md.write_text(PAPER.replace("Method text.", "Method text, revised."), encoding="utf-8")
+    changed = sync_module.sync(md, src, split=True)
+    assert changed == [sections / "02.tex", src / "content.tex"]
+    assert sorted(p.name for p in sections.iterdir()) == ["01.tex", "02.tex"]
+
+
+def test_split_ignores_section_lines_inside_verbatim(sync_module):
+    head, chunks = sync_module.split_sections("\\section{A}\n\\begin{verbatim}\n\\section{B}\n\\end{verbatim}")
+    assert head == ""
+    assert len(chunks) == 1
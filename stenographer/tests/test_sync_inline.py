@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    ("md", "tex"),
+    [
+        ("plain text", "plain text"),
+        ("50% of 5 & #1", r"50\% of 5 \& \#1"),
+        ("**bold** and *em* and _em_", r"\textbf{bold} and \emph{em} and \emph{em}"),
+        ("snake_case_name and 2*3*4", r"snake\_case\_name and 2*3*4"),
+        ("`a_b{c}`", r"\texttt{a\_b\{c\}}"),
+        ("see [@knuth84; @lamport94]", r"see \cite{knuth84,lamport94}"),
+        ("[the *docs*](https://x.org/a_b#c%20d)", r"\href{https://x.org/a_b\#c\%20d}{the \emph{docs}}"),
+        ("inline $a_b^2$ math", "inline $a_b^2$ math"),
+        (r"keep \ref{fig:x} as is", r"keep \ref{fig:x} as is"),
+        ("**bold with `code_x`**", r"\textbf{bold with \texttt{code\_x}}"),
+        ("***both***", r"\textbf{\emph{both}}"),
+        ("a ***bold em*** word and **b** *e*", r"a \textbf{\emph{bold em}} word and \textbf{b} \emph{e}"),
+        ("***[@k1]***", r"\textbf{\emph{\cite{k1}}}"),
+        ("*a* *b*", r"\emph{a} \emph{b}"),
+        ("_a_ and _b_", r"\emph{a} and \emph{b}"),
+        ("**a** and **b**", r"\textbf{a} and \textbf{b}"),
+        ("***x*** and ***y***", r"\textbf{\emph{x}} and \textbf{\emph{y}}"),
+        ("*a **b** c*", r"\emph{a \textbf{b} c}"),
+        ("_a **b** c_", r"\emph{a \textbf{b} c}"),
+        ("**a *b* c**", r"\textbf{a \emph{b} c}"),
+        ("*one* then _two_ then *three*", r"\emph{one} then \emph{two} then \emph{three}"),
+    ],
+)
+def test_inline_md_to_tex(sync_module, md, tex):
+    assert sync_module.inline_md_to_tex(md) == tex
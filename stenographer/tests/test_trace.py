@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import SCRIPTS
+
+
+def load_trace(path) -> list[dict]:
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith("[\n") and text.count("[\n") == 1
+    return json.loads(text.rstrip().rstrip(",") + "]")
+
+
+def test_parallel_writers_share_one_header(tmp_path):
+    trace = tmp_path / "trace.json"
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[1]); import project_add_reference as ar; from pathlib import Path; "
+        "[ar.append_trace(Path(sys.argv[2]), [{'name': sys.argv[3], 'ph': 'X', 'ts': i, 'dur': 1}]) for i in range(20)]"
+    )
+    with ThreadPoolExecutor(8) as pool:
+        procs = list(
+            pool.map(
+                lambda n: subprocess.run([sys.executable, "-c", code, str(SCRIPTS), str(trace), f"w{n}"]),
+                range(8),
+            )
+        )
+    assert all(p.returncode == 0 for p in procs)
+    events = load_trace(trace)
+    assert len(events) == 8 * 20
+    assert sorted({e["name"] for e in events}) == [f"w{n}" for n in range(8)]
+    assert not [p for p in tmp_path.iterdir() if p != trace]
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash not installed")
+@pytest.mark.parametrize("clock", ["epochrealtime", "python3", "date"])
+def test_build_spans_without_epochrealtime(init_steno, tmp_path, clock):
+    # Run build.sh's span helpers as bash 3.2 would see them (no $EPOCHREALTIME).
+    build_sh = init_steno.BUILD_SH
+    helpers = build_sh[build_sh.index("# Opt-in stage timing") : build_sh.index("# Set STENOGRAPHER_SPLIT_SECTIONS")]
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for tool in ("date", "dirname", "mkdir", "mktemp", "ln", "rm"):
+        (bin_dir / tool).symlink_to(shutil.which(tool))
+    if clock == "python3":
+        (bin_dir / "python3").symlink_to(sys.executable)
+    script = (
+        ("" if clock == "epochrealtime" else "unset EPOCHREALTIME\n")
+        + "set -euo pipefail\nNAME=paper\n"
+        + helpers
+        + "span_begin sync\nspan_end\nspan_begin latexmk\nspan_end\n"
+    )
+    trace = tmp_path / "out" / "trace.json"
+    proc = subprocess.run(
+        [shutil.which("bash"), "-c", script],
+        env={"PATH": str(bin_dir), "STENOGRAPHER_TRACE": str(trace)},
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    events = load_trace(trace)
+    assert [e["name"] for e in events] == ["build.sync", "build.latexmk"]
+    assert all(e["ts"] > 1_600_000_000 * 10**6 and e["dur"] >= 0 for e in events)
+
+
+def test_sync_appends_through_add_reference_writer(init_steno, tmp_path):
+    scripts = tmp_path / "scripts"
+    scripts.mkdir()
+    (scripts / "sync_md_to_tex.py").write_text(init_steno.SYNC_PY, encoding="utf-8")
+    shutil.copyfile(SCRIPTS / "project_add_reference.py", scripts / "add_reference.py")
+    md = tmp_path / "paper.md"
+    md.write_text("# Title\n\n## Abstract\n\nShort.\n\n## Intro\n\nBody.\n", encoding="utf-8")
+    src = tmp_path / "src"
+    src.mkdir()
+    trace = tmp_path / "trace.json"
+    proc = subprocess.run(
+        [sys.executable, str(scripts / "sync_md_to_tex.py"), str(md), str(src)],
+        env={"PATH": "/usr/bin:/bin", "STENOGRAPHER_TRACE": str(trace)},
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    events = load_trace(trace)
+    assert [e["name"] for e in events] == ["sync.read", "sync.convert", "sync.write", "sync.citations"]
+    assert all(e["cat"] == "sync_md_to_tex" and e["args"]["peak_rss_kb"] > 0 for e in events)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+import types
+
+import pytest
+
+from conftest import Paper
+
+
+@pytest.fixture(scope="session")
+def watch_module(init_steno: types.ModuleType) -> types.ModuleType:
+    module = types.ModuleType("watch")
+    exec(compile(init_steno.WATCH_PY, "watch.py", "exec"), module.__dict__)
+    return module
+
+
+def wait_for(cond, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.05)
+    return cond()
+
+
+def test_polling_watcher_sees_create_modify_delete(watch_module, tmp_path):
+    (tmp_path / "a.md").write_text("one")
+    watcher = watch_module.PollingWatcher([tmp_path], 0.01)
+    assert watcher.wait(0.05) == set()
+    (tmp_path / "a.md").write_text("two, longer")
+    (tmp_path / "b.tex").write_text("new")
+    assert watcher.wait(1) == {tmp_path / "a.md", tmp_path / "b.tex"}
+    (tmp_path / "b.tex").unlink()
+    assert watcher.wait(1) == {tmp_path / "b.tex"}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_watcher_reports_finished_writes(watch_module, tmp_path):
+    watcher = watch_module.InotifyWatcher([tmp_path])
+    sub = tmp_path / "sections"
+    sub.mkdir()
+    watcher.add(sub)
+    assert watcher.wait(0.05) == {sub}
+    (sub / "01.tex").write_text("x")
+    (tmp_path / ".tmp").write_text("y")
+    (tmp_path / ".tmp").rename(tmp_path / "meta.tex")
+    changed = set()
+    while more := watcher.wait(0.2):
+        changed |= more
+    assert {sub / "01.tex", tmp_path / "meta.tex"} <= changed
+
+
+@pytest.mark.parametrize("flags", [[], ["--no-inotify", "--poll", "0.05"]], ids=["inotify", "polling"])
+def test_watch_syncs_and_rebuilds_once_per_save_burst(tmp_path, flags):
+    paper = Paper(tmp_path)
+    latex = paper.root / "paper_latex"
+    proc = subprocess.Popen(
+        [sys.executable, str(latex / "scripts" / "watch.py"), "paper", "--debounce", "0.3", *flags],
+        cwd=paper.root,
+        env=paper.env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        assert wait_for(lambda: (paper.root / "paper.pdf").exists())
+        assert len(paper.calls("latexmk")) == 1
+
+        md = paper.root / "paper.md"
+        text = md.read_text()
+        for n in range(3):
+            md.write_text(text.replace("## 7. Conclusion\n", f"## 7. Conclusion\n\nNew paragraph {n}.\n"))
+            time.sleep(0.02)
+        assert wait_for(lambda: len(paper.calls("latexmk")) == 2)
+        assert "New paragraph 2." in (latex / "src" / "content.tex").read_text()
+
+        (latex / "src" / "macros.tex").write_text("% edited\n", encoding="utf-8")
+        assert wait_for(lambda: len(paper.calls("latexmk")) == 3)
+        time.sleep(1)
+        assert len(paper.calls("latexmk")) == 3
+        assert len(paper.calls("rumdl")) == 2  # initial sync and the save burst
+    finally:
+        proc.terminate()
+        proc.wait(10)